@@ -0,0 +1,45 @@
+"""
+cost of authentication_required per request with the verified token cache and
+with every token verified again, no database or network is involved
+
+    python -m benchmarks.authentication
+"""
+import asyncio
+import time
+
+from fastapi.security import HTTPAuthorizationCredentials
+
+from src.core.fastapi.dependencies import auth
+from src.core.security import JWTHandler
+
+ITERATIONS = 20_000
+
+
+async def per_call(credentials: HTTPAuthorizationCredentials) -> float:
+    """microseconds per call"""
+    started = time.perf_counter()
+    for _ in range(ITERATIONS):
+        await auth.authentication_required(credentials)
+    return (time.perf_counter() - started) / ITERATIONS * 1_000_000
+
+
+async def main():
+    token = JWTHandler.encode_access_token({"user_id": 1, "is_admin": False})
+    credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+    cache = auth.verified_tokens
+    if cache is None:
+        raise SystemExit("JWT_CACHE_SIZE is 0, nothing to compare")
+
+    auth.verified_tokens = None
+    uncached = await per_call(credentials)
+    auth.verified_tokens = cache
+    cached = await per_call(credentials)
+
+    print(f"{'authentication_required':<28} {'us/call':>8}")
+    print(f"{'verify every token':<28} {uncached:>8.2f}")
+    print(f"{'verified token cache':<28} {cached:>8.2f}")
+    print(f"{'speedup':<28} {uncached / cached:>7.1f}x")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,77 @@
+"""
+cost of collecting metrics, per call of the metric types and per request of
+the metrics and query stats middlewares compared with a bare asgi app, nothing
+is sent over the network
+
+    python -m benchmarks.metrics_overhead
+"""
+import asyncio
+import time
+
+from src.core.cache.stats import record_lookup
+from src.core.fastapi.middlewares import MetricsMiddleware, QueryStatsMiddleware
+from src.core.metrics import Counter, Histogram, registry, render
+
+ITERATIONS = 100_000
+
+counter = Counter("benchmark_counter_total", "benchmark", ("route",))
+histogram = Histogram("benchmark_seconds", "benchmark", ("route",))
+
+SCOPE = {"type": "http", "method": "GET", "path": "/benchmark", "headers": []}
+
+
+async def bare_app(scope, receive, send) -> None:
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b""})
+
+
+async def receive() -> dict:
+    return {"type": "http.request", "body": b""}
+
+
+async def send(_) -> None:
+    pass
+
+
+def per_call(fn) -> float:
+    """microseconds per call"""
+    started = time.perf_counter()
+    for _ in range(ITERATIONS):
+        fn()
+    return (time.perf_counter() - started) / ITERATIONS * 1_000_000
+
+
+async def per_request(app) -> float:
+    started = time.perf_counter()
+    for _ in range(ITERATIONS):
+        await app(dict(SCOPE), receive, send)
+    return (time.perf_counter() - started) / ITERATIONS * 1_000_000
+
+
+async def main():
+    print(f"{'operation':<36} {'us/op':>8}")
+    for name, fn in (
+        ("Counter.inc", lambda: counter.inc(route="/benchmark")),
+        ("Histogram.observe", lambda: histogram.observe(0.02, route="/benchmark")),
+        ("record_lookup", lambda: record_lookup("benchmark", True)),
+    ):
+        print(f"{name:<36} {per_call(fn):>8.3f}")
+
+    bare = await per_request(bare_app)
+    instrumented = await per_request(
+        MetricsMiddleware(
+            QueryStatsMiddleware(bare_app, slow_seconds=1, server_timing=False)
+        )
+    )
+    print(f"{'bare request':<36} {bare:>8.3f}")
+    print(f"{'request with both middlewares':<36} {instrumented:>8.3f}")
+    print(f"{'middleware overhead':<36} {instrumented - bare:>8.3f}")
+
+    started = time.perf_counter()
+    body = render(registry)
+    duration = (time.perf_counter() - started) * 1_000_000
+    print(f"{f'render ({len(body)} bytes)':<36} {duration:>8.3f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
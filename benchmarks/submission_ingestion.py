@@ -0,0 +1,151 @@
+"""
+compare writing submissions through the ORM unit of work with the bulk path of
+ParticipantRepo (COPY on postgres, executemany elsewhere), it creates and then
+deletes its own user and quiz on the database from DATABASE_URL
+
+    python -m benchmarks.submission_ingestion
+"""
+import asyncio
+import secrets
+import time
+
+from sqlalchemy import delete
+
+from src.app.models import (
+    MultipleOption,
+    Participant,
+    Question,
+    Quiz,
+    User,
+    UserDescriptiveAnswer,
+    UserMultipleOptionAnswer,
+)
+from src.app.models.enums_ import QuestionType
+from src.app.repositories import ParticipantRepo
+from src.app.schemas.extra.submission import (
+    GradedMultipleOptionAnswer,
+    QueuedSubmission,
+)
+from src.app.schemas.in_.quizzes import UserDescriptiveAnswersIn
+from src.core.database import Base
+from src.core.database.session import async_engine, async_session
+
+SUBMISSION_COUNTS = (10, 100, 1000)
+QUESTIONS_PER_TYPE = 5
+
+
+async def create_quiz() -> tuple[int, int, list[Question]]:
+    async with async_session() as session:
+        user = User(
+            full_name="benchmark",
+            email=f"{secrets.token_hex(6)}@benchmark.local",
+            password="-",
+        )
+        quiz = Quiz(title="benchmark", quiz_path=secrets.token_hex(8), owner=user)
+        for i in range(QUESTIONS_PER_TYPE):
+            quiz.questions.append(
+                Question(
+                    text=f"descriptive {i}",
+                    question_type=QuestionType.DESCRIPTIVE_SHORT_ANSWER,
+                    score=1,
+                )
+            )
+            quiz.questions.append(
+                Question(
+                    text=f"multiple options {i}",
+                    question_type=QuestionType.MULTIPLE_OPTIONS,
+                    score=1,
+                    multiple_options=[MultipleOption(text=str(o)) for o in range(4)],
+                )
+            )
+        session.add(quiz)
+        await session.commit()
+        await session.refresh(quiz, ["questions"])
+        for question in quiz.questions:
+            await session.refresh(question, ["multiple_options"])
+        return user.id, quiz.id, quiz.questions
+
+
+def make_submissions(
+    quiz_id: int, questions: list[Question], count: int
+) -> list[QueuedSubmission]:
+    descriptive = [
+        UserDescriptiveAnswersIn(question_id=q.id, answer="benchmark answer")
+        for q in questions
+        if q.question_type != QuestionType.MULTIPLE_OPTIONS
+    ]
+    multiple_options = [
+        GradedMultipleOptionAnswer(
+            question_id=q.id, option_id=q.multiple_options[0].id, is_correct=True
+        )
+        for q in questions
+        if q.question_type == QuestionType.MULTIPLE_OPTIONS
+    ]
+    return [
+        QueuedSubmission(
+            submission_id=secrets.token_hex(8),
+            quiz_id=quiz_id,
+            username=f"benchmark+{secrets.token_hex(8)}",
+            descriptive=descriptive,
+            multiple_options=multiple_options,
+        )
+        for _ in range(count)
+    ]
+
+
+async def write_with_orm(submissions: list[QueuedSubmission]) -> None:
+    async with async_session() as session:
+        for s in submissions:
+            participant = Participant(username=s.username, quiz_id=s.quiz_id)
+            participant.descriptive = [
+                UserDescriptiveAnswer(answer=a.answer, question_id=a.question_id)
+                for a in s.descriptive
+            ]
+            participant.multiple_options = [
+                UserMultipleOptionAnswer(
+                    option_id=a.option_id, question_id=a.question_id
+                )
+                for a in s.multiple_options
+            ]
+            session.add(participant)
+        await session.commit()
+
+
+async def write_in_bulk(submissions: list[QueuedSubmission]) -> None:
+    async with async_session() as session:
+        await ParticipantRepo(session).add_participants_with_answers(submissions)
+
+
+async def main():
+    async with async_engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    user_id, quiz_id, questions = await create_quiz()
+    print(f"driver: {async_engine.dialect.driver}")
+    print(f"{'submissions':>12} {'orm (s)':>10} {'bulk (s)':>10} {'speedup':>8}")
+    try:
+        for count in SUBMISSION_COUNTS:
+            timings = []
+            for write in (write_with_orm, write_in_bulk):
+                submissions = make_submissions(quiz_id, questions, count)
+                started = time.perf_counter()
+                await write(submissions)
+                timings.append(time.perf_counter() - started)
+            orm_time, bulk_time = timings
+            print(
+                f"{count:>12} {orm_time:>10.4f} {bulk_time:>10.4f}"
+                f" {orm_time / bulk_time:>7.1f}x"
+            )
+    finally:
+        async with async_session() as session:
+            await session.execute(
+                delete(Participant).where(Participant.quiz_id == quiz_id)
+            )
+            await session.execute(delete(Quiz).where(Quiz.id == quiz_id))
+            await session.execute(delete(User).where(User.id == user_id))
+            await session.commit()
+        await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
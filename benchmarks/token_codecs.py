@@ -0,0 +1,77 @@
+"""
+encode and decode throughput of every token codec backend and algorithm on the
+access and refresh token payloads the app issues, keys are generated in memory
+
+    python -m benchmarks.token_codecs
+"""
+import time
+from datetime import datetime, timedelta
+
+from src.core.config import JwtBackends
+from src.core.security.token_codecs import create_token_codec, generate_pem_keypair
+
+DURATION = 1.0
+SECRET_KEY = "benchmark secret of at least thirty-two bytes"
+CODECS = (
+    (JwtBackends.JOSE, "HS256"),
+    (JwtBackends.PYJWT, "HS256"),
+    (JwtBackends.JOSE, "ES256"),
+    (JwtBackends.PYJWT, "ES256"),
+    (JwtBackends.PYJWT, "EdDSA"),
+)
+
+
+def payloads() -> dict[str, dict]:
+    # the claims of JWTHandler.encode_access_token and encode_refresh_token
+    return {
+        "access": {
+            "user_id": 1024,
+            "is_admin": False,
+            "exp": datetime.utcnow() + timedelta(minutes=30),
+        },
+        "refresh": {
+            "refresh_user_id": 1024,
+            "exp": datetime.utcnow() + timedelta(days=30),
+        },
+    }
+
+
+def ops_per_second(fn) -> float:
+    count, started = 0, time.perf_counter()
+    while (elapsed := time.perf_counter() - started) < DURATION:
+        for _ in range(100):
+            fn()
+        count += 100
+    return count / elapsed
+
+
+def main():
+    print(
+        f"{'backend':<8} {'algorithm':<10} {'token':<8} {'encode/s':>10} {'decode/s':>10}"
+    )
+    for backend, algorithm in CODECS:
+        private_key, public_key = (
+            (None, None)
+            if algorithm.startswith("HS")
+            else generate_pem_keypair(algorithm)
+        )
+        try:
+            codec = create_token_codec(
+                backend, algorithm, SECRET_KEY, private_key, public_key
+            )
+        except RuntimeError as e:
+            print(f"{backend.value:<8} {algorithm:<10} skipped: {e}")
+            continue
+
+        for name, payload in payloads().items():
+            token = codec.encode(payload)
+            encode = ops_per_second(lambda: codec.encode(dict(payload)))
+            decode = ops_per_second(lambda: codec.decode(token))
+            print(
+                f"{backend.value:<8} {algorithm:<10} {name:<8}"
+                f" {encode:>10.0f} {decode:>10.0f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
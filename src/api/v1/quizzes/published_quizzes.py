@@ -1,14 +1,24 @@
 from typing import Annotated
 
-from fastapi import APIRouter, Path, Depends
+from fastapi import APIRouter, Path, Query, Depends, Header, Response, status
+from fastapi.responses import StreamingResponse
 from pydantic import PositiveInt
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from src.app.cache import (
+    AnswerKeyCache,
+    ItemAnalysisCache,
+    Leaderboard,
+    PublishedQuizCache,
+    QuizRevision,
+    QuizPathCache,
+)
 from src.app.controllers import (
     QuizController,
     UserAnswersController,
     QuestionController,
 )
+from src.app.models.enums_ import ParticipantSort, SortOrder, ExportFormat
 from src.app.repositories import (
     QuizRepository,
     QuestionRepository,
@@ -18,18 +28,40 @@ from src.app.repositories import (
 from src.app.schemas.extra.success import MessageResponse
 from src.app.schemas.extra.token import TokenData
 from src.app.schemas.in_.quizzes import UserQuestionAnswersIn, QuizEnterPasswordIn
-from src.app.schemas.in_.user_answers import UpdateParticipantAnswersIn
+from src.app.schemas.in_.user_answers import UpdateParticipantAnswersIn, GradeAnswersIn
+from src.app.schemas.out.analytics import QuizItemAnalysisOut
+from src.app.schemas.out.leaderboard import LeaderboardOut, LeaderboardEntryOut
 from src.app.schemas.out.quizzes import (
     PublishedQuizQuestionsOut,
     ParticipantsAnswersOut,
     QuizPasswordStatus,
     QuestionsByIdOut,
 )
-from src.app.schemas.out.user_answers import ParticipantAnswersOut
-from src.app.utils.get_quiz import get_quiz_by_id
+from src.app.schemas.out.user_answers import (
+    GradedAnswersOut,
+    ParticipantAnswersOut,
+    QueuedSubmissionOut,
+    SubmittedAnswersOut,
+    SubmissionStatusOut,
+)
+from src.app.tasks.submission_queue import SubmissionQueue
+from src.app.utils.content_encoding import accepts_encoding
+from src.app.utils.etag import make_etag, etag_matches, not_modified
+from src.app.utils.get_quiz import (
+    get_quiz_by_id,
+    get_answer_key,
+    get_published_quiz,
+    get_published_quiz_by_path,
+)
 from src.core.access_control import access_control, is_quiz_owner, is_admin
 from src.core.access_control.policies import check_quiz_password
-from src.core.database import get_session
+from src.core.cache.redis_client import RedisClient, get_redis
+from src.core.database import (
+    get_session,
+    get_participant_session,
+    get_export_session,
+)
+from src.core.excpetions import BadRequestException
 from src.core.fastapi.dependencies.auth import authentication_required
 
 router = APIRouter(prefix="/pub")
@@ -41,11 +73,20 @@ router = APIRouter(prefix="/pub")
 )
 async def check_quiz_password_status(
     quiz_path: Annotated[str, Path(min_length=3, max_length=30)],
-    db_session: AsyncSession = Depends(get_session),
+    redis_client: Annotated[RedisClient, Depends(get_redis)],
+    db_session: AsyncSession = Depends(get_participant_session),
 ) -> QuizPasswordStatus:
     quiz_repository = QuizRepository(db_session)
+    question_repository = QuestionRepository(db_session)
+    quiz = await get_published_quiz_by_path(
+        quiz_repository,
+        question_repository,
+        PublishedQuizCache(redis_client),
+        QuizPathCache(redis_client),
+        quiz_path,
+    )
     return await QuizController(quiz_repository).check_quiz_password_status(
-        quiz_path=quiz_path
+        quiz=quiz.snapshot
     )
 
 
@@ -53,43 +94,89 @@ async def check_quiz_password_status(
     "/{quiz_id}/get-questions",
     description="""get quiz questions if the quiz is activated & 
              check entered password if quiz is locked""",
+    response_model=PublishedQuizQuestionsOut,
 )
 async def get_published_quiz_questions(
     quiz_id: PositiveInt,
     quiz_password: QuizEnterPasswordIn,
-    db_session: AsyncSession = Depends(get_session),
-) -> PublishedQuizQuestionsOut:
+    redis_client: Annotated[RedisClient, Depends(get_redis)],
+    accept_encoding: Annotated[str, Header()] = "",
+    if_none_match: Annotated[str | None, Header()] = None,
+    db_session: AsyncSession = Depends(get_participant_session),
+) -> Response:
     quiz_repository = QuizRepository(db_session)
     question_repository = QuestionRepository(db_session)
-    quiz = await get_quiz_by_id(quiz_repository, quiz_id)
+    quiz = await get_published_quiz(
+        quiz_repository,
+        question_repository,
+        PublishedQuizCache(redis_client),
+        quiz_id,
+    )
 
     await access_control(
-        (check_quiz_password,), quiz=quiz, entered_password=quiz_password.password
+        (check_quiz_password,),
+        quiz=quiz.snapshot,
+        entered_password=quiz_password.password,
     )
     return await QuizController(quiz_repository).get_published_quiz_questions(
-        quiz=quiz, question_repository=question_repository
+        quiz=quiz,
+        accept_gzip=accepts_encoding(accept_encoding, "gzip"),
+        if_none_match=if_none_match,
     )
 
 
 @router.post(
     "/{quiz_id}",
-    description="if quiz started, participants can start answering to questions",
+    description="""if quiz started, participants can start answering to questions,
+             queued submissions are accepted with 202 and a submission id""",
 )
 async def answer_quiz_questions(
     quiz_id: PositiveInt,
     user_answers: UserQuestionAnswersIn,
-    db_session: AsyncSession = Depends(get_session),
-) -> MessageResponse:
+    response: Response,
+    redis_client: Annotated[RedisClient, Depends(get_redis)],
+    db_session: AsyncSession = Depends(get_participant_session),
+) -> SubmittedAnswersOut | QueuedSubmissionOut:
     quiz_repository = QuizRepository(db_session)
     question_repository = QuestionRepository(db_session)
     participant_repo = ParticipantRepo(db_session)
+    quiz = await get_published_quiz(
+        quiz_repository,
+        question_repository,
+        PublishedQuizCache(redis_client),
+        quiz_id,
+    )
+    answer_key = await get_answer_key(
+        question_repository, AnswerKeyCache(redis_client), quiz_id
+    )
 
-    return await QuizController(quiz_repository).answer_questions(
+    result = await QuizController(quiz_repository).answer_questions(
         user_answers=user_answers,
-        question_repository=question_repository,
+        quiz=quiz.snapshot,
+        answer_key=answer_key,
         participant_repo=participant_repo,
-        quiz_id=quiz_id,
+        quiz_revision=QuizRevision(redis_client),
+        submission_queue=SubmissionQueue(redis_client),
+        leaderboard=Leaderboard(redis_client),
     )
+    if isinstance(result, QueuedSubmissionOut):
+        response.status_code = status.HTTP_202_ACCEPTED
+    return result
+
+
+@router.get(
+    "/{quiz_id}/submission/{submission_id}",
+    description="check whether a queued submission is written to the database",
+)
+async def get_submission_status(
+    quiz_id: PositiveInt,
+    submission_id: Annotated[str, Path(max_length=64)],
+    redis_client: Annotated[RedisClient, Depends(get_redis)],
+) -> SubmissionStatusOut:
+    submission_status = await SubmissionQueue(redis_client).get_status(submission_id)
+    if submission_status is None or submission_status.quiz_id != quiz_id:
+        raise BadRequestException("submission not found", "submission_not_found")
+    return submission_status
 
 
 @router.patch(
@@ -99,6 +186,7 @@ async def answer_quiz_questions(
 async def update_participant_answers(
     quiz_id: PositiveInt,
     participant_answers: UpdateParticipantAnswersIn,
+    redis_client: Annotated[RedisClient, Depends(get_redis)],
     db_session: AsyncSession = Depends(get_session),
     token: TokenData = Depends(authentication_required),
 ) -> MessageResponse:
@@ -109,32 +197,231 @@ async def update_participant_answers(
     user_answers_repository = UserAnswersRepository(db_session)
     return await UserAnswersController(
         user_answers_repository
-    ).update_participant_answers(participant_answers=participant_answers)
+    ).update_participant_answers(
+        participant_answers=participant_answers,
+        quiz_id=quiz_id,
+        quiz_revision=QuizRevision(redis_client),
+        leaderboard=Leaderboard(redis_client),
+    )
+
+
+@router.patch(
+    "/{quiz_id}/grade/answers",
+    description="""grade answers of many participants at once, the batch is
+             rejected if an answer is scored above its question score""",
+)
+async def grade_participants_answers(
+    quiz_id: PositiveInt,
+    grades: GradeAnswersIn,
+    redis_client: Annotated[RedisClient, Depends(get_redis)],
+    db_session: AsyncSession = Depends(get_session),
+    token: TokenData = Depends(authentication_required),
+) -> GradedAnswersOut:
+    quiz_repository = QuizRepository(db_session)
+    quiz = await get_quiz_by_id(quiz_repository, quiz_id)
+    await access_control((is_admin, is_quiz_owner), user_info=token, quiz=quiz)
+
+    user_answers_repository = UserAnswersRepository(db_session)
+    return await UserAnswersController(user_answers_repository).grade_answers(
+        grades=grades,
+        quiz_id=quiz_id,
+        quiz_revision=QuizRevision(redis_client),
+        leaderboard=Leaderboard(redis_client),
+    )
 
 
 @router.get(
     "/{quiz_id}/all/answers",
-    description="get the score of all participant answers for a quiz",
+    description="""get the score of participant answers for a quiz, every
+             participant by default or one page at a time with limit, pass
+             next_cursor of a page as cursor to get the next one""",
+    response_model=ParticipantsAnswersOut,
 )
 async def get_all_participants_answers_with_score(
     quiz_id: PositiveInt,
+    response: Response,
+    redis_client: Annotated[RedisClient, Depends(get_redis)],
+    sort: ParticipantSort = ParticipantSort.TOTAL_SCORE,
+    order: SortOrder = SortOrder.DESC,
+    limit: Annotated[
+        int | None,
+        Query(ge=1, le=500, description="page size, every participant when not set"),
+    ] = None,
+    cursor: Annotated[str | None, Query(max_length=512)] = None,
+    ungraded: Annotated[
+        bool, Query(description="only participants with ungraded descriptive answers")
+    ] = False,
+    if_none_match: Annotated[str | None, Header()] = None,
     db_session: AsyncSession = Depends(get_session),
     token: TokenData = Depends(authentication_required),
-) -> ParticipantsAnswersOut:
+) -> ParticipantsAnswersOut | Response:
     quiz_repository = QuizRepository(db_session)
     quiz = await get_quiz_by_id(quiz_repository, quiz_id)
     await access_control((is_admin, is_quiz_owner), user_info=token, quiz=quiz)
 
+    content_revision, answers_revision = await QuizRevision(
+        redis_client
+    ).content_and_answers(quiz_id)
+    etag = make_etag(
+        quiz_id,
+        quiz.updated_at,
+        content_revision,
+        answers_revision,
+        sort,
+        order,
+        limit,
+        cursor,
+        ungraded,
+    )
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    response.headers["ETag"] = etag
+
     user_answers_repository = UserAnswersRepository(db_session)
     participant_repo = ParticipantRepo(db_session)
-    question_repository = QuestionRepository(db_session)
 
     return await UserAnswersController(
         user_answers_repository
     ).get_participant_answers_with_score(
         quiz_id=quiz_id,
         participant_repo=participant_repo,
-        question_repository=question_repository,
+        total_quiz_score=quiz.total_score,
+        sort=sort,
+        order=order,
+        limit=limit,
+        cursor=cursor,
+        ungraded_only=ungraded,
+    )
+
+
+@router.get(
+    "/{quiz_id}/export/answers",
+    description="download every participant answer of a quiz as csv or ndjson",
+    response_class=StreamingResponse,
+)
+async def export_participants_answers(
+    quiz_id: PositiveInt,
+    export_format: Annotated[ExportFormat, Query(alias="format")] = ExportFormat.CSV,
+    db_session: AsyncSession = Depends(get_export_session),
+    token: TokenData = Depends(authentication_required),
+) -> StreamingResponse:
+    quiz_repository = QuizRepository(db_session)
+    quiz = await get_quiz_by_id(quiz_repository, quiz_id)
+    await access_control((is_admin, is_quiz_owner), user_info=token, quiz=quiz)
+
+    user_answers_repository = UserAnswersRepository(db_session)
+    participant_repo = ParticipantRepo(db_session)
+    return await UserAnswersController(
+        user_answers_repository
+    ).export_participant_answers(
+        quiz_id=quiz_id,
+        participant_repo=participant_repo,
+        export_format=export_format,
+    )
+
+
+@router.get(
+    "/{quiz_id}/analytics/items",
+    description="""difficulty, discrimination and option distribution of each
+             question and the score percentiles of a quiz""",
+)
+async def get_quiz_item_analysis(
+    quiz_id: PositiveInt,
+    redis_client: Annotated[RedisClient, Depends(get_redis)],
+    db_session: AsyncSession = Depends(get_session),
+    token: TokenData = Depends(authentication_required),
+) -> QuizItemAnalysisOut:
+    quiz_repository = QuizRepository(db_session)
+    quiz = await get_quiz_by_id(quiz_repository, quiz_id)
+    await access_control((is_admin, is_quiz_owner), user_info=token, quiz=quiz)
+
+    user_answers_repository = UserAnswersRepository(db_session)
+    return await UserAnswersController(user_answers_repository).get_item_analysis(
+        quiz_id=quiz_id,
+        participant_repo=ParticipantRepo(db_session),
+        question_repository=QuestionRepository(db_session),
+        answer_key_cache=AnswerKeyCache(redis_client),
+        analysis_cache=ItemAnalysisCache(redis_client),
+        quiz_revision=QuizRevision(redis_client),
+    )
+
+
+@router.get(
+    "/{quiz_id}/leaderboard",
+    description="participants ranked by their total score, highest first",
+)
+async def get_quiz_leaderboard(
+    quiz_id: PositiveInt,
+    redis_client: Annotated[RedisClient, Depends(get_redis)],
+    offset: Annotated[int, Query(ge=0)] = 0,
+    limit: Annotated[int, Query(ge=1, le=500)] = 10,
+    db_session: AsyncSession = Depends(get_session),
+    token: TokenData = Depends(authentication_required),
+) -> LeaderboardOut:
+    quiz_repository = QuizRepository(db_session)
+    quiz = await get_quiz_by_id(quiz_repository, quiz_id)
+    await access_control((is_admin, is_quiz_owner), user_info=token, quiz=quiz)
+
+    user_answers_repository = UserAnswersRepository(db_session)
+    return await UserAnswersController(user_answers_repository).get_leaderboard(
+        quiz_id=quiz_id,
+        leaderboard=Leaderboard(redis_client),
+        offset=offset,
+        limit=limit,
+    )
+
+
+@router.get(
+    "/{quiz_id}/leaderboard/range",
+    description="leaderboard entries of participants scored between two scores",
+)
+async def get_quiz_leaderboard_score_range(
+    quiz_id: PositiveInt,
+    min_score: float,
+    max_score: float,
+    redis_client: Annotated[RedisClient, Depends(get_redis)],
+    offset: Annotated[int, Query(ge=0)] = 0,
+    limit: Annotated[int, Query(ge=1, le=500)] = 100,
+    db_session: AsyncSession = Depends(get_session),
+    token: TokenData = Depends(authentication_required),
+) -> LeaderboardOut:
+    quiz_repository = QuizRepository(db_session)
+    quiz = await get_quiz_by_id(quiz_repository, quiz_id)
+    await access_control((is_admin, is_quiz_owner), user_info=token, quiz=quiz)
+
+    user_answers_repository = UserAnswersRepository(db_session)
+    return await UserAnswersController(
+        user_answers_repository
+    ).get_leaderboard_score_range(
+        quiz_id=quiz_id,
+        leaderboard=Leaderboard(redis_client),
+        min_score=min_score,
+        max_score=max_score,
+        offset=offset,
+        limit=limit,
+    )
+
+
+@router.get(
+    "/{quiz_id}/leaderboard/participant/{participant_id}",
+    description="rank and score of one participant in the quiz leaderboard",
+)
+async def get_participant_leaderboard_rank(
+    quiz_id: PositiveInt,
+    participant_id: PositiveInt,
+    redis_client: Annotated[RedisClient, Depends(get_redis)],
+    db_session: AsyncSession = Depends(get_session),
+    token: TokenData = Depends(authentication_required),
+) -> LeaderboardEntryOut:
+    quiz_repository = QuizRepository(db_session)
+    quiz = await get_quiz_by_id(quiz_repository, quiz_id)
+    await access_control((is_admin, is_quiz_owner), user_info=token, quiz=quiz)
+
+    user_answers_repository = UserAnswersRepository(db_session)
+    return await UserAnswersController(user_answers_repository).get_leaderboard_rank(
+        quiz_id=quiz_id,
+        participant_id=participant_id,
+        leaderboard=Leaderboard(redis_client),
     )
 
 
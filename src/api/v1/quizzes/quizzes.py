@@ -1,7 +1,10 @@
-from fastapi import APIRouter, Depends
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, Header, Response
 from pydantic import PositiveInt
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from src.app.cache import PublishedQuizCache, QuizRevision, Leaderboard
 from src.app.controllers import QuestionController, QuizController
 from src.app.repositories import QuizRepository, QuestionRepository
 from src.app.schemas.extra.success import MessageResponse
@@ -25,8 +28,10 @@ from src.app.schemas.out.quizzes import (
     QuizInfoOut,
     QuizActivationStatus,
 )
+from src.app.utils.etag import make_etag, etag_matches, not_modified
 from src.app.utils.get_quiz import get_quiz_by_id
 from src.core.access_control import access_control, is_quiz_owner, is_admin
+from src.core.cache.redis_client import RedisClient, get_redis
 from src.core.database import get_session
 from src.core.fastapi.dependencies.auth import authentication_required
 
@@ -57,6 +62,7 @@ async def get_user_quizzes(
 @router.delete("/delete/{quiz_id}", description="delete a quiz by id")
 async def delete_quiz(
     quiz_id: PositiveInt,
+    redis_client: Annotated[RedisClient, Depends(get_redis)],
     token: TokenData = Depends(authentication_required),
     db_session: AsyncSession = Depends(get_session),
 ) -> MessageResponse:
@@ -64,7 +70,11 @@ async def delete_quiz(
     quiz = await get_quiz_by_id(quiz_repository, quiz_id)
     await access_control((is_admin, is_quiz_owner), user_info=token, quiz=quiz)
 
-    return await QuizController(quiz_repository).delete_quiz_by_id(quiz_id=quiz_id)
+    return await QuizController(quiz_repository).delete_quiz_by_id(
+        quiz_id=quiz_id,
+        published_cache=PublishedQuizCache(redis_client),
+        leaderboard=Leaderboard(redis_client),
+    )
 
 
 @router.post(
@@ -73,6 +83,7 @@ async def delete_quiz(
 )
 async def add_short_descriptive_question(
     question: AddShortDescriptiveQuestionIn,
+    redis_client: Annotated[RedisClient, Depends(get_redis)],
     token: TokenData = Depends(authentication_required),
     db_session: AsyncSession = Depends(get_session),
 ) -> DescriptiveQuestionOut:
@@ -86,6 +97,7 @@ async def add_short_descriptive_question(
         answer=question.answer,
         quiz_id=question.quiz_id,
         question_score=question.score,
+        published_cache=PublishedQuizCache(redis_client),
     )
 
 
@@ -95,6 +107,7 @@ async def add_short_descriptive_question(
 )
 async def add_long_descriptive_question(
     question: AddLongDescriptiveQuestionIn,
+    redis_client: Annotated[RedisClient, Depends(get_redis)],
     token: TokenData = Depends(authentication_required),
     db_session: AsyncSession = Depends(get_session),
 ) -> DescriptiveQuestionOut:
@@ -108,6 +121,7 @@ async def add_long_descriptive_question(
         answer=question.answer,
         quiz_id=question.quiz_id,
         question_score=question.score,
+        published_cache=PublishedQuizCache(redis_client),
     )
 
 
@@ -116,6 +130,7 @@ async def add_long_descriptive_question(
 )
 async def add_multiple_option_question(
     question: AddMultipleOptionQuestionIn,
+    redis_client: Annotated[RedisClient, Depends(get_redis)],
     token: TokenData = Depends(authentication_required),
     db_session: AsyncSession = Depends(get_session),
 ) -> MultipleOptionQuestionOut:
@@ -125,7 +140,7 @@ async def add_multiple_option_question(
 
     question_repository = QuestionRepository(db_session)
     return await QuestionController(question_repository).add_multiple_option_question(
-        question=question
+        question=question, published_cache=PublishedQuizCache(redis_client)
     )
 
 
@@ -151,6 +166,7 @@ async def get_all_quiz_questions(
 async def delete_question_by_id(
     quiz_id: PositiveInt,
     question_id: PositiveInt,
+    redis_client: Annotated[RedisClient, Depends(get_redis)],
     token: TokenData = Depends(authentication_required),
     db_session: AsyncSession = Depends(get_session),
 ) -> MessageResponse:
@@ -160,7 +176,10 @@ async def delete_question_by_id(
 
     question_repository = QuestionRepository(db_session)
     return await QuestionController(question_repository).delete_question_by_id(
-        question_id=question_id
+        question_id=question_id,
+        quiz_id=quiz_id,
+        published_cache=PublishedQuizCache(redis_client),
+        leaderboard=Leaderboard(redis_client),
     )
 
 
@@ -168,6 +187,7 @@ async def delete_question_by_id(
 async def set_quiz_password(
     quiz_id: PositiveInt,
     password_setting: QuizPasswordIn,
+    redis_client: Annotated[RedisClient, Depends(get_redis)],
     token: TokenData = Depends(authentication_required),
     db_session: AsyncSession = Depends(get_session),
 ) -> MessageResponse:
@@ -179,6 +199,7 @@ async def set_quiz_password(
         password=password_setting.password,
         quiz_lock=password_setting.quiz_lock,
         quiz_id=quiz_id,
+        published_cache=PublishedQuizCache(redis_client),
     )
 
 
@@ -186,6 +207,7 @@ async def set_quiz_password(
 async def update_quiz_settings(
     quiz_id: PositiveInt,
     quiz_setting: QuizSettingIn,
+    redis_client: Annotated[RedisClient, Depends(get_redis)],
     token: TokenData = Depends(authentication_required),
     db_session: AsyncSession = Depends(get_session),
 ) -> QuizSettingOut:
@@ -194,20 +216,31 @@ async def update_quiz_settings(
     await access_control((is_admin, is_quiz_owner), user_info=token, quiz=quiz)
 
     return await QuizController(quiz_repository).update_quiz_settings(
-        quiz_id=quiz_id, settings=quiz_setting
+        quiz_id=quiz_id,
+        settings=quiz_setting,
+        published_cache=PublishedQuizCache(redis_client),
     )
 
 
-@router.get("/{quiz_id}")
+@router.get("/{quiz_id}", response_model=QuizSettingOut)
 async def get_quiz_settings(
     quiz_id: PositiveInt,
+    response: Response,
+    redis_client: Annotated[RedisClient, Depends(get_redis)],
+    if_none_match: Annotated[str | None, Header()] = None,
     token: TokenData = Depends(authentication_required),
     db_session: AsyncSession = Depends(get_session),
-) -> QuizSettingOut:
+) -> QuizSettingOut | Response:
     quiz_repository = QuizRepository(db_session)
     quiz = await get_quiz_by_id(quiz_repository, quiz_id)
     await access_control((is_admin, is_quiz_owner), user_info=token, quiz=quiz)
 
+    content_revision = await QuizRevision(redis_client).content(quiz_id)
+    etag = make_etag(quiz_id, quiz.updated_at, content_revision)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    response.headers["ETag"] = etag
+
     return await QuizController(quiz_repository).get_quiz_settings(quiz=quiz)
 
 
@@ -217,6 +250,7 @@ async def get_quiz_settings(
 )
 async def change_quiz_activation_status(
     quiz_id: PositiveInt,
+    redis_client: Annotated[RedisClient, Depends(get_redis)],
     token: TokenData = Depends(authentication_required),
     db_session: AsyncSession = Depends(get_session),
 ) -> QuizActivationStatus:
@@ -224,7 +258,12 @@ async def change_quiz_activation_status(
     quiz = await get_quiz_by_id(quiz_repository, quiz_id)
     await access_control((is_admin, is_quiz_owner), user_info=token, quiz=quiz)
 
-    return await QuizController(quiz_repository).change_quiz_activation(quiz_id=quiz_id)
+    question_repository = QuestionRepository(db_session)
+    return await QuizController(quiz_repository).change_quiz_activation(
+        quiz_id=quiz_id,
+        question_repository=question_repository,
+        published_cache=PublishedQuizCache(redis_client),
+    )
 
 
 @router.put("/{quiz_id}/edit/question/{question_id}/descriptive")
@@ -232,6 +271,7 @@ async def update_descriptive_question(
     quiz_id: PositiveInt,
     question_id: PositiveInt,
     question: UpdateDescriptiveQuestionIn,
+    redis_client: Annotated[RedisClient, Depends(get_redis)],
     token: TokenData = Depends(authentication_required),
     db_session: AsyncSession = Depends(get_session),
 ) -> DescriptiveQuestionOut:
@@ -245,6 +285,7 @@ async def update_descriptive_question(
         question_text=question.text,
         answer=question.answer,
         new_score=question.new_score,
+        published_cache=PublishedQuizCache(redis_client),
     )
 
 
@@ -253,6 +294,7 @@ async def update_multiple_option_question(
     quiz_id: PositiveInt,
     question_id: PositiveInt,
     question: UpdateMultipleOptionQuestionIn,
+    redis_client: Annotated[RedisClient, Depends(get_redis)],
     token: TokenData = Depends(authentication_required),
     db_session: AsyncSession = Depends(get_session),
 ) -> MultipleOptionQuestionOut:
@@ -263,4 +305,9 @@ async def update_multiple_option_question(
     question_repository = QuestionRepository(db_session)
     return await QuestionController(
         question_repository
-    ).update_multiple_option_question(question_id=question_id, question=question)
+    ).update_multiple_option_question(
+        question_id=question_id,
+        question=question,
+        published_cache=PublishedQuizCache(redis_client),
+        leaderboard=Leaderboard(redis_client),
+    )
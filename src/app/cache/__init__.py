@@ -0,0 +1,7 @@
+from .revision import QuizRevision
+from .answer_key import AnswerKeyCache, build_answer_key
+from .quiz_path import QuizPathCache
+from .published_quiz import (PublishedQuizCache, CompiledPublishedQuiz,
+                             build_published_snapshot, compile_published_quiz)
+from .item_analysis import ItemAnalysisCache
+from .leaderboard import Leaderboard
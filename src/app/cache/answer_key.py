@@ -0,0 +1,96 @@
+from pydantic import ValidationError
+
+from src.app.models import Question
+from src.app.models.enums_ import QuestionType
+from src.app.schemas.extra.answer_key import QuizAnswerKey, AnswerKeyQuestion
+from src.core.cache.memory_cache import MemoryCache
+from src.core.cache.stats import record_lookup
+from src.core.cache.redis_client import RedisClient
+from src.core.config import settings
+from .revision import QuizRevision
+
+# keyed by (quiz_id, content revision), submissions are graded with the key, so
+# every lookup checks the current revision instead of trusting a local ttl
+local_answer_keys = MemoryCache(
+    max_size=1024, ttl=settings.PUBLISHED_QUIZ_CACHE_TTL, name="answer_key_local"
+)
+
+
+def build_answer_key(
+    quiz_id: int, questions: list[Question], revision: int
+) -> QuizAnswerKey:
+    answer_key_questions = {}
+    for question in questions:
+        answer_key_question = AnswerKeyQuestion(
+            question_type=question.question_type, score=question.score
+        )
+        if question.question_type == QuestionType.MULTIPLE_OPTIONS:
+            answer_key_question.option_ids = [o.id for o in question.multiple_options]
+            if question.correct_option:
+                answer_key_question.correct_option_id = (
+                    question.correct_option.option_id
+                )
+        answer_key_questions[question.id] = answer_key_question
+
+    return QuizAnswerKey(
+        quiz_id=quiz_id, revision=revision, questions=answer_key_questions
+    )
+
+
+class AnswerKeyCache:
+    def __init__(self, redis_client: RedisClient):
+        self.redis_client = redis_client
+        self.revision = QuizRevision(redis_client)
+
+    @staticmethod
+    def _key(quiz_id: int, revision: int) -> str:
+        return f"answer_key:{quiz_id}:{revision}"
+
+    async def get(self, quiz_id: int) -> QuizAnswerKey | None:
+        revision = await self.revision.content(quiz_id)
+        answer_key = local_answer_keys.get((quiz_id, revision))
+        if answer_key is not None:
+            return answer_key
+
+        raw_answer_key = await self.redis_client.get(self._key(quiz_id, revision))
+        if raw_answer_key is None:
+            record_lookup("answer_key", False)
+            return None
+        try:
+            answer_key = QuizAnswerKey.model_validate_json(raw_answer_key)
+        except ValidationError:
+            record_lookup("answer_key", False)
+            return None
+
+        record_lookup("answer_key", True)
+
+        local_answer_keys.set((quiz_id, revision), answer_key)
+        return answer_key
+
+    async def set(self, answer_key: QuizAnswerKey) -> QuizAnswerKey:
+        """
+        cache the key under its revision, a key built before an edit is returned
+        but not stored, and one stored after a concurrent edit is never read
+        """
+        if await self.revision.content(answer_key.quiz_id) != answer_key.revision:
+            return answer_key
+
+        await self.redis_client.set(
+            self._key(answer_key.quiz_id, answer_key.revision),
+            answer_key.model_dump_json(),
+            settings.PUBLISHED_QUIZ_CACHE_TTL,
+        )
+        local_answer_keys.set((answer_key.quiz_id, answer_key.revision), answer_key)
+        return answer_key
+
+    async def invalidate(self, quiz_id: int) -> None:
+        """
+        drop the keys of the current and the previous revision, lookups already
+        miss keys of older revisions once the revision is bumped
+        """
+        revision = await self.revision.content(quiz_id)
+        local_answer_keys.delete((quiz_id, revision))
+        local_answer_keys.delete((quiz_id, revision - 1))
+        await self.redis_client.delete(
+            self._key(quiz_id, revision), self._key(quiz_id, revision - 1)
+        )
@@ -0,0 +1,47 @@
+from pydantic import ValidationError
+
+from src.app.schemas.out.analytics import QuizItemAnalysisOut
+from src.core.cache.stats import record_lookup
+from src.core.cache.redis_client import RedisClient
+from src.core.config import settings
+
+
+class ItemAnalysisCache:
+    """
+    item analysis of a quiz stored with the revisions it was computed from, it
+    is only served while neither the questions nor the answers have changed
+    """
+
+    def __init__(self, redis_client: RedisClient):
+        self.redis_client = redis_client
+
+    @staticmethod
+    def _key(quiz_id: int) -> str:
+        return f"item_analysis:{quiz_id}"
+
+    async def get(
+        self, quiz_id: int, content_revision: int, answers_revision: int
+    ) -> QuizItemAnalysisOut | None:
+        raw_analysis = await self.redis_client.get(self._key(quiz_id))
+        if raw_analysis is None:
+            record_lookup("item_analysis", False)
+            return None
+        try:
+            analysis = QuizItemAnalysisOut.model_validate_json(raw_analysis)
+        except ValidationError:
+            record_lookup("item_analysis", False)
+            return None
+
+        fresh = (analysis.content_revision, analysis.answers_revision) == (
+            content_revision,
+            answers_revision,
+        )
+        record_lookup("item_analysis", fresh)
+        return analysis if fresh else None
+
+    async def set(self, analysis: QuizItemAnalysisOut) -> None:
+        await self.redis_client.set(
+            self._key(analysis.quiz_id),
+            analysis.model_dump_json(),
+            settings.PUBLISHED_QUIZ_CACHE_TTL,
+        )
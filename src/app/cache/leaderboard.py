@@ -0,0 +1,181 @@
+import secrets
+
+from src.app.schemas.out.leaderboard import LeaderboardEntryOut
+from src.core.cache.redis_client import RedisClient
+
+# (participant_id, username, total_score)
+LeaderboardRow = tuple[int, str, float]
+
+
+class Leaderboard:
+    """
+    per-quiz redis sorted set of participant total scores, participant_scores
+    stays the source of truth and the set is rebuilt from it when it is missing
+    """
+
+    rebuild_chunk_size = 1000
+
+    def __init__(self, redis_client: RedisClient):
+        self.redis_client = redis_client
+
+    @staticmethod
+    def _key(quiz_id: int) -> str:
+        return f"leaderboard:{quiz_id}"
+
+    @staticmethod
+    def _usernames_key(quiz_id: int) -> str:
+        return f"leaderboard:{quiz_id}:usernames"
+
+    @staticmethod
+    def _empty_key(quiz_id: int) -> str:
+        return f"leaderboard:{quiz_id}:empty"
+
+    @staticmethod
+    def _generation_key(quiz_id: int) -> str:
+        return f"leaderboard:{quiz_id}:generation"
+
+    async def generation(self, quiz_id: int) -> int:
+        """
+        bumped by every update that finds the set missing and every invalidation,
+        read before the rows of a rebuild so the rebuild notices changes it missed
+        """
+        return int(await self.redis_client.get(self._generation_key(quiz_id)) or 0)
+
+    async def is_built(self, quiz_id: int) -> bool:
+        # redis drops empty sorted sets, a quiz without participants is marked
+        # as built with a key of its own
+        return bool(
+            await self.redis_client.exists(self._key(quiz_id), self._empty_key(quiz_id))
+        )
+
+    async def rebuild(
+        self, quiz_id: int, rows: list[LeaderboardRow], generation: int
+    ) -> bool:
+        """
+        fill temporary keys and swap them in, readers never see a partial set,
+        nothing is swapped in and False returned when the generation moved past
+        the one read before the rows, they may miss those updates
+        """
+        suffix = secrets.token_hex(4)
+        if not rows:
+            empty_key = f"{self._empty_key(quiz_id)}:rebuild:{suffix}"
+            await self.redis_client.set(empty_key, 1)
+            return await self.redis_client.rename_if_equals(
+                self._generation_key(quiz_id),
+                generation,
+                {empty_key: self._empty_key(quiz_id)},
+                delete=(self._key(quiz_id), self._usernames_key(quiz_id)),
+            )
+
+        key = f"{self._key(quiz_id)}:rebuild:{suffix}"
+        usernames_key = f"{self._usernames_key(quiz_id)}:rebuild:{suffix}"
+        for start in range(0, len(rows), self.rebuild_chunk_size):
+            chunk = rows[start : start + self.rebuild_chunk_size]
+            await self.redis_client.sorted_set_add(
+                key, {participant_id: score for participant_id, _, score in chunk}
+            )
+            await self.redis_client.hash_set(
+                usernames_key,
+                {participant_id: username for participant_id, username, _ in chunk},
+            )
+        return await self.redis_client.rename_if_equals(
+            self._generation_key(quiz_id),
+            generation,
+            {usernames_key: self._usernames_key(quiz_id), key: self._key(quiz_id)},
+            delete=(self._empty_key(quiz_id),),
+        )
+
+    async def update(self, quiz_id: int, rows: list[LeaderboardRow]) -> None:
+        """
+        move participants to their current total score, skipped while the set is
+        not built because the next read rebuilds it from the database anyway, the
+        first participants of an empty leaderboard also leave it to that rebuild,
+        a skipped update moves the generation so a running rebuild starts over
+        """
+        if not rows:
+            return
+
+        added = await self.redis_client.sorted_set_add(
+            self._key(quiz_id),
+            {participant_id: score for participant_id, _, score in rows},
+            only_if_exists=True,
+            miss_counter=self._generation_key(quiz_id),
+            miss_delete=(self._empty_key(quiz_id),),
+        )
+        if added:
+            await self.redis_client.hash_set(
+                self._usernames_key(quiz_id),
+                {participant_id: username for participant_id, username, _ in rows},
+            )
+
+    async def invalidate(self, quiz_id: int) -> None:
+        await self.redis_client.incr(self._generation_key(quiz_id))
+        await self.redis_client.delete(
+            self._key(quiz_id), self._usernames_key(quiz_id), self._empty_key(quiz_id)
+        )
+
+    async def size(self, quiz_id: int) -> int:
+        return await self.redis_client.sorted_set_size(self._key(quiz_id))
+
+    async def top(
+        self, quiz_id: int, offset: int, limit: int
+    ) -> list[LeaderboardEntryOut]:
+        members = await self.redis_client.sorted_set_top(
+            self._key(quiz_id), offset, offset + limit - 1
+        )
+        return await self._entries(quiz_id, members)
+
+    async def score_range(
+        self,
+        quiz_id: int,
+        min_score: float,
+        max_score: float,
+        offset: int,
+        limit: int,
+    ) -> list[LeaderboardEntryOut]:
+        """participants scored between min_score and max_score, highest first"""
+        members = await self.redis_client.sorted_set_top_by_score(
+            self._key(quiz_id), max_score, min_score, offset, limit
+        )
+        return await self._entries(quiz_id, members)
+
+    async def rank(
+        self, quiz_id: int, participant_id: int
+    ) -> LeaderboardEntryOut | None:
+        score = await self.redis_client.sorted_set_score(
+            self._key(quiz_id), participant_id
+        )
+        if score is None:
+            return None
+        entries = await self._entries(quiz_id, [(str(participant_id), score)])
+        return entries[0]
+
+    async def _entries(
+        self, quiz_id: int, members: list[tuple]
+    ) -> list[LeaderboardEntryOut]:
+        if not members:
+            return []
+
+        # the first rank is one more than the number of higher scores, members
+        # after it are contiguous so later ranks follow from their position
+        first_rank = 1 + await self.redis_client.sorted_set_count(
+            self._key(quiz_id), f"({members[0][1]}", "+inf"
+        )
+        usernames = await self.redis_client.hash_get_many(
+            self._usernames_key(quiz_id), *(member for member, _ in members)
+        )
+
+        entries: list[LeaderboardEntryOut] = []
+        rank = first_rank
+        for position, ((member, score), username) in enumerate(zip(members, usernames)):
+            if entries and score != entries[-1].score:
+                rank = first_rank + position
+            entries.append(
+                LeaderboardEntryOut(
+                    rank=rank,
+                    participant_id=int(member),
+                    username=username.decode() if username is not None else "",
+                    score=score,
+                )
+            )
+        return entries
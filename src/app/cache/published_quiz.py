@@ -0,0 +1,199 @@
+import gzip
+from dataclasses import dataclass
+
+from pydantic import ValidationError
+
+from src.app.models import Quiz, Question
+from src.app.schemas.extra.published_quiz import PublishedQuizSnapshot
+from src.app.schemas.out.quizzes import PublishedQuizQuestionsOut
+from src.app.utils.etag import make_etag
+from src.core.cache.memory_cache import MemoryCache
+from src.core.cache.stats import record_lookup
+from src.core.cache.redis_client import RedisClient
+from src.core.config import settings
+from .answer_key import AnswerKeyCache
+from .revision import QuizRevision
+
+# per-worker tier in front of redis, kept short lived because other workers can
+# invalidate a quiz without this process knowing about it
+local_snapshots = MemoryCache(
+    max_size=1024, ttl=settings.PUBLISHED_QUIZ_LOCAL_TTL, name="published_quiz_local"
+)
+# a content revision never changes once compiled, so after the short lived tier
+# expires only the current revision is read again, not the whole quiz
+local_revisions = MemoryCache(
+    max_size=1024,
+    ttl=settings.PUBLISHED_QUIZ_CACHE_TTL,
+    name="published_quiz_revision_local",
+)
+
+
+def build_published_snapshot(
+    quiz: Quiz, questions: list[Question], revision: int
+) -> PublishedQuizSnapshot:
+    return PublishedQuizSnapshot(
+        quiz_id=quiz.id,
+        quiz_title=quiz.title,
+        quiz_path=quiz.quiz_path,
+        start_at=quiz.start_at,
+        end_at=quiz.end_at,
+        is_active=quiz.is_active,
+        need_password=quiz.need_password,
+        password=quiz.password,
+        shuffle_options=quiz.shuffle_options,
+        updated_at=quiz.updated_at,
+        revision=revision,
+        questions=questions,  # type: ignore
+    )
+
+
+@dataclass(frozen=True, slots=True)
+class CompiledPublishedQuiz:
+    """
+    a snapshot together with its ready to send response body, questions are also
+    kept as separate json chunks so shuffled quizzes are joined without encoding
+    """
+
+    snapshot: PublishedQuizSnapshot
+    head: bytes
+    question_chunks: tuple[bytes, ...]
+    body: bytes
+    body_gzip: bytes
+    etag: str
+
+    tail = b"]}"
+
+    def join(self, question_chunks: list[bytes]) -> bytes:
+        return self.head + b",".join(question_chunks) + self.tail
+
+
+def compile_published_quiz(snapshot: PublishedQuizSnapshot) -> CompiledPublishedQuiz:
+    empty_quiz = PublishedQuizQuestionsOut(
+        quiz_id=snapshot.quiz_id,
+        quiz_title=snapshot.quiz_title,
+        end_at=snapshot.end_at,
+        questions=[],
+    ).model_dump_json()
+    # drop the closing "]}" of the empty questions list to get the body prefix
+    head = empty_quiz.encode()[: -len(CompiledPublishedQuiz.tail)]
+    question_chunks = tuple(q.model_dump_json().encode() for q in snapshot.questions)
+    body = head + b",".join(question_chunks) + CompiledPublishedQuiz.tail
+
+    return CompiledPublishedQuiz(
+        snapshot=snapshot,
+        head=head,
+        question_chunks=question_chunks,
+        body=body,
+        body_gzip=gzip.compress(body),
+        etag=make_etag(snapshot.quiz_id, snapshot.updated_at, snapshot.revision),
+    )
+
+
+def load_compiled_quiz(
+    raw_snapshot: bytes,
+    head: bytes,
+    chunk_sizes: bytes,
+    body: bytes,
+    body_gzip: bytes,
+) -> CompiledPublishedQuiz:
+    """rebuild a compiled quiz from the bytes stored in redis without encoding it"""
+    snapshot = PublishedQuizSnapshot.model_validate_json(raw_snapshot)
+    question_chunks = []
+    start = len(head)
+    for size in map(int, filter(None, chunk_sizes.split(b","))):
+        question_chunks.append(body[start : start + size])
+        # skip the comma between questions
+        start += size + 1
+    return CompiledPublishedQuiz(
+        snapshot=snapshot,
+        head=head,
+        question_chunks=tuple(question_chunks),
+        body=body,
+        body_gzip=body_gzip,
+        etag=make_etag(snapshot.quiz_id, snapshot.updated_at, snapshot.revision),
+    )
+
+
+class PublishedQuizCache:
+    def __init__(self, redis_client: RedisClient):
+        self.redis_client = redis_client
+        self.revision = QuizRevision(redis_client)
+
+    @staticmethod
+    def _key(quiz_id: int, revision: int) -> str:
+        return f"published_quiz:{quiz_id}:{revision}"
+
+    async def get(self, quiz_id: int) -> CompiledPublishedQuiz | None:
+        compiled_quiz = local_snapshots.get(quiz_id)
+        if compiled_quiz is not None:
+            return compiled_quiz
+
+        revision = await self.revision.content(quiz_id)
+        compiled_quiz = local_revisions.get((quiz_id, revision))
+        if compiled_quiz is not None:
+            local_snapshots.set(quiz_id, compiled_quiz)
+            return compiled_quiz
+
+        fields = await self.redis_client.hash_get_many(
+            self._key(quiz_id, revision),
+            "snapshot",
+            "head",
+            "chunk_sizes",
+            "body",
+            "body_gzip",
+        )
+        if None in fields:
+            record_lookup("published_quiz", False)
+            return None
+
+        try:
+            compiled_quiz = load_compiled_quiz(*fields)
+        except ValidationError:
+            # written by an older version of the snapshot schema, rebuild it
+            record_lookup("published_quiz", False)
+            return None
+
+        record_lookup("published_quiz", True)
+        local_revisions.set((quiz_id, revision), compiled_quiz)
+        local_snapshots.set(quiz_id, compiled_quiz)
+        return compiled_quiz
+
+    async def set(self, snapshot: PublishedQuizSnapshot) -> CompiledPublishedQuiz:
+        """
+        cache the snapshot unless the quiz was edited while it was being built,
+        a stale snapshot is still returned to the caller but never stored
+        """
+        compiled_quiz = compile_published_quiz(snapshot)
+        if await self.revision.content(snapshot.quiz_id) != snapshot.revision:
+            return compiled_quiz
+
+        await self.redis_client.hash_set(
+            self._key(snapshot.quiz_id, snapshot.revision),
+            {
+                "snapshot": snapshot.model_dump_json(),
+                "head": compiled_quiz.head,
+                "chunk_sizes": ",".join(
+                    str(len(chunk)) for chunk in compiled_quiz.question_chunks
+                ),
+                "body": compiled_quiz.body,
+                "body_gzip": compiled_quiz.body_gzip,
+            },
+            settings.PUBLISHED_QUIZ_CACHE_TTL,
+        )
+        local_revisions.set((snapshot.quiz_id, snapshot.revision), compiled_quiz)
+        local_snapshots.set(snapshot.quiz_id, compiled_quiz)
+        return compiled_quiz
+
+    async def is_warm(self, quiz_id: int) -> bool:
+        revision = await self.revision.content(quiz_id)
+        return bool(await self.redis_client.exists(self._key(quiz_id, revision)))
+
+    async def invalidate(self, quiz_id: int) -> None:
+        """
+        move the quiz to a new content revision and drop every cache derived from
+        its content, the snapshot and the answer key
+        """
+        revision = await self.revision.bump_content(quiz_id)
+        local_snapshots.delete(quiz_id)
+        await self.redis_client.delete(self._key(quiz_id, revision - 1))
+        await AnswerKeyCache(self.redis_client).invalidate(quiz_id)
@@ -0,0 +1,45 @@
+from src.core.cache.memory_cache import MemoryCache
+from src.core.cache.stats import record_lookup
+from src.core.cache.redis_client import RedisClient
+from src.core.config import settings
+
+local_quiz_paths = MemoryCache(
+    max_size=4096, ttl=settings.PUBLISHED_QUIZ_LOCAL_TTL, name="quiz_path_local"
+)
+
+
+class QuizPathCache:
+    """
+    quiz_path to quiz id lookup, entries are not invalidated on path changes so
+    callers must compare the path against the quiz they load
+    """
+
+    def __init__(self, redis_client: RedisClient):
+        self.redis_client = redis_client
+
+    @staticmethod
+    def _key(quiz_path: str) -> str:
+        return f"quiz_path:{quiz_path}"
+
+    async def get(self, quiz_path: str) -> int | None:
+        quiz_id = local_quiz_paths.get(quiz_path)
+        if quiz_id is not None:
+            return quiz_id
+
+        quiz_id = await self.redis_client.get(self._key(quiz_path))
+        record_lookup("quiz_path", quiz_id is not None)
+        if quiz_id is None:
+            return None
+
+        local_quiz_paths.set(quiz_path, int(quiz_id))
+        return int(quiz_id)
+
+    async def set(self, quiz_path: str, quiz_id: int) -> None:
+        await self.redis_client.set(
+            self._key(quiz_path), quiz_id, settings.PUBLISHED_QUIZ_CACHE_TTL
+        )
+        local_quiz_paths.set(quiz_path, quiz_id)
+
+    async def delete(self, quiz_path: str) -> None:
+        local_quiz_paths.delete(quiz_path)
+        await self.redis_client.delete(self._key(quiz_path))
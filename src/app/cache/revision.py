@@ -0,0 +1,35 @@
+from src.core.cache.redis_client import RedisClient
+
+
+class QuizRevision:
+    """
+    per-quiz counters that change whenever quiz content (questions, settings) or
+    participant answers change, they are used to version caches and etags
+    """
+
+    def __init__(self, redis_client: RedisClient):
+        self.redis_client = redis_client
+
+    @staticmethod
+    def _content_key(quiz_id: int) -> str:
+        return f"quiz_revision:{quiz_id}:content"
+
+    @staticmethod
+    def _answers_key(quiz_id: int) -> str:
+        return f"quiz_revision:{quiz_id}:answers"
+
+    async def content(self, quiz_id: int) -> int:
+        revision = await self.redis_client.get(self._content_key(quiz_id))
+        return int(revision or 0)
+
+    async def content_and_answers(self, quiz_id: int) -> tuple[int, int]:
+        content, answers = await self.redis_client.mget(
+            self._content_key(quiz_id), self._answers_key(quiz_id)
+        )
+        return int(content or 0), int(answers or 0)
+
+    async def bump_content(self, quiz_id: int) -> int:
+        return await self.redis_client.incr(self._content_key(quiz_id))
+
+    async def bump_answers(self, quiz_id: int) -> int:
+        return await self.redis_client.incr(self._answers_key(quiz_id))
@@ -6,6 +6,7 @@ from src.app.schemas.extra.success import MessageResponse
 from src.app.schemas.extra.token import TokenOut
 from src.app.schemas.out.users import UserOut
 from src.core.excpetions import BadRequestException, UnAuthorizedException
+from src.core.executors import executors
 from src.core.security import JWTHandler, PasswordHandler
 from ...core.cache.redis_client import RedisClient
 
@@ -63,7 +64,9 @@ class AuthController:
             )
         await redis_client.delete(email)
 
-        hashed_password = self.password_handler.get_hashed(password)
+        hashed_password = await executors.run_in_thread(
+            self.password_handler.get_hashed, password
+        )
         user = await self.user_repository.create_user(
             email=email, password=hashed_password, full_name=full_name
         )
@@ -76,7 +79,9 @@ class AuthController:
 
     async def login_user(self, email: str, password: str) -> TokenOut:
         user = await self.user_repository.get_by_email(email)
-        if not user or not self.password_handler.verify(password, user.password):
+        if not user or not await executors.run_in_thread(
+            self.password_handler.verify, password, user.password
+        ):
             raise BadRequestException("Wrong Credentials", "wrong_credentials")
 
         payload_access = {"user_id": user.id, "is_admin": user.is_admin}
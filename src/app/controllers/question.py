@@ -1,5 +1,4 @@
-from pydantic import PositiveInt
-
+from src.app.cache import PublishedQuizCache, Leaderboard
 from src.app.models.enums_ import QuestionType
 from src.app.repositories import QuestionRepository
 from src.app.schemas.extra.success import MessageResponse
@@ -29,6 +28,7 @@ class QuestionController:
         question_score: float,
         answer: str | None,
         quiz_id: int,
+        published_cache: PublishedQuizCache,
     ) -> DescriptiveQuestionOut:
         question = await self.question_repository.create_descriptive_question(
             question=question_text,
@@ -37,6 +37,7 @@ class QuestionController:
             question_type=QuestionType.DESCRIPTIVE_SHORT_ANSWER,
             question_score=question_score,
         )
+        await published_cache.invalidate(quiz_id)
         return DescriptiveQuestionOut.model_validate(question)
 
     async def add_long_descriptive_question(
@@ -45,6 +46,7 @@ class QuestionController:
         question_score: float,
         answer: str | None,
         quiz_id: int,
+        published_cache: PublishedQuizCache,
     ) -> DescriptiveQuestionOut:
         question = await self.question_repository.create_descriptive_question(
             question=question_text,
@@ -53,32 +55,37 @@ class QuestionController:
             question_type=QuestionType.DESCRIPTIVE_LONG_ANSWER,
             question_score=question_score,
         )
+        await published_cache.invalidate(quiz_id)
         return DescriptiveQuestionOut.model_validate(question)
 
     async def add_multiple_option_question(
-        self, question: AddMultipleOptionQuestionIn
+        self, question: AddMultipleOptionQuestionIn, published_cache: PublishedQuizCache
     ) -> MultipleOptionQuestionOut:
         new_question = await self.question_repository.create_multiple_option(
             question=question.question,
             quiz_id=question.quiz_id,
             options=question.options,
             question_score=question.score,
+            correct_option_index=question.correct_option_index,
         )
-        correct_option_index: PositiveInt = question.correct_option_index
-        # get the option_id (database) at the index user specified is the correct option
-        correct_option_id = new_question.multiple_options[correct_option_index].id
-
-        await self.question_repository.create_correct_option(
-            question_id=new_question.id, option_id=correct_option_id
-        )
+        await published_cache.invalidate(question.quiz_id)
         return MultipleOptionQuestionOut.model_validate(new_question)
 
-    async def delete_question_by_id(self, question_id: int) -> MessageResponse:
+    async def delete_question_by_id(
+        self,
+        question_id: int,
+        quiz_id: int,
+        published_cache: PublishedQuizCache,
+        leaderboard: Leaderboard,
+    ) -> MessageResponse:
         try:
             await self.question_repository.delete_by_id(question_id=question_id)
         except ItemNotFoundError:
             raise BadRequestException("question not found", "question_not_found")
 
+        await published_cache.invalidate(quiz_id)
+        # every participant who answered the question lost its score
+        await leaderboard.invalidate(quiz_id)
         return MessageResponse(message="question deleted")
 
     async def get_all_quiz_questions(self, quiz_id: int) -> QuestionsOut:
@@ -94,6 +101,7 @@ class QuestionController:
         question_text: str,
         answer: str | None,
         new_score: float,
+        published_cache: PublishedQuizCache,
     ) -> DescriptiveQuestionOut:
         try:
             question = await self.question_repository.get_descriptive_by_id(
@@ -108,6 +116,7 @@ class QuestionController:
             answer=answer,
             new_score=new_score,
         )
+        await published_cache.invalidate(updated_question.quiz_id)
         return DescriptiveQuestionOut.model_validate(updated_question)
 
     async def get_question_answers(self, quiz_id: int) -> QuestionsByIdOut:
@@ -116,11 +125,19 @@ class QuestionController:
         return QuestionsByIdOut(questions=questions_out)
 
     async def update_multiple_option_question(
-        self, question_id: int, question: UpdateMultipleOptionQuestionIn
+        self,
+        question_id: int,
+        question: UpdateMultipleOptionQuestionIn,
+        published_cache: PublishedQuizCache,
+        leaderboard: Leaderboard,
     ) -> MultipleOptionQuestionOut:
         question_object = await self.question_repository.get_multiple_option_by_id(
             question_id=question_id
         )
+        # the question is updated in place, keep what the scores depend on
+        previous_correct_option_id = question_object.correct_option.option_id
+        previous_score = question_object.score
+        previous_option_ids = {o.id for o in question_object.multiple_options}
 
         updated_question = (
             await self.question_repository.update_multiple_option_question(
@@ -139,7 +156,27 @@ class QuestionController:
                 "index out of range", "correct_answer_index_out_of_range"
             )
 
-        await self.question_repository.update_correct_option(
-            option_id=correct_option_id, question_id=updated_question.id
-        )
+        # answers are only re-graded when the correct option changes, a text or
+        # score edit keeps the manual overrides of is_correct
+        if correct_option_id != previous_correct_option_id:
+            await self.question_repository.update_correct_option(
+                option_id=correct_option_id, question_id=updated_question.id
+            )
+        elif updated_question.score != previous_score:
+            await self.question_repository.rescore_question(updated_question.id)
+        else:
+            await self.question_repository.commit()
+
+        await published_cache.invalidate(updated_question.quiz_id)
+        removed_options = previous_option_ids - {
+            o.id for o in updated_question.multiple_options
+        }
+        if (
+            correct_option_id != previous_correct_option_id
+            or updated_question.score != previous_score
+            or removed_options
+        ):
+            # scores derived from the answers are stale
+            await published_cache.revision.bump_answers(updated_question.quiz_id)
+            await leaderboard.invalidate(updated_question.quiz_id)
         return MultipleOptionQuestionOut.model_validate(updated_question)
@@ -1,27 +1,45 @@
 import random
+import secrets
 
+from fastapi import Response
 
+from src.app.cache import (
+    PublishedQuizCache,
+    CompiledPublishedQuiz,
+    QuizRevision,
+    AnswerKeyCache,
+    Leaderboard,
+    build_published_snapshot,
+    build_answer_key,
+)
+from src.app.tasks.submission_queue import SubmissionQueue
 from src.app.repositories import (
     QuizRepository,
     QuestionRepository,
     ParticipantRepo,
 )
+from src.app.utils.leaderboard import update_leaderboard
+from src.core.config import SubmissionModes, settings as app_settings
 from src.core.excpetions import BadRequestException
 from src.core.excpetions.database import ItemNotFoundError
+from src.core.executors import executors
 from src.core.security.password import PasswordHandler
 from ..models import Quiz
 
+from ..schemas.extra.answer_key import QuizAnswerKey
+from ..schemas.extra.published_quiz import PublishedQuizSnapshot
+from ..schemas.extra.submission import QueuedSubmission
 from ..schemas.extra.success import MessageResponse
 from ..schemas.in_.quizzes import QuizSettingIn, UserQuestionAnswersIn
 from ..schemas.out.quizzes import (
     CreatedQuizOut,
     QuizSettingOut,
-    PublishedQuizQuestionsOut,
     QuizPasswordStatus,
     CreatedQuizOutList,
     QuizInfoOut,
     QuizActivationStatus,
 )
+from ..schemas.out.user_answers import QueuedSubmissionOut, SubmittedAnswersOut
 
 # from ..utils.get_question_models import get_published_question_model_by_type
 from ..utils.quiz_validations import (
@@ -29,6 +47,8 @@ from ..utils.quiz_validations import (
     validate_quiz_is_started,
     check_quiz_dates,
 )
+from ..utils.etag import etag_matches, not_modified
+from ..utils.grading import grade_multiple_option_answers
 from ..utils.random_string import get_random_string
 from ..utils.validate_questions import (
     validate_answer_option_questions,
@@ -54,20 +74,32 @@ class QuizController:
         quizzes = CreatedQuizOutList.validate_python(quiz_objects)
         return quizzes
 
-    async def delete_quiz_by_id(self, quiz_id: int) -> MessageResponse:
+    async def delete_quiz_by_id(
+        self,
+        quiz_id: int,
+        published_cache: PublishedQuizCache,
+        leaderboard: Leaderboard,
+    ) -> MessageResponse:
         try:
             await self.quiz_repository.delete_by_id(quiz_id=quiz_id)
         except ItemNotFoundError:
             raise BadRequestException("Bad action", "bad_action")
 
+        await published_cache.invalidate(quiz_id)
+        await leaderboard.invalidate(quiz_id)
         return MessageResponse(message="deleted")
 
     async def set_quiz_password(
-        self, password: str, quiz_lock: bool, quiz_id: int
+        self,
+        password: str,
+        quiz_lock: bool,
+        quiz_id: int,
+        published_cache: PublishedQuizCache,
     ) -> MessageResponse:
         quiz = await self.quiz_repository.update_quiz_password(
             password=password, quiz_lock=quiz_lock, quiz_id=quiz_id
         )
+        await published_cache.invalidate(quiz_id)
         if quiz:
             return MessageResponse(message="changed successfully")
 
@@ -75,7 +107,10 @@ class QuizController:
         return QuizSettingOut.model_validate(quiz)
 
     async def update_quiz_settings(
-        self, quiz_id: int, settings: QuizSettingIn
+        self,
+        quiz_id: int,
+        settings: QuizSettingIn,
+        published_cache: PublishedQuizCache,
     ) -> QuizSettingOut:
         settings = settings.model_dump(exclude_none=True)
         quiz_path_in = settings.get("quiz_path")
@@ -87,93 +122,135 @@ class QuizController:
         updated_quiz = await self.quiz_repository.update_settings(
             quiz_id=quiz_id, **settings
         )
+        await published_cache.invalidate(quiz_id)
         return QuizSettingOut.model_validate(updated_quiz)
 
-    async def change_quiz_activation(self, quiz_id: int) -> QuizActivationStatus:
-        quiz = await self.quiz_repository.get_by_id_with_questions(quiz_id=quiz_id)
+    async def change_quiz_activation(
+        self,
+        quiz_id: int,
+        question_repository: QuestionRepository,
+        published_cache: PublishedQuizCache,
+    ) -> QuizActivationStatus:
+        """
+        flip quiz activation, an activated quiz gets its published snapshot and
+        answer key built right away so participants never wait on the database
+        """
+        quiz = await self.quiz_repository.get_by_id_for_update(quiz_id=quiz_id)
 
         if quiz.is_active:
             await self.quiz_repository.update_settings(quiz_id=quiz_id, is_active=False)
+            await published_cache.invalidate(quiz_id)
             return QuizActivationStatus(message="quiz deactivated", is_active=False)
         else:
             validate_quiz_for_activation(quiz=quiz)
-            await self.quiz_repository.update_settings(quiz_id=quiz_id, is_active=True)
+            activated_quiz = await self.quiz_repository.update_settings(
+                quiz_id=quiz_id, is_active=True
+            )
+            revision = await published_cache.revision.bump_content(quiz_id)
+            questions = await question_repository.get_all_quiz_questions(
+                quiz_id=quiz_id
+            )
+            await published_cache.set(
+                build_published_snapshot(
+                    quiz=activated_quiz, questions=questions, revision=revision
+                )
+            )
+            await AnswerKeyCache(published_cache.redis_client).set(
+                build_answer_key(
+                    quiz_id=quiz_id, questions=questions, revision=revision
+                )
+            )
             return QuizActivationStatus(message="quiz activated", is_active=True)
 
     async def get_published_quiz_questions(
-        self, quiz: Quiz, question_repository: QuestionRepository
-    ) -> PublishedQuizQuestionsOut:
-        validate_quiz_is_started(quiz=quiz)
+        self, quiz: CompiledPublishedQuiz, accept_gzip: bool, if_none_match: str | None
+    ) -> Response:
+        """
+        send the pre-serialized questions body, only shuffled quizzes have their
+        question chunks joined per request
+        """
+        validate_quiz_is_started(quiz=quiz.snapshot)
+        if etag_matches(if_none_match, quiz.etag):
+            return not_modified(quiz.etag)
 
-        question_objects = await question_repository.get_all_quiz_questions(
-            quiz_id=quiz.id
-        )
-        if quiz.shuffle_options:
-            random.shuffle(question_objects)
-
-        return PublishedQuizQuestionsOut(
-            questions=question_objects,  # type: ignore
-            quiz_id=quiz.id,
-            quiz_title=quiz.title,
-            end_at=quiz.end_at,
-        )
+        headers = {"Vary": "Accept-Encoding", "ETag": quiz.etag}
+        if quiz.snapshot.shuffle_options:
+            question_chunks = list(quiz.question_chunks)
+            random.shuffle(question_chunks)
+            body = quiz.join(question_chunks)
+        elif accept_gzip:
+            body = quiz.body_gzip
+            headers["Content-Encoding"] = "gzip"
+        else:
+            body = quiz.body
 
-    async def check_quiz_password_status(self, quiz_path: str) -> QuizPasswordStatus:
-        try:
-            quiz = await self.quiz_repository.get_by_path(quiz_path=quiz_path)
-        except ItemNotFoundError:
-            raise BadRequestException("quiz not found", "quiz_not_found")
+        return Response(content=body, media_type="application/json", headers=headers)
 
+    async def check_quiz_password_status(
+        self, quiz: PublishedQuizSnapshot
+    ) -> QuizPasswordStatus:
         validate_quiz_is_started(quiz=quiz)
-        return QuizPasswordStatus(need_password=quiz.need_password, quiz_id=quiz.id)
+        return QuizPasswordStatus(
+            need_password=quiz.need_password, quiz_id=quiz.quiz_id
+        )
 
     async def answer_questions(
         self,
         user_answers: UserQuestionAnswersIn,
-        question_repository: QuestionRepository,
+        quiz: PublishedQuizSnapshot,
+        answer_key: QuizAnswerKey,
         participant_repo: ParticipantRepo,
-        quiz_id: int,
-    ) -> MessageResponse:
+        quiz_revision: QuizRevision,
+        submission_queue: SubmissionQueue,
+        leaderboard: Leaderboard,
+    ) -> SubmittedAnswersOut | QueuedSubmissionOut:
         """
-        get participant answers on a quiz and validate the question of answers exist on
-         database and connected to that particular quiz then save participant info and
-          its answers
+        validate participant answers against the cached answer key of the quiz,
+         then grade and save participant info and its answers or queue them for
+          the submission worker when submissions are written behind
         """
-        quiz = await self.quiz_repository.get_by_id(quiz_id)
         check_quiz_dates(quiz.start_at, quiz.end_at)
 
-        descriptive_question_ids: list[int] = [
-            q.question_id for q in user_answers.descriptive
-        ]
-        multiple_options_question_ids: list[int] = [
-            q.question_id for q in user_answers.multiple_options
-        ]
-
-        descriptive_questions = (
-            await question_repository.get_descriptive_questions_by_ids(
-                question_ids=descriptive_question_ids, quiz_id=quiz_id
-            )
-        )
-        multiple_option_questions = (
-            await question_repository.get_options_questions_by_ids(
-                question_ids=multiple_options_question_ids, quiz_id=quiz_id
-            )
-        )
-
         validate_answer_option_questions(
-            questions=multiple_option_questions,
-            user_answers=user_answers.multiple_options,
+            answer_key=answer_key, user_answers=user_answers.multiple_options
         )
         validate_answer_descriptive_question(
-            questions=descriptive_questions, user_answers=user_answers.descriptive
+            answer_key=answer_key, user_answers=user_answers.descriptive
         )
         unique_username = (
             f"{user_answers.participant_info.username}" f"+{get_random_string()}"
         )
-        await participant_repo.add_participant_info_with_answers(
+        if app_settings.SUBMISSION_MODE == SubmissionModes.QUEUE:
+            # graded by the submission worker against the correct options at the
+            # time the answers are written
+            submission = QueuedSubmission(
+                submission_id=secrets.token_urlsafe(16),
+                quiz_id=quiz.quiz_id,
+                username=unique_username,
+                descriptive=user_answers.descriptive,
+                multiple_options=[
+                    a.model_dump() for a in user_answers.multiple_options
+                ],
+            )
+            await submission_queue.enqueue(submission)
+            return QueuedSubmissionOut(
+                message="queued", submission_id=submission.submission_id
+            )
+
+        if len(user_answers.multiple_options) <= app_settings.GRADING_INLINE_LIMIT:
+            graded_answers = grade_multiple_option_answers(
+                answer_key, user_answers.multiple_options
+            )
+        else:
+            graded_answers = await executors.run_in_process(
+                grade_multiple_option_answers, answer_key, user_answers.multiple_options
+            )
+        participant_id = await participant_repo.add_participant_info_with_answers(
             username=unique_username,
-            quiz_id=quiz_id,
+            quiz_id=quiz.quiz_id,
             descriptive_answers=user_answers.descriptive,
-            multiple_option_answers=user_answers.multiple_options,
+            multiple_option_answers=graded_answers,
         )
-        return MessageResponse(message="accepted")
+        await quiz_revision.bump_answers(quiz.quiz_id)
+        await update_leaderboard(participant_repo.scores, leaderboard, [participant_id])
+        return SubmittedAnswersOut(message="accepted", participant_id=participant_id)
@@ -1,17 +1,43 @@
+from fastapi.responses import StreamingResponse
+
+from src.app.cache import QuizRevision, AnswerKeyCache, ItemAnalysisCache, Leaderboard
+from src.app.models.enums_ import ParticipantSort, SortOrder, ExportFormat
 from src.app.repositories import (
     UserAnswersRepository,
     ParticipantRepo,
     QuestionRepository,
 )
 from src.app.schemas.extra.success import MessageResponse
-from src.app.schemas.in_.user_answers import UpdateParticipantAnswersIn
+from src.app.schemas.in_.user_answers import UpdateParticipantAnswersIn, GradeAnswersIn
+from src.app.schemas.out.analytics import QuizItemAnalysisOut
+from src.app.schemas.out.leaderboard import LeaderboardOut, LeaderboardEntryOut
 from src.app.schemas.out.quizzes import (
     UserAnswersWithScoreOutList,
     ParticipantsAnswersOut,
 )
-from src.app.schemas.out.user_answers import ParticipantAnswersOut
+from src.app.schemas.out.user_answers import ParticipantAnswersOut, GradedAnswersOut
+from src.app.utils.cursor import (
+    encode_cursor,
+    decode_cursor,
+    cursor_number,
+    cursor_string,
+    cursor_datetime,
+    cursor_id,
+)
+from src.app.utils.export import render_csv, render_ndjson
+from src.app.utils.get_quiz import get_answer_key
+from src.app.utils.item_analysis import analyze_items
+from src.app.utils.leaderboard import ensure_leaderboard, update_leaderboard
 from src.core.excpetions import BadRequestException
-from src.core.excpetions.database import ItemNotFoundError
+from src.core.excpetions.database import ItemNotFoundError, InvalidGradesError
+from src.core.executors import executors
+
+# how the sort value of a pagination cursor is read back for each sort
+CURSOR_SORT_VALUES = {
+    ParticipantSort.TOTAL_SCORE: cursor_number,
+    ParticipantSort.USERNAME: cursor_string,
+    ParticipantSort.SUBMITTED_AT: cursor_datetime,
+}
 
 
 class UserAnswersController:
@@ -19,7 +45,11 @@ class UserAnswersController:
         self.answers_repository = answers_repository
 
     async def update_participant_answers(
-        self, participant_answers: UpdateParticipantAnswersIn
+        self,
+        participant_answers: UpdateParticipantAnswersIn,
+        quiz_id: int,
+        quiz_revision: QuizRevision,
+        leaderboard: Leaderboard,
     ) -> MessageResponse:
         if participant_answers.descriptive:
             await self.update_descriptive_answers(participant_answers)
@@ -30,8 +60,48 @@ class UserAnswersController:
                 ids=participant_answers.multiple_options,
             )
 
+        await quiz_revision.bump_answers(quiz_id)
+        await update_leaderboard(
+            self.answers_repository.scores,
+            leaderboard,
+            [participant_answers.participant_id],
+        )
         return MessageResponse(message="updated")
 
+    async def grade_answers(
+        self,
+        grades: GradeAnswersIn,
+        quiz_id: int,
+        quiz_revision: QuizRevision,
+        leaderboard: Leaderboard,
+    ) -> GradedAnswersOut:
+        descriptive = {g.answer_id: g.score for g in grades.descriptive}
+        multiple_options = {g.answer_id: g.is_correct for g in grades.multiple_options}
+        try:
+            participant_ids = await self.answers_repository.grade_answers(
+                quiz_id=quiz_id,
+                descriptive=descriptive,
+                multiple_options=multiple_options,
+            )
+        except InvalidGradesError as e:
+            raise BadRequestException(
+                "answers are not in the quiz or scored above their question score"
+                f", descriptive: {e.descriptive_ids[:50]}"
+                f", multiple options: {e.multiple_option_ids[:50]}",
+                "invalid_grades",
+            )
+
+        await quiz_revision.bump_answers(quiz_id)
+        await update_leaderboard(
+            self.answers_repository.scores, leaderboard, list(participant_ids)
+        )
+        return GradedAnswersOut(
+            message="graded",
+            descriptive_count=len(descriptive),
+            multiple_option_count=len(multiple_options),
+            participant_count=len(participant_ids),
+        )
+
     async def update_descriptive_answers(
         self, participant_answers: UpdateParticipantAnswersIn
     ):
@@ -49,21 +119,98 @@ class UserAnswersController:
         self,
         quiz_id: int,
         participant_repo: ParticipantRepo,
-        question_repository: QuestionRepository,
+        total_quiz_score: float,
+        sort: ParticipantSort = ParticipantSort.TOTAL_SCORE,
+        order: SortOrder = SortOrder.DESC,
+        limit: int | None = None,
+        cursor: str | None = None,
+        ungraded_only: bool = False,
     ) -> ParticipantsAnswersOut:
+        """every participant without a limit, otherwise one page of them"""
+        after = None
+        if cursor is not None:
+            cursor_sort, sort_value, participant_id = decode_cursor(
+                cursor, ParticipantSort, CURSOR_SORT_VALUES[sort], cursor_id
+            )
+            if cursor_sort != sort:
+                raise BadRequestException("invalid cursor", "invalid_cursor")
+            after = (sort_value, participant_id)
+
+        # one extra row tells whether there is a next page
         participants_answers = (
-            await participant_repo.get_participant_answers_with_score(quiz_id=quiz_id)
-        )
-        quiz_score = await question_repository.total_quiz_questions_score(
-            quiz_id=quiz_id
+            await participant_repo.get_participant_answers_with_score(
+                quiz_id=quiz_id,
+                sort=sort,
+                order=order,
+                limit=None if limit is None else limit + 1,
+                after=after,
+                ungraded_only=ungraded_only,
+            )
         )
         participant_answers_out = UserAnswersWithScoreOutList.validate_python(
-            participants_answers
+            participants_answers[:limit]
         )
+
+        next_cursor = None
+        if limit is not None and len(participants_answers) > limit:
+            last = participant_answers_out[-1]
+            next_cursor = encode_cursor(
+                sort, getattr(last, sort.value), last.participant_id
+            )
         return ParticipantsAnswersOut(
             participant_answers=participant_answers_out,
-            total_quiz_score=quiz_score.total_quiz_score,
+            total_quiz_score=total_quiz_score,
+            next_cursor=next_cursor,
+        )
+
+    async def export_participant_answers(
+        self,
+        quiz_id: int,
+        participant_repo: ParticipantRepo,
+        export_format: ExportFormat,
+    ) -> StreamingResponse:
+        rows = participant_repo.stream_quiz_answers(quiz_id=quiz_id)
+        if export_format == ExportFormat.CSV:
+            content, media_type = render_csv(rows), "text/csv"
+        else:
+            content, media_type = render_ndjson(rows), "application/x-ndjson"
+
+        filename = f"quiz-{quiz_id}-answers.{export_format}"
+        return StreamingResponse(
+            content,
+            media_type=media_type,
+            headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+        )
+
+    async def get_item_analysis(
+        self,
+        quiz_id: int,
+        participant_repo: ParticipantRepo,
+        question_repository: QuestionRepository,
+        answer_key_cache: AnswerKeyCache,
+        analysis_cache: ItemAnalysisCache,
+        quiz_revision: QuizRevision,
+    ) -> QuizItemAnalysisOut:
+        """
+        item statistics of the quiz, computed again only after its questions,
+        answers or grades changed
+        """
+        content_revision, answers_revision = await quiz_revision.content_and_answers(
+            quiz_id
+        )
+        analysis = await analysis_cache.get(quiz_id, content_revision, answers_revision)
+        if analysis is not None:
+            return analysis
+
+        answer_key = await get_answer_key(
+            question_repository, answer_key_cache, quiz_id
+        )
+        answers = await participant_repo.get_answer_matrix(quiz_id=quiz_id)
+        analysis = await executors.run_in_thread(
+            analyze_items, answer_key, answers, content_revision, answers_revision
         )
+        await analysis_cache.set(analysis)
+        return analysis
 
     async def get_participant_answers(
         self,
@@ -79,3 +226,49 @@ class UserAnswersController:
             raise BadRequestException("participant not found", "participant_not_found")
 
         return ParticipantAnswersOut.model_validate(participant_answers)
+
+    async def get_leaderboard(
+        self, quiz_id: int, leaderboard: Leaderboard, offset: int, limit: int
+    ) -> LeaderboardOut:
+        await ensure_leaderboard(self.answers_repository.scores, leaderboard, quiz_id)
+        return LeaderboardOut(
+            quiz_id=quiz_id,
+            participant_count=await leaderboard.size(quiz_id),
+            entries=await leaderboard.top(quiz_id, offset=offset, limit=limit),
+        )
+
+    async def get_leaderboard_score_range(
+        self,
+        quiz_id: int,
+        leaderboard: Leaderboard,
+        min_score: float,
+        max_score: float,
+        offset: int,
+        limit: int,
+    ) -> LeaderboardOut:
+        if min_score > max_score:
+            raise BadRequestException(
+                "min_score is greater than max_score", "invalid_score_range"
+            )
+
+        await ensure_leaderboard(self.answers_repository.scores, leaderboard, quiz_id)
+        return LeaderboardOut(
+            quiz_id=quiz_id,
+            participant_count=await leaderboard.size(quiz_id),
+            entries=await leaderboard.score_range(
+                quiz_id,
+                min_score=min_score,
+                max_score=max_score,
+                offset=offset,
+                limit=limit,
+            ),
+        )
+
+    async def get_leaderboard_rank(
+        self, quiz_id: int, participant_id: int, leaderboard: Leaderboard
+    ) -> LeaderboardEntryOut:
+        await ensure_leaderboard(self.answers_repository.scores, leaderboard, quiz_id)
+        entry = await leaderboard.rank(quiz_id, participant_id)
+        if entry is None:
+            raise BadRequestException("participant not found", "participant_not_found")
+        return entry
@@ -1,3 +1,4 @@
 from .quizzes import (Descriptive, MultipleOption, Question, Quiz,
-                      CorrectOption, UserMultipleOptionAnswer, UserDescriptiveAnswer, Participant)
+                      CorrectOption, UserMultipleOptionAnswer, UserDescriptiveAnswer, Participant,
+                      ParticipantScore)
 from .user import User
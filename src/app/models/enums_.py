@@ -5,3 +5,25 @@ class QuestionType(StrEnum):
     DESCRIPTIVE_LONG_ANSWER = auto()
     DESCRIPTIVE_SHORT_ANSWER = auto()
     MULTIPLE_OPTIONS = auto()
+
+
+class SubmissionStatus(StrEnum):
+    PENDING = auto()
+    PERSISTED = auto()
+    FAILED = auto()
+
+
+class ParticipantSort(StrEnum):
+    TOTAL_SCORE = auto()
+    USERNAME = auto()
+    SUBMITTED_AT = auto()
+
+
+class SortOrder(StrEnum):
+    ASC = auto()
+    DESC = auto()
+
+
+class ExportFormat(StrEnum):
+    CSV = auto()
+    NDJSON = auto()
@@ -1,4 +1,5 @@
 from .options import Descriptive, MultipleOption, CorrectOption
 from .question import Question
 from .quiz import Quiz
-from .user_answers import UserDescriptiveAnswer, UserMultipleOptionAnswer, Participant
+from .user_answers import (UserDescriptiveAnswer, UserMultipleOptionAnswer, Participant,
+                           ParticipantScore)
@@ -11,13 +11,20 @@ class Quiz(TimeStampedBase):
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     title: Mapped[str]
-    start_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
+    start_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True), index=True
+    )
     end_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
     is_active: Mapped[bool] = mapped_column(default=False)
     password: Mapped[str | None]
     shuffle_options: Mapped[bool] = mapped_column(default=False)
     quiz_path: Mapped[str] = mapped_column(String(30), unique=True, index=True)
     need_password: Mapped[bool] = mapped_column(default=False)
+    # maintained by the question and participant repositories in the same
+    # transaction as the rows they count
+    question_count: Mapped[int] = mapped_column(default=0)
+    total_score: Mapped[float] = mapped_column(default=0)
+    participant_count: Mapped[int] = mapped_column(default=0)
     updated_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), default=datetime.utcnow, onupdate=datetime.utcnow
     )
@@ -1,6 +1,6 @@
 from datetime import datetime
 
-from sqlalchemy import ForeignKey, String, DateTime
+from sqlalchemy import ForeignKey, String, DateTime, Computed, Index, false
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 # from src.app.models import Question
@@ -9,6 +9,10 @@ from src.core.database import TimeStampedBase, Base
 
 class Participant(TimeStampedBase):
     __tablename__ = "participants"
+    __table_args__ = (
+        Index("ix_participants_quiz_id_username", "quiz_id", "username", "id"),
+        Index("ix_participants_quiz_id_created_at", "quiz_id", "created_at", "id"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     username: Mapped[str] = mapped_column(unique=True)
@@ -27,6 +31,7 @@ class UserDescriptiveAnswer(Base):
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     answer: Mapped[str] = mapped_column(String(800))
     score: Mapped[float] = mapped_column(default=0)
+    is_graded: Mapped[bool] = mapped_column(default=False, server_default=false())
 
     participant_id: Mapped[int] = mapped_column(
         ForeignKey("participants.id", ondelete="CASCADE")
@@ -52,3 +57,32 @@ class UserMultipleOptionAnswer(Base):
     question_id: Mapped[int] = mapped_column(
         ForeignKey("questions.id", ondelete="CASCADE")
     )
+
+
+class ParticipantScore(Base):
+    """
+    running totals of a participant answers, kept up to date by every write to
+    the answer tables so score pages do not aggregate the answers
+    """
+
+    __tablename__ = "participant_scores"
+    __table_args__ = (
+        Index(
+            "ix_participant_scores_quiz_id_total_score",
+            "quiz_id",
+            "total_score",
+            "participant_id",
+        ),
+    )
+
+    participant_id: Mapped[int] = mapped_column(
+        ForeignKey("participants.id", ondelete="CASCADE"), primary_key=True
+    )
+    quiz_id: Mapped[int] = mapped_column(ForeignKey("quizzes.id", ondelete="CASCADE"))
+    descriptive_score: Mapped[float] = mapped_column(default=0)
+    options_score: Mapped[float] = mapped_column(default=0)
+    total_score: Mapped[float] = mapped_column(
+        Computed("descriptive_score + options_score", persisted=True)
+    )
+    graded_count: Mapped[int] = mapped_column(default=0)
+    ungraded_descriptive_count: Mapped[int] = mapped_column(default=0)
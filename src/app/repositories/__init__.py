@@ -5,16 +5,19 @@ from .quiz import QuizRepository
 from .user import UserRepository
 from .user_answers import UserAnswersRepository
 from .participant import ParticipantRepo
+from .participant_score import ParticipantScoreRepository
 
-from ..models import Question, Quiz, User, Participant, UserDescriptiveAnswer
+from ..models import (Question, Quiz, User, Participant, UserDescriptiveAnswer,
+                      ParticipantScore)
 
 QuestionRepository = partial(QuestionRepository, Question)
 QuizRepository = partial(QuizRepository, Quiz)
 UserRepository = partial(UserRepository, User)
 UserAnswersRepository = partial(UserAnswersRepository, UserDescriptiveAnswer)
 ParticipantRepo = partial(ParticipantRepo, Participant)
+ParticipantScoreRepository = partial(ParticipantScoreRepository, ParticipantScore)
 
 __all__ = [
     'QuestionRepository', 'QuizRepository', 'UserRepository', 'UserAnswersRepository',
-    'ParticipantRepo'
+    'ParticipantRepo', 'ParticipantScoreRepository'
 ]
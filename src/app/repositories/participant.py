@@ -1,38 +1,232 @@
-from sqlalchemy import select, func, case, MappingResult
+from collections import Counter
+from datetime import datetime, timezone
+from typing import AsyncIterator, Sequence
+
+from sqlalchemy import (
+    select,
+    insert,
+    update,
+    tuple_,
+    case,
+    null,
+    union_all,
+    func,
+    RowMapping,
+)
 from sqlalchemy.orm import selectinload
 
-from src.app.models import Question
+from src.app.models import Question, Quiz, CorrectOption
+from src.app.models.enums_ import ParticipantSort, SortOrder
 from src.app.models.quizzes.user_answers import (
     Participant,
+    ParticipantScore,
     UserDescriptiveAnswer,
     UserMultipleOptionAnswer,
 )
-from src.app.schemas.in_.quizzes import (
-    UserMultipleOptionAnswersIn,
-    UserDescriptiveAnswersIn,
+from src.app.schemas.extra.submission import (
+    GradedMultipleOptionAnswer,
+    QueuedSubmission,
 )
+from src.app.schemas.in_.quizzes import UserDescriptiveAnswersIn
 from src.core.repository.base import BaseRepository
+from .participant_score import ParticipantScoreRepository
+from .quiz import QuizRepository
+
+# column order of the answer records written by the bulk insert paths
+DESCRIPTIVE_ANSWER_COLUMNS = ("participant_id", "question_id", "answer", "score")
+MULTIPLE_OPTION_ANSWER_COLUMNS = (
+    "participant_id",
+    "question_id",
+    "option_id",
+    "is_correct",
+)
 
 
 class ParticipantRepo(BaseRepository[Participant]):
+    @property
+    def scores(self) -> ParticipantScoreRepository:
+        return ParticipantScoreRepository(ParticipantScore, self.session)
+
+    @property
+    def quizzes(self) -> QuizRepository:
+        return QuizRepository(Quiz, self.session)
+
     async def add_participant_info_with_answers(
         self,
         username: str,
         quiz_id: int,
-        multiple_option_answers: list[UserMultipleOptionAnswersIn],
+        multiple_option_answers: list[GradedMultipleOptionAnswer],
         descriptive_answers: list[UserDescriptiveAnswersIn],
-    ):
+    ) -> int:
         participant_info = Participant(username=username, quiz_id=quiz_id)
         participant_info.descriptive = [
             UserDescriptiveAnswer(answer=a.answer, question_id=a.question_id)
             for a in descriptive_answers
         ]
         participant_info.multiple_options = [
-            UserMultipleOptionAnswer(option_id=a.option_id, question_id=a.question_id)
+            UserMultipleOptionAnswer(
+                option_id=a.option_id,
+                question_id=a.question_id,
+                is_correct=a.is_correct,
+            )
             for a in multiple_option_answers
         ]
         self.session.add(participant_info)
+        await self.session.flush()
+        await self.scores.recompute([participant_info.id])
+        await self.quizzes.add_aggregates(quiz_id, participant_count=1)
         await self.session.commit()
+        return participant_info.id
+
+    async def add_participants_with_answers(
+        self, submissions: list[QueuedSubmission]
+    ) -> dict[str, int]:
+        """
+        save a batch of queued submissions in one transaction, a submission whose
+        username is already saved was written before and is not inserted again.
+        multiple-option answers are graded here rather than when they were queued,
+        so a correct option changed in between is taken into account
+        """
+        usernames = [submission.username for submission in submissions]
+        query = select(Participant.username, Participant.id).where(
+            Participant.username.in_(usernames)
+        )
+        participant_ids = dict((await self._execute(query)).tuples().all())
+
+        new_submissions = list(
+            {
+                s.username: s for s in submissions if s.username not in participant_ids
+            }.values()
+        )
+        if new_submissions:
+            if self.session.get_bind().dialect.driver == "asyncpg":
+                new_ids = await self._copy_participants_with_answers(new_submissions)
+            else:
+                new_ids = await self._insert_participants_with_answers(new_submissions)
+            participant_ids.update(new_ids)
+            await self.grade_multiple_option_answers(list(new_ids.values()))
+            await self.scores.recompute(list(new_ids.values()))
+            for quiz_id, count in Counter(s.quiz_id for s in new_submissions).items():
+                await self.quizzes.add_aggregates(quiz_id, participant_count=count)
+
+        await self.session.commit()
+        return participant_ids
+
+    async def grade_multiple_option_answers(self, participant_ids: list[int]) -> None:
+        """
+        set is_correct of the participants' answers from the current correct
+        options, which are share-locked first so a concurrent correct option
+        change and its re-grade wait for these answers to be committed
+        """
+        question_ids = select(UserMultipleOptionAnswer.question_id).where(
+            UserMultipleOptionAnswer.participant_id.in_(participant_ids)
+        )
+        await self._execute(
+            select(CorrectOption.id)
+            .where(CorrectOption.question_id.in_(question_ids))
+            .with_for_update(read=True)
+        )
+        await self._execute(
+            update(UserMultipleOptionAnswer)
+            .where(
+                (UserMultipleOptionAnswer.question_id == CorrectOption.question_id)
+                & UserMultipleOptionAnswer.participant_id.in_(participant_ids)
+            )
+            .values(
+                is_correct=UserMultipleOptionAnswer.option_id == CorrectOption.option_id
+            )
+            .execution_options(synchronize_session=False)
+        )
+
+    @staticmethod
+    def _answer_records(
+        submissions: list[QueuedSubmission], participant_ids: dict[str, int]
+    ) -> tuple[list[tuple], list[tuple]]:
+        descriptive_records = [
+            (participant_ids[s.username], a.question_id, a.answer, 0.0)
+            for s in submissions
+            for a in s.descriptive
+        ]
+        multiple_option_records = [
+            (participant_ids[s.username], a.question_id, a.option_id, a.is_correct)
+            for s in submissions
+            for a in s.multiple_options
+        ]
+        return descriptive_records, multiple_option_records
+
+    async def _copy_participants_with_answers(
+        self, submissions: list[QueuedSubmission]
+    ) -> dict[str, int]:
+        """
+        reserve participant ids from their sequence, then write every table with
+        a single COPY on the session connection so it stays in the transaction
+        """
+        reserved_ids = await self.session.scalars(
+            select(
+                func.nextval(
+                    func.pg_get_serial_sequence(Participant.__tablename__, "id")
+                )
+            ).select_from(func.generate_series(1, len(submissions)))
+        )
+        participant_ids = dict(zip((s.username for s in submissions), reserved_ids))
+        descriptive_records, multiple_option_records = self._answer_records(
+            submissions, participant_ids
+        )
+
+        now = datetime.now(timezone.utc)
+        connection = await self.session.connection()
+        raw_connection = await connection.get_raw_connection()
+        copy_records = raw_connection.driver_connection.copy_records_to_table
+
+        await copy_records(
+            Participant.__tablename__,
+            records=[
+                (participant_ids[s.username], s.username, s.quiz_id, now, now)
+                for s in submissions
+            ],
+            columns=("id", "username", "quiz_id", "created_at", "updated_at"),
+        )
+        if descriptive_records:
+            await copy_records(
+                UserDescriptiveAnswer.__tablename__,
+                records=descriptive_records,
+                columns=DESCRIPTIVE_ANSWER_COLUMNS,
+            )
+        if multiple_option_records:
+            await copy_records(
+                UserMultipleOptionAnswer.__tablename__,
+                records=multiple_option_records,
+                columns=MULTIPLE_OPTION_ANSWER_COLUMNS,
+            )
+        return participant_ids
+
+    async def _insert_participants_with_answers(
+        self, submissions: list[QueuedSubmission]
+    ) -> dict[str, int]:
+        """executemany fallback for drivers without COPY, e.g. sqlite in tests"""
+        result = await self.session.execute(
+            insert(Participant).returning(Participant.username, Participant.id),
+            [{"username": s.username, "quiz_id": s.quiz_id} for s in submissions],
+        )
+        participant_ids = dict(result.tuples().all())
+        descriptive_records, multiple_option_records = self._answer_records(
+            submissions, participant_ids
+        )
+
+        if descriptive_records:
+            await self.session.execute(
+                insert(UserDescriptiveAnswer),
+                [dict(zip(DESCRIPTIVE_ANSWER_COLUMNS, r)) for r in descriptive_records],
+            )
+        if multiple_option_records:
+            await self.session.execute(
+                insert(UserMultipleOptionAnswer),
+                [
+                    dict(zip(MULTIPLE_OPTION_ANSWER_COLUMNS, r))
+                    for r in multiple_option_records
+                ],
+            )
+        return participant_ids
 
     async def get_participants_with_answers(self, quiz_id: int) -> list[Participant]:
         query = (
@@ -45,54 +239,149 @@ class ParticipantRepo(BaseRepository[Participant]):
         )
         return await self._all(query)
 
-    async def get_participant_answers_with_score(self, quiz_id: int) -> MappingResult:
+    async def get_participant_answers_with_score(
+        self,
+        quiz_id: int,
+        sort: ParticipantSort = ParticipantSort.TOTAL_SCORE,
+        order: SortOrder = SortOrder.DESC,
+        limit: int | None = None,
+        after: tuple | None = None,
+        ungraded_only: bool = False,
+    ) -> Sequence[RowMapping]:
+        """
+        participant scores for a quiz, ordered by the sort column and participant
+        id, limit rows of them when paginated. after is the (sort value,
+        participant id) of the last row of the previous page, so every page is an
+        index range scan
+        """
+        if sort == ParticipantSort.TOTAL_SCORE:
+            quiz_column, sort_column, id_column = (
+                ParticipantScore.quiz_id,
+                ParticipantScore.total_score,
+                ParticipantScore.participant_id,
+            )
+        else:
+            quiz_column, sort_column, id_column = (
+                Participant.quiz_id,
+                Participant.username
+                if sort == ParticipantSort.USERNAME
+                else Participant.created_at,
+                Participant.id,
+            )
+
+        query = (
+            select(
+                Participant.username,
+                Participant.id.label("participant_id"),
+                Participant.created_at.label("submitted_at"),
+                ParticipantScore.descriptive_score,
+                ParticipantScore.options_score,
+                ParticipantScore.total_score,
+                ParticipantScore.graded_count,
+                ParticipantScore.ungraded_descriptive_count,
+            )
+            .join(ParticipantScore, ParticipantScore.participant_id == Participant.id)
+            .where(quiz_column == quiz_id)
+            .limit(limit)
+        )
+        if ungraded_only:
+            query = query.where(ParticipantScore.ungraded_descriptive_count > 0)
+
+        key = tuple_(sort_column, id_column)
+        if order == SortOrder.DESC:
+            if after is not None:
+                query = query.where(key < tuple_(*after))
+            query = query.order_by(sort_column.desc(), id_column.desc())
+        else:
+            if after is not None:
+                query = query.where(key > tuple_(*after))
+            query = query.order_by(sort_column, id_column)
+
+        results = await self._execute(query)
+        return results.mappings().all()
+
+    async def get_answer_matrix(self, quiz_id: int) -> list[tuple]:
         """
-        group all participants for a quiz and calculate their current score on the quiz
+        (participant id, question id, option id, earned score) of every answer of
+        a quiz, option id is None for descriptive answers
         """
-        subquery_descriptive_answers = (
+        descriptive = (
             select(
                 UserDescriptiveAnswer.participant_id,
-                func.sum(UserDescriptiveAnswer.score).label("descriptive_score"),
+                UserDescriptiveAnswer.question_id,
+                null(),
+                UserDescriptiveAnswer.score,
             )
-            .group_by(UserDescriptiveAnswer.participant_id)
-            .subquery()
+            .join(Participant, Participant.id == UserDescriptiveAnswer.participant_id)
+            .where(Participant.quiz_id == quiz_id)
         )
-        subquery_multiple_option = (
+        multiple_options = (
             select(
                 UserMultipleOptionAnswer.participant_id,
-                func.sum(
-                    case((UserMultipleOptionAnswer.is_correct == True, Question.score))  # noqa: E712
-                ).label("options_score"),
+                UserMultipleOptionAnswer.question_id,
+                UserMultipleOptionAnswer.option_id,
+                case((UserMultipleOptionAnswer.is_correct, Question.score), else_=0),
+            )
+            .join(
+                Participant, Participant.id == UserMultipleOptionAnswer.participant_id
             )
             .join(Question, Question.id == UserMultipleOptionAnswer.question_id)
-            .group_by(UserMultipleOptionAnswer.participant_id)
-            .subquery()
+            .where(Participant.quiz_id == quiz_id)
         )
-        query = (
+        results = await self._execute(union_all(descriptive, multiple_options))
+        return results.tuples().all()
+
+    async def stream_quiz_answers(
+        self, quiz_id: int, yield_per: int = 1000
+    ) -> AsyncIterator[RowMapping]:
+        """
+        every answer of a quiz with its participant, one row per answer read
+        through a server-side cursor so memory does not grow with the quiz
+        """
+        descriptive = (
             select(
-                Participant.username,
                 Participant.id.label("participant_id"),
-                func.coalesce(
-                    func.sum(subquery_descriptive_answers.c.descriptive_score), 0
-                ).label("descriptive_score"),
-                func.coalesce(
-                    func.sum(subquery_multiple_option.c.options_score), 0
-                ).label("options_score"),
-            )
-            .select_from(Participant)
-            .outerjoin(
-                subquery_descriptive_answers,
-                subquery_descriptive_answers.c.participant_id == Participant.id,
-            )
-            .outerjoin(
-                subquery_multiple_option,
-                subquery_multiple_option.c.participant_id == Participant.id,
+                Participant.username,
+                Participant.created_at.label("submitted_at"),
+                Question.id.label("question_id"),
+                Question.question_type,
+                UserDescriptiveAnswer.answer,
+                null().label("option_id"),
+                null().label("is_correct"),
+                UserDescriptiveAnswer.score,
             )
+            .join(Participant, Participant.id == UserDescriptiveAnswer.participant_id)
+            .join(Question, Question.id == UserDescriptiveAnswer.question_id)
             .where(Participant.quiz_id == quiz_id)
-            .group_by(Participant.username, Participant.id)
         )
-        results = await self._execute(query)
-        return results.mappings()
+        multiple_options = (
+            select(
+                Participant.id,
+                Participant.username,
+                Participant.created_at,
+                Question.id,
+                Question.question_type,
+                null(),
+                UserMultipleOptionAnswer.option_id,
+                UserMultipleOptionAnswer.is_correct,
+                case((UserMultipleOptionAnswer.is_correct, Question.score), else_=0),
+            )
+            .join(
+                Participant, Participant.id == UserMultipleOptionAnswer.participant_id
+            )
+            .join(Question, Question.id == UserMultipleOptionAnswer.question_id)
+            .where(Participant.quiz_id == quiz_id)
+        )
+        answers = union_all(descriptive, multiple_options).subquery()
+        query = select(answers).order_by(
+            answers.c.participant_id, answers.c.question_id
+        )
+
+        results = await self.session.stream(
+            query, execution_options={"yield_per": yield_per}
+        )
+        async for row in results.mappings():
+            yield row
 
     async def get_participant_with_answers(
         self, quiz_id: int, participant_id: int
@@ -0,0 +1,145 @@
+from sqlalchemy import Select, select, insert, update, delete, func, case
+
+from src.app.models import Question
+from src.app.models.quizzes.user_answers import (
+    Participant,
+    ParticipantScore,
+    UserDescriptiveAnswer,
+    UserMultipleOptionAnswer,
+)
+from src.core.repository.base import BaseRepository
+
+
+class ParticipantScoreRepository(BaseRepository[ParticipantScore]):
+    """
+    maintains participant_scores inside the transaction of the answer writes,
+    none of the methods commit
+    """
+
+    async def recompute(self, participant_ids: list[int] | Select) -> None:
+        """rebuild the rows of the given participants from their raw answers"""
+        descriptive = (
+            select(
+                UserDescriptiveAnswer.participant_id,
+                func.sum(UserDescriptiveAnswer.score).label("score"),
+                func.count(case((UserDescriptiveAnswer.is_graded, 1))).label("graded"),
+                func.count(
+                    case((UserDescriptiveAnswer.is_graded, None), else_=1)
+                ).label("ungraded"),
+            )
+            .where(UserDescriptiveAnswer.participant_id.in_(participant_ids))
+            .group_by(UserDescriptiveAnswer.participant_id)
+            .subquery()
+        )
+        multiple_options = (
+            select(
+                UserMultipleOptionAnswer.participant_id,
+                func.sum(
+                    case((UserMultipleOptionAnswer.is_correct, Question.score), else_=0)
+                ).label("score"),
+                func.count(UserMultipleOptionAnswer.is_correct).label("graded"),
+            )
+            .join(Question, Question.id == UserMultipleOptionAnswer.question_id)
+            .where(UserMultipleOptionAnswer.participant_id.in_(participant_ids))
+            .group_by(UserMultipleOptionAnswer.participant_id)
+            .subquery()
+        )
+        scores = (
+            select(
+                Participant.id,
+                Participant.quiz_id,
+                func.coalesce(descriptive.c.score, 0),
+                func.coalesce(multiple_options.c.score, 0),
+                func.coalesce(descriptive.c.graded, 0)
+                + func.coalesce(multiple_options.c.graded, 0),
+                func.coalesce(descriptive.c.ungraded, 0),
+            )
+            .outerjoin(descriptive, descriptive.c.participant_id == Participant.id)
+            .outerjoin(
+                multiple_options, multiple_options.c.participant_id == Participant.id
+            )
+            .where(Participant.id.in_(participant_ids))
+        )
+
+        await self._execute(
+            delete(ParticipantScore).where(
+                ParticipantScore.participant_id.in_(participant_ids)
+            )
+        )
+        await self._execute(
+            insert(ParticipantScore).from_select(
+                [
+                    ParticipantScore.participant_id,
+                    ParticipantScore.quiz_id,
+                    ParticipantScore.descriptive_score,
+                    ParticipantScore.options_score,
+                    ParticipantScore.graded_count,
+                    ParticipantScore.ungraded_descriptive_count,
+                ],
+                scores,
+            )
+        )
+
+    async def recompute_all(self) -> None:
+        await self.recompute(select(Participant.id))
+
+    async def recompute_quiz(self, quiz_id: int) -> None:
+        await self.recompute(
+            select(Participant.id).where(Participant.quiz_id == quiz_id)
+        )
+
+    async def recompute_question(self, question_id: int) -> None:
+        """rebuild the rows of participants who answered a multiple-option question"""
+        await self.recompute(
+            select(UserMultipleOptionAnswer.participant_id).where(
+                UserMultipleOptionAnswer.question_id == question_id
+            )
+        )
+
+    async def add(
+        self,
+        participant_id: int,
+        descriptive_score: float = 0,
+        options_score: float = 0,
+        graded_count: int = 0,
+        ungraded_descriptive_count: int = 0,
+    ) -> None:
+        """apply score differences of an answer update to a participant row"""
+        await self._execute(
+            update(ParticipantScore)
+            .where(ParticipantScore.participant_id == participant_id)
+            .values(
+                descriptive_score=ParticipantScore.descriptive_score
+                + descriptive_score,
+                options_score=ParticipantScore.options_score + options_score,
+                graded_count=ParticipantScore.graded_count + graded_count,
+                ungraded_descriptive_count=ParticipantScore.ungraded_descriptive_count
+                + ungraded_descriptive_count,
+            )
+        )
+
+    async def get_totals(
+        self, participant_ids: list[int]
+    ) -> list[tuple[int, int, str, float]]:
+        """(quiz_id, participant_id, username, total_score) of the participants"""
+        query = self._totals_query().where(
+            ParticipantScore.participant_id.in_(participant_ids)
+        )
+        return list((await self._execute(query)).tuples().all())
+
+    async def get_quiz_totals(self, quiz_id: int) -> list[tuple[int, int, str, float]]:
+        query = self._totals_query().where(ParticipantScore.quiz_id == quiz_id)
+        return list((await self._execute(query)).tuples().all())
+
+    @staticmethod
+    def _totals_query() -> Select:
+        return select(
+            ParticipantScore.quiz_id,
+            ParticipantScore.participant_id,
+            Participant.username,
+            ParticipantScore.total_score,
+        ).join(Participant, Participant.id == ParticipantScore.participant_id)
+
+    async def get_quiz_ids(self) -> list[int]:
+        query = select(ParticipantScore.quiz_id).distinct()
+        return list((await self._execute(query)).scalars().all())
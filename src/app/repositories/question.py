@@ -1,14 +1,42 @@
-from sqlalchemy import select, update, func, RowMapping
+from sqlalchemy import select, insert, update
 from sqlalchemy.orm import selectinload, joinedload
+from sqlalchemy.orm.attributes import set_committed_value
 
-from src.app.models import Descriptive, Question, MultipleOption, CorrectOption
+from src.app.models import (
+    Descriptive,
+    Question,
+    Quiz,
+    MultipleOption,
+    CorrectOption,
+    ParticipantScore,
+    UserMultipleOptionAnswer,
+)
 from src.app.models.enums_ import QuestionType
 from src.app.schemas.in_.quizzes import MultipleOptionUpdateIn, MultipleOptionIn
 from src.core.excpetions.database import ItemNotFoundError
 from src.core.repository.base import BaseRepository
+from .participant_score import ParticipantScoreRepository
+from .quiz import QuizRepository
 
 
 class QuestionRepository(BaseRepository[Question]):
+    @property
+    def scores(self) -> ParticipantScoreRepository:
+        return ParticipantScoreRepository(ParticipantScore, self.session)
+
+    @property
+    def quizzes(self) -> QuizRepository:
+        return QuizRepository(Quiz, self.session)
+
+    async def _insert_question(
+        self, text: str, quiz_id: int, question_type: QuestionType, score: float
+    ) -> Question:
+        question = await self._insert(
+            text=text, question_type=question_type, quiz_id=quiz_id, score=score
+        )
+        await self.quizzes.add_aggregates(quiz_id, question_count=1, total_score=score)
+        return question
+
     async def create_descriptive_question(
         self,
         question: str,
@@ -17,18 +45,20 @@ class QuestionRepository(BaseRepository[Question]):
         question_type: QuestionType,
         question_score: float,
     ) -> Question:
-        question = Question(
-            text=question,
-            question_type=question_type,
-            quiz_id=quiz_id,
-            score=question_score,
+        new_question = await self._insert_question(
+            question, quiz_id, question_type, question_score
         )
+        descriptive = None
         if answer:
-            question.descriptive = Descriptive(answer=answer)
-        self.session.add(question)
-        await self.session.commit()
-        await self.session.refresh(question, attribute_names=["descriptive"])
-        return question
+            query = (
+                insert(Descriptive)
+                .values(question_id=new_question.id, answer=answer)
+                .returning(Descriptive)
+            )
+            descriptive = (await self._execute(query)).scalar_one()
+        set_committed_value(new_question, "descriptive", descriptive)
+        await self.commit()
+        return new_question
 
     async def create_multiple_option(
         self,
@@ -36,31 +66,55 @@ class QuestionRepository(BaseRepository[Question]):
         quiz_id: int,
         options: list[MultipleOptionIn],
         question_score: float,
+        correct_option_index: int,
     ) -> Question:
-        options = [MultipleOption(text=answer.text) for answer in options]
-        question = Question(
-            text=question,
-            question_type=QuestionType.MULTIPLE_OPTIONS,
-            quiz_id=quiz_id,
-            multiple_options=options,
-            score=question_score,
-        )
-        self.session.add(question)
-        await self.session.commit()
-        await self.session.refresh(question, attribute_names=["multiple_options"])
-        return question
+        """
+        question, its options and the correct option in one transaction, every
+        row is inserted with RETURNING so nothing is read back
+        """
+        new_question = await self._insert_question(
+            question, quiz_id, QuestionType.MULTIPLE_OPTIONS, question_score
+        )
+        option_rows = await self.session.scalars(
+            insert(MultipleOption).returning(
+                MultipleOption, sort_by_parameter_order=True
+            ),
+            [
+                {"text": option.text, "question_id": new_question.id}
+                for option in options
+            ],
+        )
+        multiple_options = list(option_rows.all())
+        query = (
+            insert(CorrectOption)
+            .values(
+                option_id=multiple_options[correct_option_index].id,
+                question_id=new_question.id,
+            )
+            .returning(CorrectOption)
+        )
+        correct_option = (await self._execute(query)).scalar_one()
 
-    async def create_correct_option(self, option_id: int, question_id: int) -> None:
-        correct_option = CorrectOption(option_id=option_id, question_id=question_id)
-        self.session.add(correct_option)
-        await self.session.commit()
+        set_committed_value(new_question, "multiple_options", multiple_options)
+        set_committed_value(new_question, "correct_option", correct_option)
+        await self.commit()
+        return new_question
 
     async def delete_by_id(self, question_id: int) -> bool:
-        query = self._delete_by("id", question_id)
-        result = await self._execute(query)
-        await self.session.commit()
-        if not result.rowcount:
+        query = self._delete_by("id", question_id).returning(
+            Question.quiz_id, Question.score
+        )
+        deleted = (await self._execute(query)).one_or_none()
+        if deleted is None:
             raise ItemNotFoundError
+
+        quiz_id, score = deleted
+        await self.quizzes.add_aggregates(
+            quiz_id, question_count=-1, total_score=-score
+        )
+        # answers to the question are gone with it
+        await self.scores.recompute_quiz(quiz_id=quiz_id)
+        await self.session.commit()
         return True
 
     async def get_all_quiz_questions(self, quiz_id: int) -> list[Question]:
@@ -75,7 +129,16 @@ class QuestionRepository(BaseRepository[Question]):
         )
         return await self._all(query)
 
+    async def get_shared_quiz_questions(self, quiz_id: int) -> list[Question]:
+        """
+        questions of a quiz read from the primary since they end up in the
+        published caches
+        """
+        self._pin_primary()
+        return await self.get_all_quiz_questions(quiz_id)
+
     async def get_descriptive_by_id(self, question_id: int) -> Question:
+        self._pin_primary()
         query = (
             select(Question)
             .where(Question.id == question_id)
@@ -90,6 +153,9 @@ class QuestionRepository(BaseRepository[Question]):
         answer: str | None,
         new_score: float,
     ) -> Question:
+        await self.quizzes.add_aggregates(
+            question.quiz_id, total_score=new_score - question.score
+        )
         question.text = question_text
         question.score = new_score
         if question.descriptive:
@@ -97,11 +163,11 @@ class QuestionRepository(BaseRepository[Question]):
         else:
             question.descriptive = Descriptive(answer=answer)
 
-        await self.session.commit()
-        await self.session.refresh(question)
+        await self.commit()
         return question
 
     async def get_multiple_option_by_id(self, question_id: int) -> Question:
+        self._pin_primary()
         query = (
             select(Question)
             .where(Question.id == question_id)
@@ -115,6 +181,7 @@ class QuestionRepository(BaseRepository[Question]):
     async def update_correct_option(
         self, option_id: int, question_id: int
     ) -> CorrectOption:
+        """change the correct option and re-grade its answers in one transaction"""
         query = (
             update(CorrectOption)
             .where(CorrectOption.question_id == question_id)
@@ -122,8 +189,35 @@ class QuestionRepository(BaseRepository[Question]):
             .returning(CorrectOption)
         )
         result = await self.session.execute(query)
+        correct_option = result.scalar_one()
+        await self.regrade_multiple_option_answers(question_id=question_id)
+        await self.scores.recompute_question(question_id=question_id)
+        await self.session.commit()
+        return correct_option
+
+    async def rescore_question(self, question_id: int) -> None:
+        """rebuild the scores of its answers after the question score changed"""
+        await self.scores.recompute_question(question_id=question_id)
         await self.session.commit()
-        return result.scalar_one()
+
+    async def regrade_multiple_option_answers(self, question_id: int) -> int:
+        """
+        set is_correct of every answer to the question from its current correct
+        option with a single UPDATE ... FROM, manual overrides are replaced too
+        """
+        query = (
+            update(UserMultipleOptionAnswer)
+            .where(
+                (UserMultipleOptionAnswer.question_id == CorrectOption.question_id)
+                & (CorrectOption.question_id == question_id)
+            )
+            .values(
+                is_correct=UserMultipleOptionAnswer.option_id == CorrectOption.option_id
+            )
+            .execution_options(synchronize_session=False)
+        )
+        result = await self.session.execute(query)
+        return result.rowcount
 
     async def get_descriptive_questions_by_ids(
         self, question_ids: list[int], quiz_id: int
@@ -160,12 +254,6 @@ class QuestionRepository(BaseRepository[Question]):
         )
         return await self._all(query)
 
-    async def total_quiz_questions_score(self, quiz_id: int) -> RowMapping:
-        query = select(func.sum(Question.score).label("total_quiz_score")).where(
-            Question.quiz_id == quiz_id
-        )
-        return await self._mappings_one(query)
-
     async def update_multiple_option_question(
         self,
         question: Question,
@@ -180,6 +268,23 @@ class QuestionRepository(BaseRepository[Question]):
             - If the option has only text, create one.
             - If an option in the database doesn't exist in the user input, delete it.
         """
+        kept_option_ids = {option.id for option in options_in if option.id is not None}
+        removed_option_ids = [
+            option.id
+            for option in question.multiple_options
+            if option.id not in kept_option_ids
+        ]
+        # answers to removed options are deleted with them, so their participants
+        # have to be found before the flush, recompute_question no longer sees them
+        orphaned_participant_ids = (
+            await self._participants_of_options(removed_option_ids)
+            if removed_option_ids
+            else []
+        )
+
+        await self.quizzes.add_aggregates(
+            question.quiz_id, total_score=new_score - question.score
+        )
         question.text, question.score = question_text, new_score
 
         options_to_change: dict[int, str] = {}
@@ -195,6 +300,16 @@ class QuestionRepository(BaseRepository[Question]):
             elif option_db.id is not None:
                 question.multiple_options.remove(option_db)
 
-        await self.session.commit()
-        await self.session.refresh(question)
+        # new options need their ids, update_correct_option commits the change
+        await self.session.flush()
+        if orphaned_participant_ids:
+            await self.scores.recompute(orphaned_participant_ids)
         return question
+
+    async def _participants_of_options(self, option_ids: list[int]) -> list[int]:
+        query = (
+            select(UserMultipleOptionAnswer.participant_id)
+            .where(UserMultipleOptionAnswer.option_id.in_(option_ids))
+            .distinct()
+        )
+        return list((await self._execute(query)).scalars().all())
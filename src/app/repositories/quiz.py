@@ -1,3 +1,4 @@
+from datetime import datetime
 from typing import Sequence
 
 from sqlalchemy import (
@@ -7,28 +8,22 @@ from sqlalchemy import (
     RowMapping,
     exists,
 )
-from sqlalchemy.orm import selectinload
 
 from src.core.excpetions.database import ItemNotFoundError
 from src.core.repository.base import BaseRepository
 
-from ..models import Question, Quiz
+from ..models import Question, Quiz, Participant
 from ...core.types.database_out import RowCount
 
 
 class QuizRepository(BaseRepository[Quiz]):
     async def create_quiz(self, title: str, user_id: int, quiz_path: str) -> Quiz:
-        quiz = await self._create_and_refresh(
-            title=title, owner_id=user_id, quiz_path=quiz_path
-        )
+        quiz = await self._create(title=title, owner_id=user_id, quiz_path=quiz_path)
         return quiz
 
     async def get_user_quizzes(self, user_id: int) -> Sequence[RowMapping]:
-        query = (
-            select(Quiz, func.count(Question.id).label("question_count"))
-            .where(Quiz.owner_id == user_id)
-            .outerjoin(Question, Quiz.id == Question.quiz_id)
-            .group_by(Quiz.id)
+        query = select(Quiz, Quiz.question_count.label("question_count")).where(
+            Quiz.owner_id == user_id
         )
         return await self._mappings_all(query)
 
@@ -48,8 +43,19 @@ class QuizRepository(BaseRepository[Quiz]):
         query = self._get_by("id", quiz_id)
         return await self._one(query)
 
-    async def get_by_id_with_questions(self, quiz_id: int) -> Quiz:
-        query = self._get_by("id", quiz_id).options(selectinload(Quiz.questions))
+    async def get_shared_by_id(self, quiz_id: int) -> Quiz:
+        """quiz read from the primary since it ends up in the published caches"""
+        self._pin_primary()
+        return await self.get_by_id(quiz_id)
+
+    async def get_by_id_for_update(self, quiz_id: int) -> Quiz:
+        """current row of the quiz locked until commit, even if loaded before"""
+        self._pin_primary()
+        query = (
+            self._get_by("id", quiz_id)
+            .with_for_update()
+            .execution_options(populate_existing=True)
+        )
         return await self._one(query)
 
     async def update_quiz_password(
@@ -70,6 +76,14 @@ class QuizRepository(BaseRepository[Quiz]):
         await self.session.commit()
         return result.scalar_one()
 
+    async def get_active_starting_between(
+        self, start: datetime, end: datetime
+    ) -> list[Quiz]:
+        query = select(Quiz).where(
+            Quiz.is_active & (Quiz.start_at >= start) & (Quiz.start_at <= end)
+        )
+        return await self._all(query)
+
     async def get_by_path(self, quiz_path: str) -> Quiz:
         query = self._get_by("quiz_path", quiz_path)
         return await self._one(query)
@@ -78,3 +92,67 @@ class QuizRepository(BaseRepository[Quiz]):
         query = select(exists(select(Quiz).where(Quiz.quiz_path == quiz_path)))
         result = await self._execute(query)
         return result.scalar_one()
+
+    async def add_aggregates(
+        self,
+        quiz_id: int,
+        question_count: int = 0,
+        total_score: float = 0,
+        participant_count: int = 0,
+    ) -> None:
+        """
+        apply differences to the counters of a quiz inside the caller transaction,
+        updated_at is kept since the quiz itself did not change
+        """
+        query = (
+            update(Quiz)
+            .where(Quiz.id == quiz_id)
+            .values(
+                question_count=Quiz.question_count + question_count,
+                total_score=Quiz.total_score + total_score,
+                participant_count=Quiz.participant_count + participant_count,
+                updated_at=Quiz.updated_at,
+            )
+            .execution_options(synchronize_session=False)
+        )
+        await self._execute(query)
+
+    async def reconcile_aggregates(self, quiz_id: int | None = None) -> list[int]:
+        """recount the counters of quizzes that drifted, returns their ids"""
+        question_count = (
+            select(func.count(Question.id))
+            .where(Question.quiz_id == Quiz.id)
+            .scalar_subquery()
+        )
+        total_score = (
+            select(func.coalesce(func.sum(Question.score), 0))
+            .where(Question.quiz_id == Quiz.id)
+            .scalar_subquery()
+        )
+        participant_count = (
+            select(func.count(Participant.id))
+            .where(Participant.quiz_id == Quiz.id)
+            .scalar_subquery()
+        )
+        query = (
+            update(Quiz)
+            .where(
+                (Quiz.question_count != question_count)
+                | (func.abs(Quiz.total_score - total_score) > 1e-6)
+                | (Quiz.participant_count != participant_count)
+            )
+            .values(
+                question_count=question_count,
+                total_score=total_score,
+                participant_count=participant_count,
+                updated_at=Quiz.updated_at,
+            )
+            .returning(Quiz.id)
+            .execution_options(synchronize_session=False)
+        )
+        if quiz_id is not None:
+            query = query.where(Quiz.id == quiz_id)
+
+        drifted = list((await self._execute(query)).scalars().all())
+        await self.session.commit()
+        return drifted
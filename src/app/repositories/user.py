@@ -16,7 +16,7 @@ class UserRepository(BaseRepository[User]):
         return await self._one(query)
 
     async def create_user(self, **kwargs) -> User:
-        new_user = await self._create_and_refresh(**kwargs)
+        new_user = await self._create(**kwargs)
         return new_user
 
     async def get_by_email(self, email: str) -> User | None:
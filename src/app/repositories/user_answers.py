@@ -1,25 +1,46 @@
 from pydantic import PositiveInt
 from sqlalchemy import (
+    Boolean,
+    ColumnElement,
+    Float,
+    Integer,
+    Row,
     select,
     update,
     case,
+    column,
+    values,
 )
 from sqlalchemy.orm import joinedload
 
 from src.app.schemas.in_.quizzes import (
     UserDescriptiveAnswersIn,
 )
+from src.core.excpetions.database import InvalidGradesError
 from src.core.repository.base import BaseRepository
+from src.app.models import Question
 from src.app.models.quizzes.user_answers import (
+    Participant,
+    ParticipantScore,
     UserDescriptiveAnswer,
     UserMultipleOptionAnswer,
 )
+from .participant_score import ParticipantScoreRepository
+
+# rows per statement where grades are inlined as CASE, keeps sqlite under its
+# bound parameter limit
+GRADE_CHUNK_SIZE = 1000
 
 
 class UserAnswersRepository(BaseRepository[UserDescriptiveAnswer]):
+    @property
+    def scores(self) -> ParticipantScoreRepository:
+        return ParticipantScoreRepository(ParticipantScore, self.session)
+
     async def get_participant_descriptive(
         self, participant_id: int, descriptive_ids: list[int]
     ) -> list[UserDescriptiveAnswer]:
+        self._pin_primary()
         query = (
             select(UserDescriptiveAnswer)
             .where(
@@ -39,13 +60,38 @@ class UserAnswersRepository(BaseRepository[UserDescriptiveAnswer]):
         Update participant answers, validating their existence and ensuring
         the entered score does not exceed the question score.
         """
+        score_changes: dict[int, tuple[float, int]] = {}
         for descriptive_db in descriptive_objects:
             user_input = descriptive_in.get(descriptive_db.id)
             if user_input and user_input.score <= descriptive_db.question.score:
+                score, graded = score_changes.get(descriptive_db.participant_id, (0, 0))
+                score_changes[descriptive_db.participant_id] = (
+                    score + user_input.score - descriptive_db.score,
+                    graded + (0 if descriptive_db.is_graded else 1),
+                )
                 descriptive_db.score = user_input.score
+                descriptive_db.is_graded = True
+
+        for participant_id, (score, graded) in score_changes.items():
+            await self.scores.add(
+                participant_id,
+                descriptive_score=score,
+                graded_count=graded,
+                ungraded_descriptive_count=-graded,
+            )
         await self.session.commit()
 
     async def update_multiple_option_answers(self, participant_id: int, ids: list[int]):
+        answers_query = (
+            select(UserMultipleOptionAnswer.is_correct, Question.score)
+            .join(Question, Question.id == UserMultipleOptionAnswer.question_id)
+            .where(
+                (UserMultipleOptionAnswer.participant_id == participant_id)
+                & (UserMultipleOptionAnswer.id.in_(ids))
+            )
+        )
+        answers = (await self._execute(answers_query)).all()
+
         query = (
             update(UserMultipleOptionAnswer)
             .where(
@@ -60,5 +106,114 @@ class UserAnswersRepository(BaseRepository[UserDescriptiveAnswer]):
             )
         )
         a = await self.session.execute(query)
+        # a correct answer loses its score, any other answer becomes correct
+        await self.scores.add(
+            participant_id,
+            options_score=sum(
+                -score if is_correct else score for is_correct, score in answers
+            ),
+            graded_count=sum(is_correct is None for is_correct, _ in answers),
+        )
         await self.session.commit()
         return a.rowcount
+
+    async def grade_answers(
+        self,
+        quiz_id: int,
+        descriptive: dict[int, float],
+        multiple_options: dict[int, bool],
+    ) -> set[int]:
+        """
+        write grades of many participants with one UPDATE ... FROM (VALUES ...)
+        per answer table, an answer outside the quiz or scored above its
+        question score rejects the whole batch, returns the graded participants
+        """
+        descriptive_rows = await self._grade_descriptive_answers(quiz_id, descriptive)
+        option_rows = await self._grade_multiple_option_answers(
+            quiz_id, multiple_options
+        )
+        rejected_descriptive = descriptive.keys() - {id_ for id_, _ in descriptive_rows}
+        rejected_options = multiple_options.keys() - {id_ for id_, _ in option_rows}
+        if rejected_descriptive or rejected_options:
+            await self.session.rollback()
+            raise InvalidGradesError(
+                sorted(rejected_descriptive), sorted(rejected_options)
+            )
+
+        participant_ids = {
+            participant_id for _, participant_id in descriptive_rows + option_rows
+        }
+        ordered_ids = sorted(participant_ids)
+        for start in range(0, len(ordered_ids), GRADE_CHUNK_SIZE):
+            await self.scores.recompute(ordered_ids[start : start + GRADE_CHUNK_SIZE])
+        await self.session.commit()
+        return participant_ids
+
+    def _grade_sources(
+        self, model, grades: dict, value_type
+    ) -> list[tuple[ColumnElement, ColumnElement]]:
+        """
+        (grade, answer match) pairs to update answers with, one VALUES list on
+        postgres and chunks of CASE elsewhere since sqlite can not name the
+        columns of a VALUES list
+        """
+        if not grades:
+            return []
+        if self.session.get_bind().dialect.name == "postgresql":
+            source = values(
+                column("id", Integer), column("grade", value_type), name="grades"
+            ).data(list(grades.items()))
+            return [(source.c.grade, model.id == source.c.id)]
+
+        items = list(grades.items())
+        sources = []
+        for start in range(0, len(items), GRADE_CHUNK_SIZE):
+            chunk = dict(items[start : start + GRADE_CHUNK_SIZE])
+            sources.append((case(chunk, value=model.id), model.id.in_(chunk)))
+        return sources
+
+    async def _grade_descriptive_answers(
+        self, quiz_id: int, grades: dict[int, float]
+    ) -> list[Row]:
+        rows = []
+        for score, match in self._grade_sources(UserDescriptiveAnswer, grades, Float):
+            query = (
+                update(UserDescriptiveAnswer)
+                .where(
+                    match
+                    & (UserDescriptiveAnswer.participant_id == Participant.id)
+                    & (Participant.quiz_id == quiz_id)
+                    & (UserDescriptiveAnswer.question_id == Question.id)
+                    & (score <= Question.score)
+                )
+                .values(score=score, is_graded=True)
+                .returning(
+                    UserDescriptiveAnswer.id, UserDescriptiveAnswer.participant_id
+                )
+                .execution_options(synchronize_session=False)
+            )
+            rows.extend((await self._execute(query)).all())
+        return rows
+
+    async def _grade_multiple_option_answers(
+        self, quiz_id: int, grades: dict[int, bool]
+    ) -> list[Row]:
+        rows = []
+        for is_correct, match in self._grade_sources(
+            UserMultipleOptionAnswer, grades, Boolean
+        ):
+            query = (
+                update(UserMultipleOptionAnswer)
+                .where(
+                    match
+                    & (UserMultipleOptionAnswer.participant_id == Participant.id)
+                    & (Participant.quiz_id == quiz_id)
+                )
+                .values(is_correct=is_correct)
+                .returning(
+                    UserMultipleOptionAnswer.id, UserMultipleOptionAnswer.participant_id
+                )
+                .execution_options(synchronize_session=False)
+            )
+            rows.extend((await self._execute(query)).all())
+        return rows
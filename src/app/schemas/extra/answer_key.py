@@ -0,0 +1,20 @@
+from pydantic import BaseModel, ConfigDict, PositiveInt
+
+from src.app.models.enums_ import QuestionType
+
+
+class AnswerKeyQuestion(BaseModel):
+    question_type: QuestionType
+    score: float
+    option_ids: list[PositiveInt] = []
+    correct_option_id: PositiveInt | None = None
+
+
+class QuizAnswerKey(BaseModel):
+    """questions of a quiz with their options and correct option, keyed by id"""
+
+    model_config = ConfigDict(frozen=True)
+
+    quiz_id: PositiveInt
+    revision: int
+    questions: dict[int, AnswerKeyQuestion]
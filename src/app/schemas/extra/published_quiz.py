@@ -0,0 +1,31 @@
+from pydantic import BaseModel, ConfigDict, Field, PositiveInt
+
+from src.app.schemas.out.quizzes import (
+    PublishedMultipleOptionQuestionOut,
+    PublishedDescriptiveQuestionOut,
+)
+from src.app.schemas.types import StoredDateTime
+
+
+class PublishedQuizSnapshot(BaseModel):
+    """
+    immutable copy of everything participants need from a published quiz, it is
+    cached so the get-questions endpoint does not touch the database
+    """
+
+    model_config = ConfigDict(frozen=True)
+
+    quiz_id: PositiveInt
+    quiz_title: str
+    quiz_path: str
+    start_at: StoredDateTime | None
+    end_at: StoredDateTime | None
+    is_active: bool
+    need_password: bool
+    password: str | None
+    shuffle_options: bool
+    updated_at: StoredDateTime
+    revision: int
+    questions: list[
+        PublishedMultipleOptionQuestionOut | PublishedDescriptiveQuestionOut
+    ] = Field(discriminator="question_type")
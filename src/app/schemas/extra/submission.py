@@ -0,0 +1,25 @@
+from pydantic import BaseModel, PositiveInt
+
+from src.app.schemas.in_.quizzes import (
+    UserDescriptiveAnswersIn,
+    UserMultipleOptionAnswersIn,
+)
+
+
+class GradedMultipleOptionAnswer(UserMultipleOptionAnswersIn):
+    """is_correct stays None for questions without a correct option"""
+
+    is_correct: bool | None = None
+
+
+class QueuedSubmission(BaseModel):
+    """
+    validated participant answers waiting in the stream to be persisted, the
+    multiple-option answers are graded when they are written
+    """
+
+    submission_id: str
+    quiz_id: PositiveInt
+    username: str
+    descriptive: list[UserDescriptiveAnswersIn]
+    multiple_options: list[GradedMultipleOptionAnswer]
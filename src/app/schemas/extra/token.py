@@ -1,4 +1,4 @@
-from pydantic import BaseModel, PositiveInt
+from pydantic import BaseModel, ConfigDict, PositiveInt
 
 
 class TokenOut(BaseModel):
@@ -7,6 +7,9 @@ class TokenOut(BaseModel):
 
 
 class TokenData(BaseModel):
+    # shared between the requests of a token through the verified token cache
+    model_config = ConfigDict(frozen=True)
+
     user_id: PositiveInt
     is_admin: bool
     exp: int
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, PositiveInt
+from pydantic import BaseModel, Field, NonNegativeFloat, PositiveInt
 
 
 # ====-----====
@@ -12,4 +12,21 @@ class UpdateParticipantAnswersIn(BaseModel):
     multiple_options: list[PositiveInt]
 
 
+class DescriptiveGradeIn(BaseModel):
+    answer_id: PositiveInt
+    score: NonNegativeFloat
+
+
+class MultipleOptionGradeIn(BaseModel):
+    answer_id: PositiveInt
+    is_correct: bool
+
+
+class GradeAnswersIn(BaseModel):
+    """grades of any participants of a quiz, a later grade of an answer wins"""
+
+    descriptive: list[DescriptiveGradeIn] = Field(default=[], max_length=10000)
+    multiple_options: list[MultipleOptionGradeIn] = Field(default=[], max_length=10000)
+
+
 # ====-----====
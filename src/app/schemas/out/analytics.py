@@ -0,0 +1,40 @@
+from pydantic import BaseModel, PositiveInt
+
+from src.app.models.enums_ import QuestionType
+
+
+class OptionSelectionOut(BaseModel):
+    option_id: PositiveInt
+    count: int
+    ratio: float
+
+
+class QuestionAnalysisOut(BaseModel):
+    question_id: PositiveInt
+    question_type: QuestionType
+    max_score: float
+    answered_count: int
+    # mean fraction of the question score earned, 1 means everyone got it right
+    difficulty: float | None
+    # correlation of the question score with the rest of the total score
+    discrimination: float | None
+    options: list[OptionSelectionOut] = []
+
+
+class ScorePercentilesOut(BaseModel):
+    p10: float
+    p25: float
+    p50: float
+    p75: float
+    p90: float
+
+
+class QuizItemAnalysisOut(BaseModel):
+    quiz_id: PositiveInt
+    content_revision: int
+    answers_revision: int
+    participant_count: int
+    mean_score: float | None
+    std_score: float | None
+    percentiles: ScorePercentilesOut | None
+    questions: list[QuestionAnalysisOut]
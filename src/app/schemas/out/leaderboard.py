@@ -0,0 +1,15 @@
+from pydantic import BaseModel, PositiveInt
+
+
+class LeaderboardEntryOut(BaseModel):
+    # participants with the same score share a rank, the next rank is skipped
+    rank: PositiveInt
+    participant_id: PositiveInt
+    username: str
+    score: float
+
+
+class LeaderboardOut(BaseModel):
+    quiz_id: PositiveInt
+    participant_count: int
+    entries: list[LeaderboardEntryOut]
@@ -9,6 +9,7 @@ from pydantic import (
     ConfigDict,
     Field,
     AliasPath,
+    AliasChoices,
 )
 
 from src.app.models.enums_ import QuestionType
@@ -167,7 +168,9 @@ class PublishedMultipleOptionQuestionOut(BaseModel):
     score: float
     question_type: Literal[QuestionType.MULTIPLE_OPTIONS]
 
-    choices: list[PublishedChoicesOut] = Field(validation_alias="multiple_options")
+    choices: list[PublishedChoicesOut] = Field(
+        validation_alias=AliasChoices("multiple_options", "choices")
+    )
 
 
 class PublishedQuizQuestionsOut(BaseModel):
@@ -185,8 +188,12 @@ class PublishedQuizQuestionsOut(BaseModel):
 class ParticipantsAnswersWithScoreOut(BaseModel):
     username: str
     participant_id: PositiveInt
+    submitted_at: datetime
     descriptive_score: float
     options_score: float
+    total_score: float
+    graded_count: int
+    ungraded_descriptive_count: int
 
 
 UserAnswersWithScoreOutList = TypeAdapter(list[ParticipantsAnswersWithScoreOut])
@@ -195,6 +202,7 @@ UserAnswersWithScoreOutList = TypeAdapter(list[ParticipantsAnswersWithScoreOut])
 class ParticipantsAnswersOut(BaseModel):
     total_quiz_score: float
     participant_answers: list[ParticipantsAnswersWithScoreOut]
+    next_cursor: str | None = None
 
 
 # ====-----====
@@ -1,6 +1,6 @@
 from pydantic import BaseModel, PositiveInt, TypeAdapter, ConfigDict, Field
 
-from src.app.models.enums_ import QuestionType
+from src.app.models.enums_ import QuestionType, SubmissionStatus
 
 
 # ====-----====
@@ -37,3 +37,30 @@ class ParticipantAnswersOut(BaseModel):
 
 UserAnswersOutList = TypeAdapter(list[ParticipantAnswersOut])
 # ====-----====
+
+
+class GradedAnswersOut(BaseModel):
+    message: str
+    descriptive_count: int
+    multiple_option_count: int
+    participant_count: int
+
+
+class SubmittedAnswersOut(BaseModel):
+    message: str
+    participant_id: PositiveInt
+
+
+class QueuedSubmissionOut(BaseModel):
+    message: str
+    submission_id: str
+
+
+class SubmissionStatusOut(BaseModel):
+    submission_id: str
+    quiz_id: PositiveInt
+    status: SubmissionStatus
+    participant_id: PositiveInt | None = None
+
+
+# ====-----====
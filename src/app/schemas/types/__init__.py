@@ -1 +1,2 @@
-from .types import Slug, date_to_utc, UTCDateTime, StrongPassword
+from .types import (Slug, date_to_utc, UTCDateTime, StrongPassword, assume_utc,
+                    StoredDateTime)
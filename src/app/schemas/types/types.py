@@ -27,3 +27,13 @@ def date_to_utc(value):
 
 
 UTCDateTime = Annotated[AwareDatetime, AfterValidator(date_to_utc)]
+
+
+def assume_utc(value):
+    """dates are stored in utc, some databases (sqlite) drop the timezone on read"""
+    if value is not None and value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value
+
+
+StoredDateTime = Annotated[datetime, AfterValidator(assume_utc)]
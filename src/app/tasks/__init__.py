@@ -0,0 +1,5 @@
+from .prewarm import prewarm_upcoming_quizzes, run_prewarm_scan, run_prewarm_scheduler
+from .submission_queue import SubmissionQueue
+from .submission_worker import drain_submissions, run_submission_worker
+from .participant_scores import rebuild_participant_scores
+from .quiz_aggregates import reconcile_quiz_aggregates
@@ -0,0 +1,34 @@
+import asyncio
+import sys
+
+from src.app.cache import Leaderboard
+from src.app.repositories import ParticipantScoreRepository
+from src.app.utils.leaderboard import rebuild_leaderboard
+from src.core.cache.redis_client import RedisClient
+from src.core.database.session import async_session
+
+
+async def rebuild_participant_scores(quiz_id: int | None = None) -> None:
+    """
+    reconcile participant_scores with the raw answer tables, for one quiz or
+    for every participant when quiz_id is None, and the leaderboards with them
+    """
+    leaderboard = Leaderboard(RedisClient())
+    async with async_session() as session:
+        scores = ParticipantScoreRepository(session)
+        if quiz_id is None:
+            await scores.recompute_all()
+        else:
+            await scores.recompute_quiz(quiz_id)
+        await session.commit()
+
+        if quiz_id is not None:
+            await rebuild_leaderboard(scores, leaderboard, quiz_id)
+            return
+        # every leaderboard is rebuilt by its next read
+        for score_quiz_id in await scores.get_quiz_ids():
+            await leaderboard.invalidate(score_quiz_id)
+
+
+if __name__ == "__main__":
+    asyncio.run(rebuild_participant_scores(int(sys.argv[1]) if sys.argv[1:] else None))
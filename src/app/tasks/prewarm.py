@@ -0,0 +1,127 @@
+import asyncio
+import logging
+import os
+import socket
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Callable
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.app.cache import (
+    PublishedQuizCache,
+    AnswerKeyCache,
+    QuizPathCache,
+    build_published_snapshot,
+    build_answer_key,
+)
+from src.app.repositories import QuizRepository, QuestionRepository
+from src.core.cache.redis_client import RedisClient
+from src.core.config import settings
+from src.core.database.session import async_session
+from src.core.excpetions.database import ItemNotFoundError
+from src.core.metrics import Counter, Gauge
+
+logger = logging.getLogger(__name__)
+
+# held for one interval by the worker process that scans, so scans are not
+# repeated by every worker of the server
+PREWARM_LOCK_KEY = "prewarm:lock"
+
+prewarm_runs = Counter("quiz_prewarm_runs_total", "finished pre-warm scans")
+prewarmed_quizzes = Counter(
+    "quiz_prewarm_quizzes_total", "quizzes loaded into the caches by pre-warm scans"
+)
+prewarm_duration = Gauge(
+    "quiz_prewarm_last_duration_seconds", "duration of the last pre-warm scan"
+)
+prewarm_last_warmed = Gauge(
+    "quiz_prewarm_last_warmed_quizzes", "quizzes warmed by the last pre-warm scan"
+)
+
+
+async def prewarm_upcoming_quizzes(
+    redis_client: RedisClient,
+    session_factory: Callable[[], AsyncSession],
+    window_minutes: int,
+) -> int:
+    """
+    load snapshot, quiz_path lookup and answer key of active quizzes starting in
+    the next window_minutes into the caches, quizzes already cached are skipped
+    """
+    started = time.perf_counter()
+    published_cache = PublishedQuizCache(redis_client)
+    answer_key_cache = AnswerKeyCache(redis_client)
+    path_cache = QuizPathCache(redis_client)
+
+    warmed = 0
+    now = datetime.now(tz=timezone.utc)
+    async with session_factory() as session:
+        quizzes = await QuizRepository(session).get_active_starting_between(
+            start=now, end=now + timedelta(minutes=window_minutes)
+        )
+        quiz_ids = [quiz.id for quiz in quizzes]
+
+    for quiz_id in quiz_ids:
+        if await published_cache.is_warm(quiz_id):
+            continue
+
+        # same order as get_published_quiz, the revision is read before the
+        # content so an edit in between makes the caches refuse the snapshot,
+        # and a session per quiz so the rows of the scan are not reused
+        revision = await published_cache.revision.content(quiz_id)
+        async with session_factory() as session:
+            try:
+                quiz = await QuizRepository(session).get_shared_by_id(quiz_id)
+            except ItemNotFoundError:
+                continue
+            questions = await QuestionRepository(session).get_shared_quiz_questions(
+                quiz_id
+            )
+
+        await published_cache.set(
+            build_published_snapshot(quiz=quiz, questions=questions, revision=revision)
+        )
+        await answer_key_cache.set(
+            build_answer_key(quiz_id=quiz_id, questions=questions, revision=revision)
+        )
+        await path_cache.set(quiz.quiz_path, quiz_id)
+        warmed += 1
+
+    duration = time.perf_counter() - started
+    prewarm_runs.inc()
+    prewarmed_quizzes.inc(warmed)
+    prewarm_last_warmed.set(warmed)
+    prewarm_duration.set(duration)
+    logger.info("pre-warmed %s quizzes in %.3fs", warmed, duration)
+    return warmed
+
+
+async def run_prewarm_scan(
+    redis_client: RedisClient, session_factory: Callable[[], AsyncSession]
+) -> int | None:
+    """
+    pre-warm upcoming quizzes unless another worker process scanned within the
+    last PREWARM_INTERVAL_SECONDS, None when the scan was left to that worker
+    """
+    scanning = await redis_client.set_if_not_exists(
+        PREWARM_LOCK_KEY,
+        f"{socket.gethostname()}:{os.getpid()}",
+        settings.PREWARM_INTERVAL_SECONDS,
+    )
+    if not scanning:
+        return None
+    return await prewarm_upcoming_quizzes(
+        redis_client, session_factory, settings.PREWARM_WINDOW_MINUTES
+    )
+
+
+async def run_prewarm_scheduler() -> None:
+    """scan for upcoming quizzes every PREWARM_INTERVAL_SECONDS until cancelled"""
+    redis_client = RedisClient()
+    while True:
+        try:
+            await run_prewarm_scan(redis_client, async_session)
+        except Exception:
+            logger.exception("pre-warming quizzes failed")
+        await asyncio.sleep(settings.PREWARM_INTERVAL_SECONDS)
@@ -0,0 +1,26 @@
+import asyncio
+import logging
+import sys
+
+from src.app.repositories import QuizRepository
+from src.core.database.session import async_session
+
+logger = logging.getLogger(__name__)
+
+
+async def reconcile_quiz_aggregates(quiz_id: int | None = None) -> list[int]:
+    """
+    compare the question and participant counters of quizzes with the rows they
+    count and fix the ones that drifted, for one quiz or every quiz
+    """
+    async with async_session() as session:
+        drifted = await QuizRepository(session).reconcile_aggregates(quiz_id)
+
+    if drifted:
+        logger.warning("fixed drifted aggregates of quizzes %s", drifted)
+    return drifted
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(reconcile_quiz_aggregates(int(sys.argv[1]) if sys.argv[1:] else None))
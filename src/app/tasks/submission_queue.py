@@ -0,0 +1,68 @@
+from src.app.models.enums_ import SubmissionStatus
+from src.app.schemas.extra.submission import QueuedSubmission
+from src.app.schemas.out.user_answers import SubmissionStatusOut
+from src.core.cache.redis_client import RedisClient
+from src.core.config import settings
+
+
+class SubmissionQueue:
+    """
+    redis stream of validated submissions, the api only appends to it and the
+    submission worker writes them to the database in batches
+    """
+
+    group = "submission_writers"
+    status_ttl = 60 * 60 * 24
+
+    def __init__(self, redis_client: RedisClient):
+        self.redis_client = redis_client
+
+    @staticmethod
+    def _status_key(submission_id: str) -> str:
+        return f"submission:{submission_id}"
+
+    async def _set_status(self, submission_status: SubmissionStatusOut) -> None:
+        await self.redis_client.set(
+            self._status_key(submission_status.submission_id),
+            submission_status.model_dump_json(),
+            self.status_ttl,
+        )
+
+    async def enqueue(self, submission: QueuedSubmission) -> None:
+        await self._set_status(
+            SubmissionStatusOut(
+                submission_id=submission.submission_id,
+                quiz_id=submission.quiz_id,
+                status=SubmissionStatus.PENDING,
+            )
+        )
+        await self.redis_client.stream_add(
+            settings.SUBMISSION_STREAM, {"payload": submission.model_dump_json()}
+        )
+
+    async def mark_persisted(
+        self, submission: QueuedSubmission, participant_id: int
+    ) -> None:
+        await self._set_status(
+            SubmissionStatusOut(
+                submission_id=submission.submission_id,
+                quiz_id=submission.quiz_id,
+                status=SubmissionStatus.PERSISTED,
+                participant_id=participant_id,
+            )
+        )
+
+    async def mark_failed(self, submission: QueuedSubmission) -> None:
+        await self._set_status(
+            SubmissionStatusOut(
+                submission_id=submission.submission_id,
+                quiz_id=submission.quiz_id,
+                status=SubmissionStatus.FAILED,
+            )
+        )
+
+    async def get_status(self, submission_id: str) -> SubmissionStatusOut | None:
+        raw_status = await self.redis_client.get(self._status_key(submission_id))
+        if raw_status is None:
+            return None
+        return SubmissionStatusOut.model_validate_json(raw_status)
@@ -0,0 +1,195 @@
+import asyncio
+import logging
+import os
+import socket
+from typing import Callable
+
+from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.app.cache import QuizRevision, Leaderboard
+from src.app.repositories import ParticipantRepo
+from src.app.schemas.extra.submission import QueuedSubmission
+from src.app.utils.leaderboard import update_leaderboard
+from src.core.cache.redis_client import RedisClient
+from src.core.config import settings
+from src.core.database.session import participant_session
+from src.core.metrics import Counter, Gauge
+from .submission_queue import SubmissionQueue
+
+logger = logging.getLogger(__name__)
+
+persisted_submissions = Counter(
+    "quiz_submissions_persisted_total", "queued submissions written to the database"
+)
+last_batch_size = Gauge(
+    "quiz_submissions_last_batch_size", "submissions written by the last batch"
+)
+
+
+dead_lettered_submissions = Counter(
+    "quiz_submissions_dead_lettered_total",
+    "queued submissions moved to the dead-letter stream after failed deliveries",
+)
+
+
+async def drain_submissions(
+    redis_client: RedisClient,
+    session_factory: Callable[[], AsyncSession],
+    consumer: str,
+    block: int | None = None,
+) -> int:
+    """
+    write one batch of queued submissions in a single transaction, entries are
+    acknowledged only after the commit so a failed or stopped worker leaves them
+    to be claimed again. stale entries are retried before new ones are read, and
+    a failed batch is retried one entry at a time so one bad submission does not
+    hold back the rest of its batch
+    """
+    entries = await claim_stale_entries(redis_client, consumer)
+    if not entries:
+        entries = await redis_client.stream_read_group(
+            settings.SUBMISSION_STREAM,
+            SubmissionQueue.group,
+            consumer,
+            count=settings.SUBMISSION_BATCH_SIZE,
+            block=block,
+        )
+    if not entries:
+        return 0
+
+    try:
+        await write_submissions(redis_client, session_factory, entries)
+        return len(entries)
+    except Exception:
+        logger.exception("writing a batch of %s submissions failed", len(entries))
+        if len(entries) == 1:
+            return 0
+
+    written = 0
+    for entry in entries:
+        try:
+            await write_submissions(redis_client, session_factory, [entry])
+            written += 1
+        except Exception:
+            logger.exception("writing queued submission %s failed", entry[0])
+    return written
+
+
+async def write_submissions(
+    redis_client: RedisClient,
+    session_factory: Callable[[], AsyncSession],
+    entries: list[tuple],
+) -> None:
+    submissions = [
+        QueuedSubmission.model_validate_json(fields[b"payload"])
+        for _, fields in entries
+    ]
+    async with session_factory() as session:
+        participant_repo = ParticipantRepo(session)
+        participant_ids = await participant_repo.add_participants_with_answers(
+            submissions
+        )
+        await update_leaderboard(
+            participant_repo.scores,
+            Leaderboard(redis_client),
+            list(participant_ids.values()),
+        )
+
+    submission_queue = SubmissionQueue(redis_client)
+    for submission in submissions:
+        await submission_queue.mark_persisted(
+            submission, participant_ids[submission.username]
+        )
+    quiz_revision = QuizRevision(redis_client)
+    for quiz_id in {submission.quiz_id for submission in submissions}:
+        await quiz_revision.bump_answers(quiz_id)
+
+    await redis_client.stream_ack(
+        settings.SUBMISSION_STREAM,
+        SubmissionQueue.group,
+        *(entry_id for entry_id, _ in entries),
+    )
+    persisted_submissions.inc(len(entries))
+    last_batch_size.set(len(entries))
+
+
+async def claim_stale_entries(redis_client: RedisClient, consumer: str) -> list[tuple]:
+    """
+    take over entries left unacknowledged by failed batches or stopped workers,
+    entries already delivered SUBMISSION_MAX_DELIVERIES times are dead-lettered
+    """
+    min_idle_ms = settings.SUBMISSION_CLAIM_IDLE_SECONDS * 1000
+    pending = await redis_client.stream_pending(
+        settings.SUBMISSION_STREAM,
+        SubmissionQueue.group,
+        count=settings.SUBMISSION_BATCH_SIZE,
+        min_idle_ms=min_idle_ms,
+    )
+    if not pending:
+        return []
+
+    deliveries = {entry["message_id"]: entry["times_delivered"] for entry in pending}
+    entries = await redis_client.stream_claim(
+        settings.SUBMISSION_STREAM,
+        SubmissionQueue.group,
+        consumer,
+        min_idle_ms,
+        *deliveries,
+    )
+    retried = []
+    for entry_id, fields in entries:
+        if deliveries[entry_id] >= settings.SUBMISSION_MAX_DELIVERIES:
+            await dead_letter(redis_client, entry_id, fields, deliveries[entry_id])
+        else:
+            retried.append((entry_id, fields))
+    return retried
+
+
+async def dead_letter(
+    redis_client: RedisClient, entry_id: bytes, fields: dict, deliveries: int
+) -> None:
+    """move an entry that keeps failing to the dead-letter stream for inspection"""
+    await redis_client.stream_add(
+        settings.SUBMISSION_DEAD_LETTER_STREAM,
+        {
+            "payload": fields[b"payload"].decode(),
+            "entry_id": entry_id.decode(),
+            "deliveries": str(deliveries),
+        },
+    )
+    try:
+        submission = QueuedSubmission.model_validate_json(fields[b"payload"])
+    except ValidationError:
+        submission = None
+    if submission is not None:
+        await SubmissionQueue(redis_client).mark_failed(submission)
+
+    await redis_client.stream_ack(
+        settings.SUBMISSION_STREAM, SubmissionQueue.group, entry_id
+    )
+    dead_lettered_submissions.inc()
+    logger.error(
+        "queued submission %s dead-lettered after %s deliveries", entry_id, deliveries
+    )
+
+
+async def run_submission_worker(consumer: str) -> None:
+    redis_client = RedisClient()
+    await redis_client.stream_create_group(
+        settings.SUBMISSION_STREAM, SubmissionQueue.group
+    )
+    while True:
+        try:
+            await drain_submissions(
+                redis_client, participant_session, consumer, block=5000
+            )
+        except Exception:
+            logger.exception("writing queued submissions failed")
+            await asyncio.sleep(1)
+
+
+if __name__ == "__main__":
+    # unique per process, entries of a stopped worker are claimed by the others
+    # once they are idle for SUBMISSION_CLAIM_IDLE_SECONDS
+    asyncio.run(run_submission_worker(f"{socket.gethostname()}-{os.getpid()}"))
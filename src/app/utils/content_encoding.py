@@ -0,0 +1,24 @@
+def accepts_encoding(accept_encoding: str, coding: str) -> bool:
+    """
+    whether an Accept-Encoding header allows the content coding, a coding listed
+    with q=0 is refused and "*" covers the codings that are not listed
+    """
+    qualities = {}
+    for item in accept_encoding.lower().split(","):
+        name, *params = (part.strip() for part in item.split(";"))
+        if not name:
+            continue
+        quality = 1.0
+        for param in params:
+            key, _, value = param.partition("=")
+            if key.strip() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[name] = quality
+
+    if coding == "gzip" and "gzip" not in qualities and "x-gzip" in qualities:
+        coding = "x-gzip"
+    quality = qualities.get(coding, qualities.get("*", 0.0))
+    return quality > 0
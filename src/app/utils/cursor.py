@@ -0,0 +1,57 @@
+import base64
+import binascii
+import json
+import math
+from datetime import datetime
+from typing import Any, Callable
+
+from src.core.excpetions import BadRequestException
+
+# participant ids are stored as 32 bit integers
+MAX_CURSOR_ID = 2**31 - 1
+
+
+def encode_cursor(*values: Any) -> str:
+    """opaque pagination cursor holding the sort key of the last returned row"""
+    raw_cursor = json.dumps(values, default=str, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw_cursor.encode()).decode()
+
+
+def decode_cursor(cursor: str, *value_types: Callable[[Any], Any]) -> list:
+    """
+    cursor values converted by one value type each, a value type raises
+    TypeError or ValueError for values it does not accept
+    """
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        if not isinstance(values, list) or len(values) != len(value_types):
+            raise ValueError("wrong number of cursor values")
+        return [value_type(value) for value_type, value in zip(value_types, values)]
+    except (binascii.Error, TypeError, ValueError):
+        raise BadRequestException("invalid cursor", "invalid_cursor")
+
+
+def cursor_number(value: Any) -> float:
+    if isinstance(value, bool) or not isinstance(value, int | float):
+        raise TypeError("cursor value is not a number")
+    if not math.isfinite(value):
+        raise ValueError("cursor value is not finite")
+    return float(value)
+
+
+def cursor_string(value: Any) -> str:
+    if not isinstance(value, str):
+        raise TypeError("cursor value is not a string")
+    return value
+
+
+def cursor_datetime(value: Any) -> datetime:
+    return datetime.fromisoformat(cursor_string(value))
+
+
+def cursor_id(value: Any) -> int:
+    if isinstance(value, bool) or not isinstance(value, int):
+        raise TypeError("cursor value is not an integer")
+    if not 0 < value <= MAX_CURSOR_ID:
+        raise ValueError("cursor id out of range")
+    return value
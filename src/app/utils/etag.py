@@ -0,0 +1,26 @@
+import hashlib
+
+from fastapi import Response, status
+
+
+def make_etag(*parts) -> str:
+    """weak etag built from the values that version a response"""
+    version = ":".join(str(part) for part in parts)
+    digest = hashlib.blake2b(version.encode(), digest_size=12).hexdigest()
+    return f'W/"{digest}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+
+    opaque_tag = etag.removeprefix("W/")
+    return any(
+        tag.strip().removeprefix("W/") == opaque_tag for tag in if_none_match.split(",")
+    )
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
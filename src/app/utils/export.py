@@ -0,0 +1,70 @@
+import csv
+import io
+import json
+from datetime import datetime
+from typing import Any, AsyncIterator, Mapping
+
+from src.core.executors import executors
+
+EXPORT_COLUMNS = (
+    "participant_id",
+    "username",
+    "submitted_at",
+    "question_id",
+    "question_type",
+    "answer",
+    "option_id",
+    "is_correct",
+    "score",
+)
+
+
+def _export_value(value: Any) -> Any:
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def csv_lines(rows: list[tuple]) -> str:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows([_export_value(v) for v in row] for row in rows)
+    return buffer.getvalue()
+
+
+def ndjson_lines(rows: list[tuple]) -> str:
+    return "".join(
+        json.dumps(dict(zip(EXPORT_COLUMNS, map(_export_value, row)))) + "\n"
+        for row in rows
+    )
+
+
+async def _batches(
+    rows: AsyncIterator[Mapping], batch_size: int
+) -> AsyncIterator[list[tuple]]:
+    """rows as plain tuples of the export columns, so they can be pickled"""
+    batch = []
+    async for row in rows:
+        batch.append(tuple([row[column] for column in EXPORT_COLUMNS]))
+        if len(batch) == batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+async def render_csv(
+    rows: AsyncIterator[Mapping], batch_size: int = 500
+) -> AsyncIterator[str]:
+    """
+    csv with a header line, written in chunks of batch_size rows rendered by
+    the process pool
+    """
+    yield csv_lines([EXPORT_COLUMNS])
+    async for batch in _batches(rows, batch_size):
+        yield await executors.run_in_process(csv_lines, batch)
+
+
+async def render_ndjson(
+    rows: AsyncIterator[Mapping], batch_size: int = 500
+) -> AsyncIterator[str]:
+    """one json object per line, written in chunks of batch_size rows"""
+    async for batch in _batches(rows, batch_size):
+        yield await executors.run_in_process(ndjson_lines, batch)
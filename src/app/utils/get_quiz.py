@@ -1,7 +1,22 @@
+from src.app.cache import (
+    AnswerKeyCache,
+    PublishedQuizCache,
+    CompiledPublishedQuiz,
+    QuizPathCache,
+    build_published_snapshot,
+    build_answer_key,
+)
 from src.app.models import Quiz
-from src.app.repositories import QuizRepository
+from src.app.repositories import QuizRepository, QuestionRepository
+from src.app.schemas.extra.answer_key import QuizAnswerKey
 from src.core.excpetions import BadRequestException
 from src.core.excpetions.database import ItemNotFoundError
+from src.core.repository.single_flight import SingleFlight, RedisSingleFlight
+
+# one cold-cache load per quiz and process, the redis lock extends it to workers,
+# callers share the built cache value, never orm objects of another session
+published_flight = SingleFlight()
+answer_key_flight = SingleFlight()
 
 
 async def get_quiz_by_id(quiz_repository: QuizRepository, quiz_id: int) -> Quiz:
@@ -11,3 +26,97 @@ async def get_quiz_by_id(quiz_repository: QuizRepository, quiz_id: int) -> Quiz:
         raise BadRequestException("quiz not found", "no_quiz_found")
 
     return quiz
+
+
+async def get_published_quiz(
+    quiz_repository: QuizRepository,
+    question_repository: QuestionRepository,
+    published_cache: PublishedQuizCache,
+    quiz_id: int,
+) -> CompiledPublishedQuiz:
+    """
+    read the quiz snapshot from cache, on a miss only one request across all
+    workers loads it from the database while the others wait for the result
+    """
+    compiled_quiz = await published_cache.get(quiz_id)
+    if compiled_quiz is not None:
+        return compiled_quiz
+
+    async def build() -> CompiledPublishedQuiz:
+        revision = await published_cache.revision.content(quiz_id)
+        # the load outlives a cancelled request that started it, so it must not
+        # run on the session of that request
+        async with quiz_repository.new_session() as session:
+            try:
+                quiz = await QuizRepository(session).get_shared_by_id(quiz_id=quiz_id)
+            except ItemNotFoundError:
+                raise BadRequestException("quiz not found", "no_quiz_found")
+
+            questions = await QuestionRepository(session).get_shared_quiz_questions(
+                quiz_id=quiz_id
+            )
+            snapshot = build_published_snapshot(
+                quiz=quiz, questions=questions, revision=revision
+            )
+        return await published_cache.set(snapshot)
+
+    redis_flight = RedisSingleFlight(published_cache.redis_client)
+    return await published_flight.do(
+        quiz_id,
+        lambda: redis_flight.do(
+            f"published_quiz:{quiz_id}", build, lambda: published_cache.get(quiz_id)
+        ),
+    )
+
+
+async def get_answer_key(
+    question_repository: QuestionRepository,
+    answer_key_cache: AnswerKeyCache,
+    quiz_id: int,
+) -> QuizAnswerKey:
+    answer_key = await answer_key_cache.get(quiz_id)
+    if answer_key is not None:
+        return answer_key
+
+    async def build() -> QuizAnswerKey:
+        revision = await answer_key_cache.revision.content(quiz_id)
+        async with question_repository.new_session() as session:
+            questions = await QuestionRepository(session).get_shared_quiz_questions(
+                quiz_id=quiz_id
+            )
+            answer_key = build_answer_key(
+                quiz_id=quiz_id, questions=questions, revision=revision
+            )
+        return await answer_key_cache.set(answer_key)
+
+    return await answer_key_flight.do(quiz_id, build)
+
+
+async def get_published_quiz_by_path(
+    quiz_repository: QuizRepository,
+    question_repository: QuestionRepository,
+    published_cache: PublishedQuizCache,
+    path_cache: QuizPathCache,
+    quiz_path: str,
+) -> CompiledPublishedQuiz:
+    quiz_id = await path_cache.get(quiz_path)
+    if quiz_id is None:
+        try:
+            quiz = await quiz_repository.get_by_path(quiz_path=quiz_path)
+        except ItemNotFoundError:
+            raise BadRequestException("quiz not found", "quiz_not_found")
+        quiz_id = quiz.id
+        await path_cache.set(quiz_path, quiz_id)
+
+    try:
+        compiled_quiz = await get_published_quiz(
+            quiz_repository, question_repository, published_cache, quiz_id
+        )
+    except BadRequestException:
+        compiled_quiz = None
+
+    # the quiz was deleted or moved to another path after the lookup was cached
+    if compiled_quiz is None or compiled_quiz.snapshot.quiz_path != quiz_path:
+        await path_cache.delete(quiz_path)
+        raise BadRequestException("quiz not found", "quiz_not_found")
+    return compiled_quiz
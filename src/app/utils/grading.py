@@ -0,0 +1,29 @@
+from src.app.schemas.extra.answer_key import QuizAnswerKey
+from src.app.schemas.extra.submission import GradedMultipleOptionAnswer
+from src.app.schemas.in_.quizzes import UserMultipleOptionAnswersIn
+
+
+def grade_multiple_option_answers(
+    answer_key: QuizAnswerKey, user_answers: list[UserMultipleOptionAnswersIn]
+) -> list[GradedMultipleOptionAnswer]:
+    """
+    compare answers with the correct option of their question, answers must be
+    validated against the same answer key first
+    """
+    graded_answers = []
+    for user_answer in user_answers:
+        correct_option_id = answer_key.questions[
+            user_answer.question_id
+        ].correct_option_id
+        graded_answers.append(
+            GradedMultipleOptionAnswer(
+                question_id=user_answer.question_id,
+                option_id=user_answer.option_id,
+                is_correct=(
+                    None
+                    if correct_option_id is None
+                    else user_answer.option_id == correct_option_id
+                ),
+            )
+        )
+    return graded_answers
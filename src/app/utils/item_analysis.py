@@ -0,0 +1,124 @@
+import math
+
+import numpy as np
+
+from src.app.models.enums_ import QuestionType
+from src.app.schemas.extra.answer_key import QuizAnswerKey
+from src.app.schemas.out.analytics import (
+    OptionSelectionOut,
+    QuestionAnalysisOut,
+    QuizItemAnalysisOut,
+    ScorePercentilesOut,
+)
+
+PERCENTILES = (10, 25, 50, 75, 90)
+
+
+def _finite_or_none(value: float) -> float | None:
+    return None if math.isnan(value) else float(value)
+
+
+def analyze_items(
+    answer_key: QuizAnswerKey,
+    answers: list[tuple],
+    content_revision: int,
+    answers_revision: int,
+) -> QuizItemAnalysisOut:
+    """
+    item statistics of a quiz from its (participant id, question id, option id,
+    earned score) answer rows, everything is computed on a participants x
+    questions score matrix without looping over participants
+    """
+    question_ids = np.array(sorted(answer_key.questions), dtype=np.int64)
+    max_scores = np.array(
+        [answer_key.questions[q].score for q in question_ids.tolist()], dtype=float
+    )
+
+    columns = zip(*answers) if answers else ((),) * 4
+    participant_col, question_col, option_col, score_col = columns
+    participant_col = np.array(participant_col, dtype=np.int64)
+    question_col = np.array(question_col, dtype=np.int64)
+    option_col = np.array(option_col, dtype=float)  # no option (None) becomes nan
+    score_col = np.array(score_col, dtype=float)
+
+    # answers of questions that are not in the answer key any more are ignored
+    known = np.isin(question_col, question_ids)
+    participant_col, question_col = participant_col[known], question_col[known]
+    option_col, score_col = option_col[known], score_col[known]
+
+    participants, participant_index = np.unique(participant_col, return_inverse=True)
+    question_index = np.searchsorted(question_ids, question_col)
+    scores = np.zeros((len(participants), len(question_ids)))
+    answered = np.zeros_like(scores, dtype=bool)
+    scores[participant_index, question_index] = score_col
+    answered[participant_index, question_index] = True
+
+    totals = scores.sum(axis=1)
+    answered_count = answered.sum(axis=0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        earned_ratio = np.where(max_scores > 0, scores / max_scores, 0.0)
+        difficulty = (earned_ratio * answered).sum(axis=0) / answered_count
+
+        # point-biserial of each question against the total without it
+        rest = totals[:, None] - scores
+        item_deviation = scores - scores.sum(axis=0) / len(participants)
+        rest_deviation = rest - rest.sum(axis=0) / len(participants)
+        discrimination = (item_deviation * rest_deviation).sum(axis=0) / np.sqrt(
+            (item_deviation**2).sum(axis=0) * (rest_deviation**2).sum(axis=0)
+        )
+
+    option_ids = np.array(
+        sorted(o for q in answer_key.questions.values() for o in q.option_ids),
+        dtype=np.int64,
+    )
+    selected = option_col[~np.isnan(option_col)].astype(np.int64)
+    selected = selected[np.isin(selected, option_ids)]
+    option_counts = np.bincount(
+        np.searchsorted(option_ids, selected), minlength=len(option_ids)
+    )
+    option_position = {o: i for i, o in enumerate(option_ids.tolist())}
+
+    questions = []
+    for i, question_id in enumerate(question_ids.tolist()):
+        question = answer_key.questions[question_id]
+        options = []
+        if question.question_type == QuestionType.MULTIPLE_OPTIONS:
+            for option_id in question.option_ids:
+                count = int(option_counts[option_position[option_id]])
+                options.append(
+                    OptionSelectionOut(
+                        option_id=option_id,
+                        count=count,
+                        ratio=count / answered_count[i] if answered_count[i] else 0,
+                    )
+                )
+        questions.append(
+            QuestionAnalysisOut(
+                question_id=question_id,
+                question_type=question.question_type,
+                max_score=question.score,
+                answered_count=int(answered_count[i]),
+                difficulty=_finite_or_none(difficulty[i]),
+                discrimination=_finite_or_none(discrimination[i]),
+                options=options,
+            )
+        )
+
+    percentiles = None
+    if len(participants):
+        percentiles = ScorePercentilesOut(
+            **{
+                f"p{p}": float(v)
+                for p, v in zip(PERCENTILES, np.percentile(totals, PERCENTILES))
+            }
+        )
+    return QuizItemAnalysisOut(
+        quiz_id=answer_key.quiz_id,
+        content_revision=content_revision,
+        answers_revision=answers_revision,
+        participant_count=len(participants),
+        mean_score=float(totals.mean()) if len(participants) else None,
+        std_score=float(totals.std()) if len(participants) else None,
+        percentiles=percentiles,
+        questions=questions,
+    )
@@ -0,0 +1,87 @@
+import logging
+from collections import defaultdict
+
+from src.app.cache import Leaderboard
+from src.app.cache.leaderboard import LeaderboardRow
+from src.app.repositories import ParticipantScoreRepository
+from src.core.cache.stats import record_lookup
+from src.core.repository.single_flight import SingleFlight, RedisSingleFlight
+
+logger = logging.getLogger(__name__)
+
+# one rebuild per quiz and process, the redis lock extends it to workers
+leaderboard_flight = SingleFlight()
+REBUILD_ATTEMPTS = 5
+
+
+async def update_leaderboard(
+    score_repository: ParticipantScoreRepository,
+    leaderboard: Leaderboard,
+    participant_ids: list[int],
+) -> None:
+    """push the committed totals of participants to the leaderboards of their quizzes"""
+    rows_by_quiz: dict[int, list[LeaderboardRow]] = defaultdict(list)
+    for (
+        quiz_id,
+        participant_id,
+        username,
+        total_score,
+    ) in await score_repository.get_totals(participant_ids):
+        rows_by_quiz[quiz_id].append((participant_id, username, total_score))
+
+    for quiz_id, rows in rows_by_quiz.items():
+        await leaderboard.update(quiz_id, rows)
+
+
+async def rebuild_leaderboard(
+    score_repository: ParticipantScoreRepository,
+    leaderboard: Leaderboard,
+    quiz_id: int,
+) -> bool:
+    """
+    rebuild from the committed totals, read again when scores changed while
+    they were read, False when they kept changing for every attempt
+    """
+    for _ in range(REBUILD_ATTEMPTS):
+        generation = await leaderboard.generation(quiz_id)
+        totals = await score_repository.get_quiz_totals(quiz_id)
+        rows = [
+            (participant_id, username, score)
+            for _, participant_id, username, score in totals
+        ]
+        if await leaderboard.rebuild(quiz_id, rows, generation):
+            return True
+    logger.warning("leaderboard of quiz %s kept changing while rebuilt", quiz_id)
+    return False
+
+
+async def ensure_leaderboard(
+    score_repository: ParticipantScoreRepository,
+    leaderboard: Leaderboard,
+    quiz_id: int,
+) -> None:
+    """
+    rebuild a missing leaderboard from participant_scores, on a cold start only
+    one request across all workers reads the scores of the quiz
+    """
+    is_built = await leaderboard.is_built(quiz_id)
+    record_lookup("leaderboard", is_built)
+    if is_built:
+        return
+
+    async def build() -> bool:
+        # own session, the request that started the rebuild may be cancelled
+        async with score_repository.new_session() as session:
+            await rebuild_leaderboard(
+                ParticipantScoreRepository(session), leaderboard, quiz_id
+            )
+        return True
+
+    async def read_shared() -> bool | None:
+        return True if await leaderboard.is_built(quiz_id) else None
+
+    redis_flight = RedisSingleFlight(leaderboard.redis_client)
+    await leaderboard_flight.do(
+        quiz_id,
+        lambda: redis_flight.do(f"leaderboard:{quiz_id}", build, read_shared),
+    )
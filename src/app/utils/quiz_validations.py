@@ -1,6 +1,7 @@
 from datetime import timezone, datetime
 
 from src.app.models import Quiz
+from src.app.schemas.extra.published_quiz import PublishedQuizSnapshot
 from src.core.excpetions import BadRequestException
 
 
@@ -18,13 +19,13 @@ def validate_quiz_for_activation(quiz: Quiz) -> None:
         raise BadRequestException("dates are not present", "bad_dates")
     if not quiz.end_at > quiz.start_at:
         raise BadRequestException("wrong dates", "bad_dates")
-    if len(quiz.questions) == 0:
+    if quiz.question_count == 0:
         raise BadRequestException("quiz have no question", "quiz_have_no_question")
     if quiz.need_password and not quiz.password:
         raise BadRequestException("Add password to quiz", "set_quiz_password")
 
 
-def validate_quiz_is_started(quiz: Quiz) -> None:
+def validate_quiz_is_started(quiz: Quiz | PublishedQuizSnapshot) -> None:
     check_quiz_dates(quiz.start_at, quiz.end_at)
 
     if not quiz.is_active:
@@ -1,4 +1,5 @@
-from src.app.models import Question
+from src.app.models.enums_ import QuestionType
+from src.app.schemas.extra.answer_key import QuizAnswerKey, AnswerKeyQuestion
 from src.app.schemas.in_.quizzes import (
     UserMultipleOptionAnswersIn,
     UserDescriptiveAnswersIn,
@@ -6,23 +7,43 @@ from src.app.schemas.in_.quizzes import (
 from src.core.excpetions import BadRequestException
 
 
+def _get_answered_questions(
+    answer_key: QuizAnswerKey,
+    question_ids: list[int],
+    multiple_options: bool,
+) -> list[AnswerKeyQuestion]:
+    """every answer must point to its own question of the right kind in the quiz"""
+    questions = [answer_key.questions.get(question_id) for question_id in question_ids]
+    if len(set(question_ids)) != len(question_ids) or any(
+        question is None
+        or (question.question_type == QuestionType.MULTIPLE_OPTIONS) != multiple_options
+        for question in questions
+    ):
+        raise BadRequestException("question missing from answer", "question_missing")
+    return questions  # type: ignore
+
+
 def validate_answer_option_questions(
-    questions: list[Question], user_answers: list[UserMultipleOptionAnswersIn]
+    answer_key: QuizAnswerKey, user_answers: list[UserMultipleOptionAnswersIn]
 ) -> None:
     """check if user multiple option answers are compatible with the quiz questions"""
-    if len(questions) != len(user_answers):
-        raise BadRequestException("question missing from answer", "question_missing")
-
+    questions = _get_answered_questions(
+        answer_key,
+        [answer.question_id for answer in user_answers],
+        multiple_options=True,
+    )
     for question, user_answer in zip(questions, user_answers):
-        option_ids = [option.id for option in question.multiple_options]
-        if user_answer.option_id not in option_ids:
+        if user_answer.option_id not in question.option_ids:
             raise BadRequestException(
                 message=user_answer.option_id, type_="wrong_option_id"
             )
 
 
 def validate_answer_descriptive_question(
-    questions: list[Question], user_answers: list[UserDescriptiveAnswersIn]
+    answer_key: QuizAnswerKey, user_answers: list[UserDescriptiveAnswersIn]
 ) -> None:
-    if len(questions) != len(user_answers):
-        raise BadRequestException("question missing from answer", "question_missing")
+    _get_answered_questions(
+        answer_key,
+        [answer.question_id for answer in user_answers],
+        multiple_options=False,
+    )
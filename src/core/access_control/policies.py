@@ -1,4 +1,5 @@
 from src.app.models import Quiz
+from src.app.schemas.extra.published_quiz import PublishedQuizSnapshot
 from src.core.excpetions import ForbiddenException
 from src.core.protocols.user_info import UserInfo
 
@@ -19,7 +20,7 @@ async def is_admin(kwargs: dict) -> bool:
 
 
 async def check_quiz_password(kwargs: dict) -> bool:
-    quiz: Quiz = kwargs["quiz"]
+    quiz: Quiz | PublishedQuizSnapshot = kwargs["quiz"]
     if quiz.need_password and quiz.password:
         if quiz.password != kwargs["entered_password"]:
             raise ForbiddenException(
@@ -0,0 +1,50 @@
+import time
+from collections import OrderedDict
+from typing import Any, Hashable
+
+from .stats import record_lookup
+
+
+class MemoryCache:
+    """
+    bounded per-worker cache, least recently used entries are dropped when the
+    cache is full and every entry expires after ttl seconds
+    """
+
+    def __init__(self, max_size: int, ttl: float, name: str = "memory"):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.name = name
+        self._items: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+
+    def get(self, key: Hashable) -> Any | None:
+        item = self._items.get(key)
+        if item is None:
+            record_lookup(self.name, False)
+            return None
+
+        expire_at, value = item
+        if expire_at < time.monotonic():
+            del self._items[key]
+            record_lookup(self.name, False)
+            return None
+
+        self._items.move_to_end(key)
+        record_lookup(self.name, True)
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: float | None = None) -> None:
+        expire_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        self._items[key] = (expire_at, value)
+        self._items.move_to_end(key)
+        if len(self._items) > self.max_size:
+            self._items.popitem(last=False)
+
+    def delete(self, key: Hashable) -> None:
+        self._items.pop(key, None)
+
+    def clear(self) -> None:
+        self._items.clear()
+
+    def __len__(self) -> int:
+        return len(self._items)
@@ -1,10 +1,75 @@
 from redis.asyncio import ConnectionPool
 from redis.asyncio.client import Redis
+from redis.exceptions import ResponseError
 
 from ..config import settings
+from ..metrics import Gauge, registry
 
 redis_connection_pool = ConnectionPool.from_url(settings.REDIS_URL, max_connections=100)
 
+redis_pool_in_use = Gauge(
+    "redis_pool_connections_in_use", "redis connections running a command"
+)
+redis_pool_idle = Gauge("redis_pool_connections_idle", "open idle redis connections")
+redis_pool_max = Gauge("redis_pool_max_connections", "redis connection pool limit")
+
+
+def collect_redis_pool_stats() -> None:
+    redis_pool_in_use.set(len(redis_connection_pool._in_use_connections))
+    redis_pool_idle.set(len(redis_connection_pool._available_connections))
+    redis_pool_max.set(redis_connection_pool.max_connections)
+
+
+registry.add_collector(collect_redis_pool_stats)
+
+# compare-and-delete, so a lock is only released by the client that holds it
+DELETE_IF_EQUALS_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+# ZADD only while the sorted set exists, so an update never creates a partial set,
+# a miss increments KEYS[2] when ARGV[1] is "1" and deletes the remaining keys
+SORTED_SET_ADD_IF_EXISTS_SCRIPT = """
+if redis.call("exists", KEYS[1]) == 0 then
+    local first_delete = 2
+    if ARGV[1] == "1" then
+        redis.call("incr", KEYS[2])
+        first_delete = 3
+    end
+    for i = first_delete, #KEYS do
+        redis.call("del", KEYS[i])
+    end
+    return 0
+end
+for i = 2, #ARGV, 2 do
+    redis.call("zadd", KEYS[1], ARGV[i], ARGV[i + 1])
+end
+return 1
+"""
+
+# RENAME the ARGV[2] key pairs after KEYS[1] and DEL the keys after them while
+# KEYS[1] holds ARGV[1], a missing KEYS[1] counts as "0", otherwise the source
+# keys are dropped
+RENAME_IF_EQUALS_SCRIPT = """
+local renames = tonumber(ARGV[2])
+if (redis.call("get", KEYS[1]) or "0") ~= ARGV[1] then
+    for i = 2, 2 * renames, 2 do
+        redis.call("del", KEYS[i])
+    end
+    return 0
+end
+for i = 2, 2 * renames, 2 do
+    redis.call("rename", KEYS[i], KEYS[i + 1])
+end
+for i = 2 * renames + 2, #KEYS do
+    redis.call("del", KEYS[i])
+end
+return 1
+"""
+
 
 class RedisClient:
     def __init__(self):
@@ -24,6 +89,131 @@ class RedisClient:
     async def exists(self, *keys) -> int:
         return await self.redis.exists(*keys)
 
+    async def mget(self, *keys) -> list:
+        return await self.redis.mget(*keys)
+
+    async def incr(self, key) -> int:
+        return await self.redis.incr(key)
+
+    async def set_if_not_exists(self, key, value, expire: int | None = None) -> bool:
+        result = await self.redis.set(key, value, ex=expire, nx=True)
+        return bool(result)
+
+    async def delete_if_equals(self, key, value) -> int:
+        return await self.redis.eval(DELETE_IF_EQUALS_SCRIPT, 1, key, value)
+
+    async def rename_if_equals(
+        self, key, value, renames: dict, delete: tuple = ()
+    ) -> bool:
+        """
+        rename every src key of renames to its dst key and delete the keys of
+        delete in one step while key holds value, otherwise drop the src keys
+        """
+        keys = [key, *(k for pair in renames.items() for k in pair), *delete]
+        return bool(
+            await self.redis.eval(
+                RENAME_IF_EQUALS_SCRIPT, len(keys), *keys, value, len(renames)
+            )
+        )
+
+    async def hash_set(self, key, mapping: dict, expire: int | None = None) -> None:
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.hset(key, mapping=mapping)
+            if expire is not None:
+                pipe.expire(key, expire)
+            await pipe.execute()
+
+    async def hash_get_many(self, key, *fields) -> list:
+        return await self.redis.hmget(key, fields)
+
+    async def sorted_set_add(
+        self,
+        key,
+        mapping: dict,
+        only_if_exists: bool = False,
+        miss_counter=None,
+        miss_delete: tuple = (),
+    ) -> bool:
+        """
+        add members with their scores, returns False when nothing was written,
+        with only_if_exists a missing set increments miss_counter and deletes
+        the keys of miss_delete in the same step
+        """
+        if not only_if_exists:
+            await self.redis.zadd(key, mapping)
+            return True
+        keys = [key, *([miss_counter] if miss_counter else []), *miss_delete]
+        args = [item for member, score in mapping.items() for item in (score, member)]
+        return bool(
+            await self.redis.eval(
+                SORTED_SET_ADD_IF_EXISTS_SCRIPT,
+                len(keys),
+                *keys,
+                "1" if miss_counter else "0",
+                *args,
+            )
+        )
+
+    async def sorted_set_score(self, key, member) -> float | None:
+        return await self.redis.zscore(key, member)
+
+    async def sorted_set_size(self, key) -> int:
+        return await self.redis.zcard(key)
+
+    async def sorted_set_count(self, key, min_, max_) -> int:
+        """members scored between min_ and max_, "(" marks an exclusive bound"""
+        return await self.redis.zcount(key, min_, max_)
+
+    async def sorted_set_top(self, key, start: int, stop: int) -> list[tuple]:
+        """members from highest to lowest score as (member, score) pairs"""
+        return await self.redis.zrevrange(key, start, stop, withscores=True)
+
+    async def sorted_set_top_by_score(
+        self, key, max_, min_, start: int, num: int
+    ) -> list[tuple]:
+        return await self.redis.zrevrangebyscore(
+            key, max_, min_, start=start, num=num, withscores=True
+        )
+
+    async def stream_add(self, stream, fields: dict) -> bytes:
+        return await self.redis.xadd(stream, fields)
+
+    async def stream_create_group(self, stream, group) -> None:
+        try:
+            await self.redis.xgroup_create(stream, group, id="0", mkstream=True)
+        except ResponseError as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+
+    async def stream_read_group(
+        self, stream, group, consumer, count: int, block: int | None = None, id_=">"
+    ) -> list[tuple]:
+        """read entries for a consumer, id_="0" re-reads its unacknowledged ones"""
+        result = await self.redis.xreadgroup(
+            group, consumer, {stream: id_}, count=count, block=block
+        )
+        return result[0][1] if result else []
+
+    async def stream_pending(
+        self, stream, group, count: int, min_idle_ms: int
+    ) -> list[dict]:
+        """unacknowledged entries idle for at least min_idle_ms with their deliveries"""
+        return await self.redis.xpending_range(
+            stream, group, min="-", max="+", count=count, idle=min_idle_ms
+        )
+
+    async def stream_claim(
+        self, stream, group, consumer, min_idle_ms: int, *ids
+    ) -> list[tuple]:
+        """move unacknowledged entries to a consumer, counted as a new delivery"""
+        entries = await self.redis.xclaim(stream, group, consumer, min_idle_ms, ids)
+        # entries deleted from the stream come back without fields
+        return [(entry_id, fields) for entry_id, fields in entries if fields]
+
+    async def stream_ack(self, stream, group, *ids) -> None:
+        await self.redis.xack(stream, group, *ids)
+        await self.redis.xdel(stream, *ids)
+
 
 async def get_redis() -> RedisClient:
     return RedisClient()
@@ -0,0 +1,9 @@
+from src.core.metrics import Counter
+
+cache_lookups = Counter(
+    "cache_lookups_total", "cache reads by cache and result", ("cache", "result")
+)
+
+
+def record_lookup(cache: str, hit: bool) -> None:
+    cache_lookups.inc(cache=cache, result="hit" if hit else "miss")
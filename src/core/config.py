@@ -8,11 +8,59 @@ class Environments(Enum):
     PRODUCTION = "production"
 
 
+class SubmissionModes(Enum):
+    SYNC = "sync"
+    QUEUE = "queue"
+
+
+class JwtBackends(Enum):
+    JOSE = "jose"
+    PYJWT = "pyjwt"
+
+
 class Settings(BaseSettings):
     ENVIRONMENT: Environments
     DATABASE_URL: str
     REDIS_URL: str
 
+    # separate connection pools so exports and jobs can not starve submissions
+    PARTICIPANT_POOL_SIZE: int = 20
+    PARTICIPANT_POOL_OVERFLOW: int = 10
+    OWNER_POOL_SIZE: int = 5
+    OWNER_POOL_OVERFLOW: int = 5
+    BACKGROUND_POOL_SIZE: int = 3
+    BACKGROUND_POOL_OVERFLOW: int = 0
+    EXPORT_POOL_SIZE: int = 2
+    EXPORT_POOL_OVERFLOW: int = 0
+    POOL_TIMEOUT_SECONDS: float = 10
+
+    # reads of the repository helpers go to the replica while it keeps up
+    DATABASE_REPLICA_URL: str | None = None
+    REPLICA_MAX_LAG_SECONDS: float = 2
+    REPLICA_LAG_CHECK_INTERVAL: float = 1
+
+    # blocking work runs on these pools, 0 processes keeps CPU work on threads
+    EXECUTOR_THREADS: int = 8
+    EXECUTOR_PROCESSES: int = 2
+    # submissions with more multiple-option answers are graded in a process
+    GRADING_INLINE_LIMIT: int = 200
+
+    # statements of a request slower than this are counted and logged
+    SLOW_QUERY_SECONDS: float = 0.5
+    # prometheus scrape path, answered for clients of the comma separated
+    # METRICS_ALLOWED_NETWORKS or with METRICS_TOKEN as bearer token, others get
+    # a 404, keep it off the public ingress anyway
+    METRICS_PATH: str = "/metrics"
+    METRICS_TOKEN: str | None = None
+    METRICS_ALLOWED_NETWORKS: str = "127.0.0.1/32,::1/128"
+
+    # requests with a token signed by PROFILING_SECRET are profiled, outside
+    # production unless PROFILING_ENABLED is set
+    PROFILING_SECRET: str | None = None
+    PROFILING_ENABLED: bool | None = None
+    PROFILING_INTERVAL: float = 0.001
+    PROFILING_DIR: str = "profiles"
+
     EMAIL_HOST: str
     EMAIL_HOST_USER: str
     EMAIL_HOST_PASSWORD: str
@@ -20,6 +68,28 @@ class Settings(BaseSettings):
 
     SECRET_KEY: str
     ALGORITHM: str
+    # HS* algorithms sign with SECRET_KEY, ES256/EdDSA with a PEM keypair, the
+    # public key alone is enough for services that only verify tokens
+    JWT_BACKEND: JwtBackends = JwtBackends.JOSE
+    JWT_PRIVATE_KEY_FILE: str | None = None
+    JWT_PUBLIC_KEY_FILE: str | None = None
+    # verified access tokens kept per worker, 0 verifies every request
+    JWT_CACHE_SIZE: int = 10000
+
+    PUBLISHED_QUIZ_CACHE_TTL: int = 60 * 60 * 24
+    PUBLISHED_QUIZ_LOCAL_TTL: int = 5
+
+    PREWARM_INTERVAL_SECONDS: int = 60
+    PREWARM_WINDOW_MINUTES: int = 15
+
+    SUBMISSION_MODE: SubmissionModes = SubmissionModes.SYNC
+    SUBMISSION_STREAM: str = "quiz_submissions"
+    SUBMISSION_BATCH_SIZE: int = 500
+    # unacknowledged entries idle this long are claimed again by a worker, after
+    # SUBMISSION_MAX_DELIVERIES failed deliveries they go to the dead-letter stream
+    SUBMISSION_CLAIM_IDLE_SECONDS: int = 60
+    SUBMISSION_MAX_DELIVERIES: int = 5
+    SUBMISSION_DEAD_LETTER_STREAM: str = "quiz_submissions:dead"
 
     model_config = SettingsConfigDict(
         env_file="src/core/.env", env_file_encoding="utf-8"
@@ -1 +1,7 @@
-from .session import Base, TimeStampedBase, get_session
+from .session import (
+    Base,
+    TimeStampedBase,
+    get_session,
+    get_participant_session,
+    get_export_session,
+)
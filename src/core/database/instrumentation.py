@@ -0,0 +1,93 @@
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Iterator
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from src.core.metrics import Counter
+
+logger = logging.getLogger(__name__)
+
+QUERY_STARTS = "query_starts"
+
+queries_total = Counter(
+    "database_queries_total", "statements sent by requests", ("route",)
+)
+query_seconds = Counter(
+    "database_query_seconds_total", "time requests spent in statements", ("route",)
+)
+slow_queries = Counter(
+    "database_slow_queries_total",
+    "statements slower than SLOW_QUERY_SECONDS",
+    ("route",),
+)
+
+
+@dataclass
+class QueryStats:
+    count: int = 0
+    seconds: float = 0
+    slowest_seconds: float = 0
+    slowest_statement: str | None = None
+
+    def add(self, statement: str, seconds: float) -> None:
+        self.count += 1
+        self.seconds += seconds
+        if seconds > self.slowest_seconds:
+            self.slowest_seconds = seconds
+            self.slowest_statement = statement
+
+
+# statements of the current request, None outside of tracked code
+current_query_stats: ContextVar[QueryStats | None] = ContextVar(
+    "current_query_stats", default=None
+)
+
+
+@contextmanager
+def track_queries() -> Iterator[QueryStats]:
+    """collect the statements run by the current task and the tasks it starts"""
+    stats = QueryStats()
+    token = current_query_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        current_query_stats.reset(token)
+
+
+def record_query_stats(stats: QueryStats, route: str, slow_seconds: float) -> None:
+    queries_total.inc(stats.count, route=route)
+    query_seconds.inc(stats.seconds, route=route)
+    if stats.slowest_seconds >= slow_seconds:
+        slow_queries.inc(route=route)
+        logger.warning(
+            "slow statement on %s took %.3fs: %s",
+            route,
+            stats.slowest_seconds,
+            stats.slowest_statement,
+        )
+
+
+def instrument_engine(engine: AsyncEngine) -> None:
+    """time every statement of the engine into the stats of the running request"""
+
+    def before_execute(conn, *_) -> None:
+        conn.info.setdefault(QUERY_STARTS, []).append(time.perf_counter())
+
+    def after_execute(conn, _cursor, statement, *_) -> None:
+        seconds = time.perf_counter() - conn.info[QUERY_STARTS].pop()
+        stats = current_query_stats.get()
+        if stats is not None:
+            stats.add(statement, seconds)
+
+    def on_error(context) -> None:
+        if context.connection is not None and context.connection.info.get(QUERY_STARTS):
+            context.connection.info[QUERY_STARTS].pop()
+
+    event.listen(engine.sync_engine, "before_cursor_execute", before_execute)
+    event.listen(engine.sync_engine, "after_cursor_execute", after_execute)
+    event.listen(engine.sync_engine, "handle_error", on_error)
@@ -0,0 +1,129 @@
+import time
+from enum import Enum
+
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from src.core.metrics import Counter, Gauge
+
+
+class TrafficClass(Enum):
+    PARTICIPANT = "participant"
+    OWNER = "owner"
+    BACKGROUND = "background"
+    EXPORT = "export"
+
+
+pool_checkouts = Counter(
+    "database_pool_checkouts_total", "connections handed out", ("traffic_class",)
+)
+pool_wait_seconds = Counter(
+    "database_pool_wait_seconds_total",
+    "time spent waiting for a pooled connection",
+    ("traffic_class",),
+)
+pool_timeouts = Counter(
+    "database_pool_timeouts_total",
+    "checkouts that gave up waiting for a connection",
+    ("traffic_class",),
+)
+pool_in_use = Gauge(
+    "database_pool_connections_in_use", "checked out connections", ("traffic_class",)
+)
+pool_saturation = Gauge(
+    "database_pool_saturation",
+    "checked out connections over the pool capacity",
+    ("traffic_class",),
+)
+
+pool_overflow = Gauge(
+    "database_pool_overflow",
+    "connections opened beyond pool_size, negative while the pool is filling",
+    ("traffic_class",),
+)
+pool_idle = Gauge(
+    "database_pool_connections_idle",
+    "connections waiting in the pool",
+    ("traffic_class",),
+)
+
+
+class BulkheadPool(AsyncAdaptedQueuePool):
+    """queue pool of one traffic class that records how long checkouts wait"""
+
+    traffic_class: TrafficClass
+
+    def _do_get(self):
+        labels = {"traffic_class": self.traffic_class.value}
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            pool_timeouts.inc(**labels)
+            raise
+        finally:
+            pool_wait_seconds.inc(time.perf_counter() - started, **labels)
+        pool_checkouts.inc(**labels)
+        return connection
+
+
+def create_bulkhead_engine(
+    url: str,
+    traffic_class: TrafficClass,
+    pool_size: int,
+    max_overflow: int,
+    pool_timeout: float,
+) -> AsyncEngine:
+    """
+    engine with a pool of its own, so one traffic class running out of
+    connections does not make the others wait
+    """
+    parsed_url = make_url(url)
+    if parsed_url.get_backend_name() == "sqlite" and parsed_url.database in (
+        None,
+        "",
+        ":memory:",
+    ):
+        # every connection of an in-memory database sees a different database
+        return create_async_engine(url)
+
+    # a subclass per traffic class survives the pool being recreated on dispose
+    pool_class = type(
+        f"{traffic_class.name.title()}BulkheadPool",
+        (BulkheadPool,),
+        {"traffic_class": traffic_class},
+    )
+    engine = create_async_engine(
+        url,
+        poolclass=pool_class,
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_timeout=pool_timeout,
+        pool_pre_ping=True,
+    )
+    labels = {"traffic_class": traffic_class.value}
+    capacity = pool_size + max_overflow
+
+    def record_usage(returned: int) -> None:
+        in_use = engine.sync_engine.pool.checkedout() - returned
+        pool_in_use.set(in_use, **labels)
+        pool_saturation.set(in_use / capacity, **labels)
+
+    # checkin fires before the connection is back in the queue
+    event.listen(engine.sync_engine, "checkout", lambda *_: record_usage(0))
+    event.listen(engine.sync_engine, "checkin", lambda *_: record_usage(1))
+    return engine
+
+
+def collect_pool_stats(engines: dict[TrafficClass, AsyncEngine]) -> None:
+    for traffic_class, engine in engines.items():
+        pool = engine.sync_engine.pool
+        if not isinstance(pool, QueuePool):
+            continue
+        labels = {"traffic_class": traffic_class.value}
+        pool_in_use.set(pool.checkedout(), **labels)
+        pool_overflow.set(pool.overflow(), **labels)
+        pool_idle.set(pool.checkedin(), **labels)
@@ -0,0 +1,90 @@
+import asyncio
+import logging
+import math
+
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from src.core.metrics import Counter, Gauge
+
+logger = logging.getLogger(__name__)
+
+# session.info keys, the router of a session and whether it must see its writes
+REPLICA_ROUTER = "replica_router"
+PRIMARY_PINNED = "primary_pinned"
+
+# a standby that replayed everything it received is not behind, however old
+# its last replayed transaction is
+REPLICA_LAG_QUERY = text(
+    """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery()
+            OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())
+    END
+    """
+)
+
+database_reads = Counter(
+    "database_reads_total", "repository reads by the engine serving them", ("engine",)
+)
+replica_fallbacks = Counter(
+    "database_replica_fallbacks_total",
+    "reads sent to the primary although a replica is configured",
+    ("reason",),
+)
+replica_lag = Gauge(
+    "database_replica_lag_seconds", "lag seen by the last replica check"
+)
+replica_usable = Gauge("database_replica_usable", "1 while reads go to the replica")
+
+
+class ReplicaRouter:
+    """
+    decides whether a read may run on the replica, the replica lag is checked at
+    most once per interval and a lagging or failing replica sends reads back to
+    the primary until the next check
+    """
+
+    def __init__(self, replica: AsyncEngine, max_lag: float, check_interval: float):
+        self.replica = replica
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self._usable = False
+        self._checked_at = -math.inf
+        self._lock = asyncio.Lock()
+
+    async def is_usable(self) -> bool:
+        loop = asyncio.get_running_loop()
+        if loop.time() - self._checked_at >= self.check_interval:
+            async with self._lock:
+                if loop.time() - self._checked_at >= self.check_interval:
+                    self._set_usable(await self._check())
+        return self._usable
+
+    def mark_failed(self) -> None:
+        """stop using the replica until the next lag check"""
+        self._set_usable(False)
+
+    async def _check(self) -> bool:
+        try:
+            lag = await self._measure_lag()
+        except (SQLAlchemyError, OSError):
+            logger.warning("replica lag check failed", exc_info=True)
+            return False
+
+        replica_lag.set(lag)
+        return lag <= self.max_lag
+
+    async def _measure_lag(self) -> float:
+        if self.replica.dialect.name != "postgresql":
+            # a local copy standing in for a replica has no replication to measure
+            return 0
+        async with self.replica.connect() as connection:
+            return float(await connection.scalar(REPLICA_LAG_QUERY) or 0)
+
+    def _set_usable(self, usable: bool) -> None:
+        self._usable = usable
+        self._checked_at = asyncio.get_running_loop().time()
+        replica_usable.set(int(usable))
@@ -1,11 +1,15 @@
 from datetime import datetime
 
-from sqlalchemy import DateTime
+from sqlalchemy import DateTime, event
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncAttrs, async_sessionmaker, create_async_engine
-from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
+from sqlalchemy.orm import DeclarativeBase, Mapped, Session, mapped_column
 
 from ..config import settings
+from ..metrics import registry
+from .instrumentation import instrument_engine
+from .pool import TrafficClass, create_bulkhead_engine, collect_pool_stats
+from .replica import ReplicaRouter, REPLICA_ROUTER, PRIMARY_PINNED
 
 
 class Base(AsyncAttrs, DeclarativeBase):
@@ -19,8 +23,53 @@ class TimeStampedBase(Base):
     )
 
 
-async_engine = create_async_engine(settings.DATABASE_URL)
-async_session = async_sessionmaker(bind=async_engine, expire_on_commit=False)
+engines = {
+    traffic_class: create_bulkhead_engine(
+        settings.DATABASE_URL,
+        traffic_class,
+        pool_size=getattr(settings, f"{traffic_class.name}_POOL_SIZE"),
+        max_overflow=getattr(settings, f"{traffic_class.name}_POOL_OVERFLOW"),
+        pool_timeout=settings.POOL_TIMEOUT_SECONDS,
+    )
+    for traffic_class in TrafficClass
+}
+async_engine = engines[TrafficClass.OWNER]
+registry.add_collector(lambda: collect_pool_stats(engines))
+replica_router = (
+    ReplicaRouter(
+        create_async_engine(settings.DATABASE_REPLICA_URL),
+        max_lag=settings.REPLICA_MAX_LAG_SECONDS,
+        check_interval=settings.REPLICA_LAG_CHECK_INTERVAL,
+    )
+    if settings.DATABASE_REPLICA_URL
+    else None
+)
+for engine in engines.values():
+    instrument_engine(engine)
+if replica_router is not None:
+    instrument_engine(replica_router.replica)
+session_factories = {
+    traffic_class: async_sessionmaker(
+        bind=engine, expire_on_commit=False, info={REPLICA_ROUTER: replica_router}
+    )
+    for traffic_class, engine in engines.items()
+}
+# sessions opened outside of a request belong to background jobs
+async_session = session_factories[TrafficClass.BACKGROUND]
+# the submission worker writes what participant requests would have written
+participant_session = session_factories[TrafficClass.PARTICIPANT]
+
+
+@event.listens_for(Session, "after_flush")
+def pin_primary_after_flush(session: Session, _) -> None:
+    session.info[PRIMARY_PINNED] = True
+
+
+@event.listens_for(Session, "do_orm_execute")
+def pin_primary_on_write(orm_execute_state) -> None:
+    # reads after a write of the session must see it, the replica may not yet
+    if not orm_execute_state.is_select:
+        orm_execute_state.session.info[PRIMARY_PINNED] = True
 
 
 async def init_models():
@@ -29,9 +78,20 @@ async def init_models():
         await conn.run_sync(Base.metadata.create_all)
 
 
-async def get_session():
-    try:
-        async with async_session() as session:
-            yield session
-    except SQLAlchemyError as e:
-        print(e)
+def _session_dependency(traffic_class: TrafficClass):
+    async def get_session():
+        try:
+            async with session_factories[traffic_class]() as session:
+                yield session
+        except SQLAlchemyError as e:
+            print(e)
+
+    return get_session
+
+
+# owner and account routes
+get_session = _session_dependency(TrafficClass.OWNER)
+# routes participants hit while taking a quiz
+get_participant_session = _session_dependency(TrafficClass.PARTICIPANT)
+# streaming exports hold a connection until the last row is sent
+get_export_session = _session_dependency(TrafficClass.EXPORT)
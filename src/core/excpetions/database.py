@@ -1,2 +1,11 @@
 class ItemNotFoundError(Exception):
     pass
+
+
+class InvalidGradesError(Exception):
+    """answers that are not in the quiz or were scored above their question score"""
+
+    def __init__(self, descriptive_ids: list[int], multiple_option_ids: list[int]):
+        super().__init__(descriptive_ids, multiple_option_ids)
+        self.descriptive_ids = descriptive_ids
+        self.multiple_option_ids = multiple_option_ids
@@ -0,0 +1,94 @@
+import asyncio
+import multiprocessing
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from enum import Enum
+from typing import Any, Callable, TypeVar
+
+from .config import settings
+from .metrics import Counter, Gauge, Histogram
+
+T = TypeVar("T")
+
+
+class PoolKind(Enum):
+    THREAD = "thread"
+    PROCESS = "process"
+
+
+tasks_pending = Gauge(
+    "executor_tasks_pending", "tasks submitted and not finished yet", ("pool",)
+)
+tasks_total = Counter("executor_tasks_total", "finished tasks", ("pool",))
+queue_wait_seconds = Histogram(
+    "executor_queue_wait_seconds", "time tasks waited for a free worker", ("pool",)
+)
+
+
+def _timed_call(fn: Callable[..., T], args: tuple) -> tuple[float, T]:
+    # runs in the worker, the start time tells how long the task was queued
+    return time.time(), fn(*args)
+
+
+class Executors:
+    """
+    worker pools for blocking work of the event loop, threads for code that
+    releases the GIL (bcrypt, numpy) and processes for pure-python CPU work,
+    pools are created on first use when the app lifespan did not start them
+    """
+
+    def __init__(self, threads: int, processes: int):
+        self.threads = threads
+        self.processes = processes
+        self._pools: dict[PoolKind, Executor] = {}
+
+    def _pool(self, kind: PoolKind) -> Executor:
+        if kind == PoolKind.PROCESS and not self.processes:
+            kind = PoolKind.THREAD
+        pool = self._pools.get(kind)
+        if pool is None:
+            if kind == PoolKind.THREAD:
+                pool = ThreadPoolExecutor(self.threads, thread_name_prefix="worker")
+            else:
+                # forking a process that runs an event loop and threads is unsafe
+                pool = ProcessPoolExecutor(
+                    self.processes, mp_context=multiprocessing.get_context("spawn")
+                )
+            self._pools[kind] = pool
+        return pool
+
+    def start(self) -> None:
+        for kind in PoolKind:
+            self._pool(kind)
+
+    def shutdown(self, wait: bool = True) -> None:
+        for pool in self._pools.values():
+            pool.shutdown(wait=wait, cancel_futures=True)
+        self._pools.clear()
+
+    async def run(self, kind: PoolKind, fn: Callable[..., T], *args: Any) -> T:
+        labels = {"pool": kind.value}
+        pool = self._pool(kind)
+        tasks_pending.inc(**labels)
+        submitted = time.time()
+        try:
+            started, result = await asyncio.get_running_loop().run_in_executor(
+                pool, _timed_call, fn, args
+            )
+        finally:
+            tasks_pending.dec(**labels)
+        queue_wait_seconds.observe(max(started - submitted, 0), **labels)
+        tasks_total.inc(**labels)
+        return result
+
+    async def run_in_thread(self, fn: Callable[..., T], *args: Any) -> T:
+        return await self.run(PoolKind.THREAD, fn, *args)
+
+    async def run_in_process(self, fn: Callable[..., T], *args: Any) -> T:
+        """fn and its arguments must be picklable, module level functions"""
+        return await self.run(PoolKind.PROCESS, fn, *args)
+
+
+executors = Executors(
+    threads=settings.EXECUTOR_THREADS, processes=settings.EXECUTOR_PROCESSES
+)
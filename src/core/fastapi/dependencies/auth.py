@@ -1,3 +1,6 @@
+import hashlib
+import time
+
 from fastapi import Depends
 from fastapi.security import (
     OAuth2PasswordBearer,
@@ -9,6 +12,8 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from src.app.models import User
 from src.app.repositories import UserRepository
 from src.app.schemas.extra.token import TokenData
+from src.core.cache.memory_cache import MemoryCache
+from src.core.config import settings
 from src.core.excpetions.http_exceptions import (
     UnAuthorizedException,
     BadRequestException,
@@ -23,6 +28,14 @@ from src.core.security import JWTHandler
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/user/login-form", auto_error=False)
 http_bearer = HTTPBearer()
 
+# access tokens that passed verification, kept until they expire so repeated
+# requests with one token skip the signature check
+verified_tokens = (
+    MemoryCache(max_size=settings.JWT_CACHE_SIZE, ttl=0, name="verified_jwt")
+    if settings.JWT_CACHE_SIZE
+    else None
+)
+
 
 def check_bearer(scheme: str) -> None:
     if scheme != "Bearer":
@@ -39,18 +52,28 @@ def decode_token(token_credentials: str) -> dict:
         raise BadRequestException("could not verify jwt token", "bad_token")
 
 
-def authentication_required(
+async def authentication_required(
     credentials: HTTPAuthorizationCredentials = Depends(http_bearer),
 ) -> TokenData:
     check_bearer(scheme=credentials.scheme)
+    # a digest keeps raw tokens out of the process memory of the cache
+    token_key = hashlib.sha256(credentials.credentials.encode()).digest()
+    if verified_tokens is not None:
+        token_data = verified_tokens.get(token_key)
+        if token_data is not None:
+            return token_data
+
     token = decode_token(token_credentials=credentials.credentials)
     user_id = token.get("user_id")
     if not user_id:
         raise BadRequestException("bad token", "bad_token")
 
-    return TokenData(
+    token_data = TokenData(
         user_id=user_id, exp=token.get("exp"), is_admin=token.get("is_admin")
     )
+    if verified_tokens is not None:
+        verified_tokens.set(token_key, token_data, ttl=token_data.exp - time.time())
+    return token_data
 
 
 async def get_current_user(db_session: AsyncSession, user_id: int) -> User:
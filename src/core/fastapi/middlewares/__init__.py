@@ -0,0 +1,3 @@
+from .metrics import MetricsMiddleware
+from .profiling import ProfilingMiddleware
+from .query_stats import QueryStatsMiddleware
@@ -0,0 +1,112 @@
+import hmac
+import ipaddress
+import time
+from typing import Iterable
+
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.core.metrics import CONTENT_TYPE, Gauge, Histogram, registry, render
+from .query_stats import route_of
+
+request_seconds = Histogram(
+    "http_request_duration_seconds",
+    "time to send the response of a request",
+    ("method", "route", "status"),
+)
+requests_in_flight = Gauge(
+    "http_requests_in_flight", "requests being handled", ("method",)
+)
+
+
+class MetricsMiddleware:
+    """
+    serves the registry in the prometheus text format on path and times every
+    other request, without going through the routing of the app for scrapes,
+    scrapes from clients outside allowed_networks without the bearer token are
+    passed on to the app like any other unknown path
+
+    the registry belongs to the worker process, with several workers behind one
+    port a scrape reaches any of them, so scrape every worker on its own (one
+    worker per container or port) and sum the series of the instances
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        path: str = "/metrics",
+        token: str | None = None,
+        allowed_networks: Iterable[str] = ("127.0.0.1/32", "::1/128"),
+    ):
+        self.app = app
+        self.path = path
+        self.authorization = f"Bearer {token}".encode() if token else None
+        self.allowed_networks = [
+            ipaddress.ip_network(network.strip())
+            for network in allowed_networks
+            if network.strip()
+        ]
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        if (
+            scope["path"] == self.path
+            and scope["method"] == "GET"
+            and self._may_scrape(scope)
+        ):
+            await self._send_metrics(send)
+            return
+
+        method = scope["method"]
+        status = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        requests_in_flight.inc(method=method)
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            requests_in_flight.dec(method=method)
+            request_seconds.observe(
+                time.perf_counter() - started,
+                method=method,
+                route=route_of(scope),
+                status=status,
+            )
+
+    def _may_scrape(self, scope: Scope) -> bool:
+        if self.authorization is not None:
+            authorization = Headers(scope=scope).get("authorization", "")
+            if hmac.compare_digest(authorization.encode("latin-1"), self.authorization):
+                return True
+
+        client = scope.get("client")
+        if not client:
+            return False
+        try:
+            address = ipaddress.ip_address(client[0])
+        except ValueError:
+            return False
+        return any(address in network for network in self.allowed_networks)
+
+    @staticmethod
+    async def _send_metrics(send: Send) -> None:
+        body = render(registry).encode()
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 200,
+                "headers": [
+                    (b"content-type", CONTENT_TYPE.encode()),
+                    (b"content-length", str(len(body)).encode()),
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
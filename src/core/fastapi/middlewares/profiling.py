@@ -0,0 +1,64 @@
+import asyncio
+import time
+from pathlib import Path
+from urllib.parse import parse_qs
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.core.security.profile_token import ProfileTokenHandler
+from src.core.utils.profiler import SamplingProfiler
+
+PROFILE_HEADER = "x-profile"
+PROFILE_QUERY = "profile"
+
+
+class ProfilingMiddleware:
+    """
+    runs a request under the sampling profiler when it carries a signed profile
+    token in the X-Profile header or the profile query parameter, the collapsed
+    stacks are written to output_dir and their file name is sent back in the
+    X-Profile response header, one request per worker is profiled at a time
+    """
+
+    def __init__(self, app: ASGIApp, secret: str, interval: float, output_dir: str):
+        self.app = app
+        self.secret = secret
+        self.interval = interval
+        self.output_dir = Path(output_dir)
+        self._running = False
+
+    def _token_of(self, scope: Scope) -> str | None:
+        token = Headers(scope=scope).get(PROFILE_HEADER)
+        if token is None:
+            query = parse_qs(scope["query_string"].decode())
+            token = query.get(PROFILE_QUERY, [None])[0]
+        return token
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or self._running:
+            await self.app(scope, receive, send)
+            return
+        token = self._token_of(scope)
+        if token is None or not ProfileTokenHandler.verify(self.secret, token):
+            await self.app(scope, receive, send)
+            return
+
+        profile_name = f"{time.time_ns()}.collapsed"
+
+        async def send_with_profile(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message).append("X-Profile", profile_name)
+            await send(message)
+
+        self._running = True
+        try:
+            with SamplingProfiler(self.interval) as profiler:
+                await self.app(scope, receive, send_with_profile)
+        finally:
+            self._running = False
+        await asyncio.to_thread(self._write, profile_name, profiler.collapsed())
+
+    def _write(self, profile_name: str, collapsed: str) -> None:
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        (self.output_dir / profile_name).write_text(collapsed)
@@ -0,0 +1,55 @@
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.core.database.instrumentation import (
+    QueryStats,
+    record_query_stats,
+    track_queries,
+)
+
+
+def route_of(scope: Scope) -> str:
+    """path template of the matched route, so ids do not explode the labels"""
+    route = scope.get("route")
+    return getattr(route, "path", "unmatched")
+
+
+def server_timing(stats: QueryStats) -> str:
+    return (
+        f'db;dur={stats.seconds * 1000:.2f};desc="{stats.count} queries", '
+        f"db-slowest;dur={stats.slowest_seconds * 1000:.2f}"
+    )
+
+
+class QueryStatsMiddleware:
+    """
+    count and time the statements of every request into metrics, with
+    server_timing the totals so far are also sent in a Server-Timing header
+    """
+
+    def __init__(self, app: ASGIApp, slow_seconds: float, server_timing: bool):
+        self.app = app
+        self.slow_seconds = slow_seconds
+        self.server_timing = server_timing
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_timing(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                # streamed bodies may still run statements, those only reach
+                # the metrics
+                MutableHeaders(scope=message).append(
+                    "Server-Timing", server_timing(stats)
+                )
+            await send(message)
+
+        with track_queries() as stats:
+            try:
+                await self.app(
+                    scope, receive, send_with_timing if self.server_timing else send
+                )
+            finally:
+                record_query_stats(stats, route_of(scope), self.slow_seconds)
@@ -0,0 +1,2 @@
+from .registry import Counter, Gauge, Histogram, registry
+from .exposition import CONTENT_TYPE, render
@@ -0,0 +1,50 @@
+import math
+
+from .registry import Histogram, Metric, Registry
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", r"\\").replace("\n", r"\n").replace('"', r"\"")
+
+
+def _labels(labels: dict) -> str:
+    if not labels:
+        return ""
+    pairs = ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items())
+    return f"{{{pairs}}}"
+
+
+def _number(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def _metric_lines(metric: Metric) -> list[str]:
+    lines = [
+        f"# HELP {metric.name} {_escape(metric.documentation)}",
+        f"# TYPE {metric.name} {metric.type_}",
+    ]
+    if not isinstance(metric, Histogram):
+        for labels, value in metric.samples():
+            lines.append(f"{metric.name}{_labels(labels)} {_number(value)}")
+        return lines
+
+    bounds = [*metric.buckets, math.inf]
+    for labels, cumulative, sum_, count in metric.histogram_samples():
+        for bound, bucket_count in zip(bounds, cumulative):
+            bucket_labels = _labels({**labels, "le": _number(bound)})
+            lines.append(f"{metric.name}_bucket{bucket_labels} {bucket_count}")
+        lines.append(f"{metric.name}_sum{_labels(labels)} {_number(sum_)}")
+        lines.append(f"{metric.name}_count{_labels(labels)} {count}")
+    return lines
+
+
+def render(registry: Registry) -> str:
+    """every metric of the registry in the prometheus text format"""
+    lines = []
+    for metric in registry.collect():
+        lines.extend(_metric_lines(metric))
+    return "\n".join(lines) + "\n"
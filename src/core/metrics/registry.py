@@ -0,0 +1,132 @@
+import bisect
+import threading
+from typing import Callable
+
+
+class Metric:
+    type_ = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._values: dict[tuple, float] = {}
+        self._lock = threading.Lock()
+        registry.register(self)
+
+    def _key(self, labels: dict) -> tuple:
+        return tuple([str(labels[name]) for name in self.labelnames])
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def samples(self) -> list[tuple[dict, float]]:
+        return [
+            (dict(zip(self.labelnames, key)), value)
+            for key, value in list(self._values.items())
+        ]
+
+
+class Counter(Metric):
+    type_ = "counter"
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(Metric):
+    type_ = "gauge"
+
+    def set(self, value: float, **labels) -> None:
+        self._values[self._key(labels)] = value
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels) -> None:
+        self.inc(-amount, **labels)
+
+
+class Histogram(Metric):
+    """
+    observations counted into cumulative buckets, kept per label set as the
+    count of every bucket followed by the sum and the total count
+    """
+
+    type_ = "histogram"
+    default_buckets = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple = (),
+        buckets: tuple[float, ...] = default_buckets,
+    ):
+        self.buckets = tuple(sorted(buckets))
+        self._observations: dict[tuple, list[float]] = {}
+        super().__init__(name, documentation, labelnames)
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        bucket = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            observations = self._observations.get(key)
+            if observations is None:
+                observations = self._observations[key] = [0] * (len(self.buckets) + 3)
+            # the last bucket before sum and count is +Inf
+            observations[bucket] += 1
+            observations[-2] += value
+            observations[-1] += 1
+
+    def value(self, **labels) -> float:
+        """number of observations"""
+        observations = self._observations.get(self._key(labels))
+        return observations[-1] if observations else 0
+
+    def histogram_samples(self) -> list[tuple[dict, list[int], float, int]]:
+        """labels, cumulative bucket counts, sum and count of every label set"""
+        samples = []
+        for key, observations in list(self._observations.items()):
+            cumulative, total = [], 0
+            for count in observations[:-2]:
+                total += count
+                cumulative.append(total)
+            samples.append(
+                (
+                    dict(zip(self.labelnames, key)),
+                    cumulative,
+                    observations[-2],
+                    observations[-1],
+                )
+            )
+        return samples
+
+
+class Registry:
+    """process wide collection of every metric the app defines"""
+
+    def __init__(self):
+        self.metrics: dict[str, Metric] = {}
+        self.collectors: list[Callable[[], None]] = []
+
+    def register(self, metric: Metric) -> None:
+        if metric.name in self.metrics:
+            raise ValueError(f"metric {metric.name} is already registered")
+        self.metrics[metric.name] = metric
+
+    def add_collector(self, collector: Callable[[], None]) -> None:
+        """collector that sets gauges read from elsewhere right before a scrape"""
+        self.collectors.append(collector)
+
+    def collect(self) -> list[Metric]:
+        for collector in self.collectors:
+            collector()
+        return list(self.metrics.values())
+
+
+registry = Registry()
@@ -0,0 +1,16 @@
+from typing import Protocol
+
+
+class TokenCodec(Protocol):
+    """
+    signs and verifies jwt payloads, decode raises JwtTokenExpiredException or
+    BadJwtTokenException so callers do not depend on the jwt library in use
+    """
+
+    algorithm: str
+
+    def encode(self, payload: dict) -> str:
+        ...
+
+    def decode(self, token: str) -> dict:
+        ...
@@ -1,9 +1,17 @@
 from typing import Generic, Type, TypeVar, Any, Sequence
 
-from sqlalchemy import select, Select, Delete, delete, Result, RowMapping
+from sqlalchemy import select, insert, Select, Delete, delete, Result, RowMapping
+from sqlalchemy.exc import DBAPIError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.core.database import Base
+from src.core.database.replica import (
+    ReplicaRouter,
+    REPLICA_ROUTER,
+    PRIMARY_PINNED,
+    database_reads,
+    replica_fallbacks,
+)
 from src.core.excpetions.database import ItemNotFoundError
 
 Model = TypeVar("Model", bound=Base)
@@ -22,40 +30,97 @@ class BaseRepository(Generic[Model]):
         query = delete(self.model).where(getattr(self.model, field) == value)  # noqa
         return query
 
-    async def _create_and_refresh(self, **kwargs) -> Model:
-        new_model = self.model(**kwargs)
-        self.session.add(new_model)
-        await self.session.commit()
-        await self.session.refresh(new_model)
+    async def _insert(self, **kwargs) -> Model:
+        """INSERT ... RETURNING the new row inside the transaction of the session"""
+        query = insert(self.model).values(**kwargs).returning(self.model)
+        return (await self._execute(query)).scalar_one()
+
+    async def _create(self, **kwargs) -> Model:
+        new_model = await self._insert(**kwargs)
+        await self.commit()
         return new_model
 
-    async def _create(self, **kwargs) -> None:
-        new_model = self.model(**kwargs)
-        self.session.add(new_model)
+    async def commit(self) -> None:
+        """end the unit of work, repositories sharing the session commit once"""
         await self.session.commit()
 
     async def _one(self, query) -> Model:
-        result = await self.session.scalars(query)
-        result = result.one_or_none()
+        result = await self._one_or_none(query)
         if not result:
             raise ItemNotFoundError
         return result
 
     async def _one_or_none(self, query) -> Model | None:
-        result = await self._execute(query)
-        return result.scalars().one_or_none()
+        result, from_replica = await self._read_with_engine(query)
+        model = result.scalars().one_or_none()
+        if model is None and from_replica:
+            # the row may be too new for the replica
+            replica_fallbacks.inc(reason="missing")
+            model = (await self._execute(query)).scalars().one_or_none()
+        return model
 
     async def _all(self, query) -> list[Model]:
-        results = await self.session.scalars(query)
-        return results.all()
+        results = await self._read(query)
+        return results.scalars().all()
 
     async def _mappings_one(self, query) -> RowMapping:
-        result = await self._execute(query)
+        result = await self._read(query)
         return result.mappings().one()
 
     async def _mappings_all(self, query) -> Sequence[RowMapping]:
-        result = await self._execute(query)
+        result = await self._read(query)
         return result.mappings().all()
 
+    def _pin_primary(self) -> None:
+        """
+        keep every later read of the session on the primary, for rows that are
+        read to be written back or cached
+        """
+        self.session.info[PRIMARY_PINNED] = True
+
+    async def _read(self, query) -> Result[Any]:
+        result, _ = await self._read_with_engine(query)
+        return result
+
+    async def _read_with_engine(self, query) -> tuple[Result[Any], bool]:
+        """
+        run a query of the read helpers on the replica when one is configured
+        and keeps up, returns whether the replica served it, _execute always
+        runs on the primary
+        """
+        router: ReplicaRouter | None = self.session.info.get(REPLICA_ROUTER)
+        if router is None:
+            return await self._execute(query), False
+
+        if self.session.info.get(PRIMARY_PINNED):
+            replica_fallbacks.inc(reason="pinned")
+        elif not await router.is_usable():
+            replica_fallbacks.inc(reason="lag")
+        else:
+            try:
+                result = await self.session.execute(
+                    query, bind_arguments={"bind": router.replica.sync_engine}
+                )
+            except DBAPIError:
+                router.mark_failed()
+                replica_fallbacks.inc(reason="error")
+            else:
+                database_reads.inc(engine="replica")
+                return result, True
+
+        database_reads.inc(engine="primary")
+        return await self._execute(query), False
+
     async def _execute(self, query) -> Result[Any]:
         return await self.session.execute(query)
+
+    def new_session(self) -> AsyncSession:
+        """
+        session of its own on the database of this repository, for loads shared
+        by concurrent requests that must outlive the request which started them
+        """
+        return AsyncSession(
+            bind=self.session.bind,
+            expire_on_commit=False,
+            info={REPLICA_ROUTER: self.session.info.get(REPLICA_ROUTER)},
+        )
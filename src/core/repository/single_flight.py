@@ -0,0 +1,80 @@
+import asyncio
+import secrets
+from typing import Any, Awaitable, Callable, Hashable, TypeVar
+
+from src.core.cache.redis_client import RedisClient
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """
+    per-process request coalescing, concurrent callers asking for the same key
+    share one in-flight call instead of each running it
+    """
+
+    def __init__(self):
+        self._calls: dict[Hashable, asyncio.Task] = {}
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        task = self._calls.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._calls[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+
+        # a cancelled caller must not cancel the call other callers are waiting on
+        return await asyncio.shield(task)
+
+    def _forget(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        if not task.cancelled():
+            task.exception()  # mark as retrieved when every caller went away
+
+    def in_flight(self) -> int:
+        return len(self._calls)
+
+
+class RedisSingleFlight:
+    """
+    cross-worker request coalescing, the worker that takes the redis lock runs
+    the call and the others wait for its result to show up in a shared cache
+    """
+
+    def __init__(
+        self,
+        redis_client: RedisClient,
+        lock_ttl: int = 10,
+        poll_interval: float = 0.05,
+    ):
+        self.redis_client = redis_client
+        self.lock_ttl = lock_ttl
+        self.poll_interval = poll_interval
+
+    async def do(
+        self,
+        key: str,
+        fn: Callable[[], Awaitable[T]],
+        read_shared: Callable[[], Awaitable[Any | None]],
+    ) -> T:
+        lock_key = f"single_flight:{key}"
+        token = secrets.token_hex(8)
+        if await self.redis_client.set_if_not_exists(lock_key, token, self.lock_ttl):
+            try:
+                return await fn()
+            finally:
+                await self.redis_client.delete_if_equals(lock_key, token)
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.lock_ttl
+        while loop.time() < deadline:
+            await asyncio.sleep(self.poll_interval)
+            result = await read_shared()
+            if result is not None:
+                return result
+            if not await self.redis_client.exists(lock_key):
+                break
+
+        # the lock holder failed or is too slow, do the work ourselves
+        return await fn()
@@ -1,15 +1,19 @@
 from datetime import datetime, timedelta
 
-import jose.exceptions
-from jose import jwt
-
 from ..config import settings
-from ..excpetions.jwt_exceptions import JwtTokenExpiredException, BadJwtTokenException
+from ..excpetions.jwt_exceptions import BadJwtTokenException
+from ..protocols.token_codec import TokenCodec
+from .token_codecs import create_token_codec, read_key
 
 
 class JWTHandler:
-    secret_key = settings.SECRET_KEY
-    algorithm = settings.ALGORITHM
+    codec: TokenCodec = create_token_codec(
+        settings.JWT_BACKEND,
+        settings.ALGORITHM,
+        settings.SECRET_KEY,
+        private_key=read_key(settings.JWT_PRIVATE_KEY_FILE),
+        public_key=read_key(settings.JWT_PUBLIC_KEY_FILE),
+    )
     access_token_expire = 30
     refresh_token_expire = 24 * 60 * 30
 
@@ -17,17 +21,13 @@ class JWTHandler:
     def encode_access_token(payload: dict) -> str:
         expire = datetime.utcnow() + timedelta(minutes=JWTHandler.access_token_expire)
         payload.update({"exp": expire})
-        return jwt.encode(
-            payload, JWTHandler.secret_key, algorithm=JWTHandler.algorithm
-        )
+        return JWTHandler.codec.encode(payload)
 
     @staticmethod
     def encode_refresh_token(payload: dict) -> str:
         expire = datetime.utcnow() + timedelta(minutes=JWTHandler.refresh_token_expire)
         payload.update({"exp": expire})
-        return jwt.encode(
-            payload, JWTHandler.secret_key, algorithm=JWTHandler.algorithm
-        )
+        return JWTHandler.codec.encode(payload)
 
     @staticmethod
     def decode_access(token: str) -> dict:
@@ -43,12 +43,4 @@ class JWTHandler:
 
     @classmethod
     def decode_token(cls, token: str) -> dict:
-        try:
-            return jwt.decode(
-                token, JWTHandler.secret_key, algorithms=[JWTHandler.algorithm]
-            )
-        except jose.exceptions.ExpiredSignatureError:
-            raise JwtTokenExpiredException
-
-        except jose.exceptions.JWTError:
-            raise BadJwtTokenException
+        return cls.codec.decode(token)
@@ -0,0 +1,47 @@
+import hashlib
+import hmac
+import time
+
+
+class ProfileTokenHandler:
+    """
+    short lived tokens that ask for a request to be profiled, signed with the
+    profiling secret so outsiders can not make the workers profile requests
+    """
+
+    @staticmethod
+    def _signature(secret: str, expires: int) -> str:
+        message = f"profile:{expires}".encode()
+        return hmac.new(secret.encode(), message, hashlib.sha256).hexdigest()
+
+    @classmethod
+    def sign(cls, secret: str, lifetime: int = 300) -> str:
+        expires = int(time.time()) + lifetime
+        return f"{expires}.{cls._signature(secret, expires)}"
+
+    @classmethod
+    def verify(cls, secret: str, token: str) -> bool:
+        """
+        malformed tokens are refused instead of raising, they come from request
+        headers and query strings, which may hold any unicode
+        """
+        expires, _, signature = token.partition(".")
+        # str.isdigit also accepts digits such as "²" that int() rejects
+        if not (expires.isascii() and expires.isdigit()) or int(expires) < time.time():
+            return False
+        # compare_digest only takes str that is ascii, bytes take anything
+        return hmac.compare_digest(
+            signature.encode("utf-8", "surrogateescape"),
+            cls._signature(secret, int(expires)).encode(),
+        )
+
+
+if __name__ == "__main__":
+    import sys
+
+    from ..config import settings
+
+    if not settings.PROFILING_SECRET:
+        sys.exit("PROFILING_SECRET is not set")
+    lifetime = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    print(ProfileTokenHandler.sign(settings.PROFILING_SECRET, lifetime))
@@ -0,0 +1,120 @@
+from pathlib import Path
+
+import jose.exceptions
+from jose import jwt as jose_jwt
+from jose.constants import ALGORITHMS as JOSE_ALGORITHMS
+
+from ..config import JwtBackends
+from ..excpetions.jwt_exceptions import JwtTokenExpiredException, BadJwtTokenException
+from ..protocols.token_codec import TokenCodec
+
+
+class JoseCodec:
+    """python-jose, HMAC (HS*), ECDSA (ES*) and RSA (RS*) keys"""
+
+    def __init__(self, algorithm: str, signing_key: str | None, verifying_key: str):
+        if algorithm not in JOSE_ALGORITHMS.SUPPORTED:
+            raise ValueError(f"python-jose does not support {algorithm}")
+        self.algorithm = algorithm
+        self.signing_key = signing_key
+        self.verifying_key = verifying_key
+
+    def encode(self, payload: dict) -> str:
+        if self.signing_key is None:
+            raise ValueError("no signing key, the codec can only verify tokens")
+        return jose_jwt.encode(payload, self.signing_key, algorithm=self.algorithm)
+
+    def decode(self, token: str) -> dict:
+        try:
+            return jose_jwt.decode(
+                token, self.verifying_key, algorithms=[self.algorithm]
+            )
+        except jose.exceptions.ExpiredSignatureError:
+            raise JwtTokenExpiredException
+        except jose.exceptions.JWTError:
+            raise BadJwtTokenException
+
+
+class PyJWTCodec:
+    """
+    PyJWT, adds EdDSA (Ed25519) keys to the algorithms of python-jose, it is an
+    optional dependency: poetry install --extras pyjwt
+    """
+
+    def __init__(self, algorithm: str, signing_key: str | None, verifying_key: str):
+        try:
+            import jwt
+        except ImportError:
+            raise RuntimeError("the pyjwt backend needs: poetry install --extras pyjwt")
+
+        if algorithm not in jwt.algorithms.get_default_algorithms():
+            raise ValueError(f"pyjwt does not support {algorithm}")
+        self._jwt = jwt
+        self.algorithm = algorithm
+        self.signing_key = signing_key
+        self.verifying_key = verifying_key
+
+    def encode(self, payload: dict) -> str:
+        if self.signing_key is None:
+            raise ValueError("no signing key, the codec can only verify tokens")
+        return self._jwt.encode(payload, self.signing_key, algorithm=self.algorithm)
+
+    def decode(self, token: str) -> dict:
+        try:
+            return self._jwt.decode(
+                token, self.verifying_key, algorithms=[self.algorithm]
+            )
+        except self._jwt.ExpiredSignatureError:
+            raise JwtTokenExpiredException
+        except self._jwt.InvalidTokenError:
+            raise BadJwtTokenException
+
+
+CODECS = {JwtBackends.JOSE: JoseCodec, JwtBackends.PYJWT: PyJWTCodec}
+
+
+def read_key(path: str | None) -> str | None:
+    return Path(path).read_text() if path else None
+
+
+def generate_pem_keypair(algorithm: str) -> tuple[str, str]:
+    """new (private, public) PEM keypair for ES256 or EdDSA tokens"""
+    from cryptography.hazmat.primitives import serialization
+    from cryptography.hazmat.primitives.asymmetric import ec, ed25519
+
+    if algorithm == "ES256":
+        private_key = ec.generate_private_key(ec.SECP256R1())
+    elif algorithm == "EdDSA":
+        private_key = ed25519.Ed25519PrivateKey.generate()
+    else:
+        raise ValueError(f"no keypair for {algorithm}")
+    private_pem = private_key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    )
+    public_pem = private_key.public_key().public_bytes(
+        serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo
+    )
+    return private_pem.decode(), public_pem.decode()
+
+
+def create_token_codec(
+    backend: JwtBackends,
+    algorithm: str,
+    secret_key: str,
+    private_key: str | None = None,
+    public_key: str | None = None,
+) -> TokenCodec:
+    """
+    codec of the configured backend, HMAC algorithms sign and verify with the
+    secret key, the others with a keypair where only the public key is needed
+    to verify tokens
+    """
+    if algorithm.startswith("HS"):
+        signing_key, verifying_key = secret_key, secret_key
+    else:
+        signing_key, verifying_key = private_key, public_key
+    if verifying_key is None:
+        raise ValueError(f"{algorithm} tokens need JWT_PUBLIC_KEY_FILE")
+    return CODECS[backend](algorithm, signing_key, verifying_key)
@@ -1,12 +1,23 @@
+import asyncio
+import contextlib
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
+from .fastapi.middlewares import (
+    MetricsMiddleware,
+    ProfilingMiddleware,
+    QueryStatsMiddleware,
+)
 from .fastapi.exception_handlers import (
     http_exception_handler,
     unprocessable_entity_exception,
 )
 from ..api import api_router
+from ..app.tasks import run_prewarm_scheduler
 from .config import settings, Environments
+from .executors import executors
 from .excpetions.http_exceptions import (
     CustomHttpException,
     UnProcessableEntityException,
@@ -28,6 +39,50 @@ def add_cors(app_: FastAPI):
     )
 
 
+def add_query_stats(app_: FastAPI) -> None:
+    app_.add_middleware(
+        QueryStatsMiddleware,
+        slow_seconds=settings.SLOW_QUERY_SECONDS,
+        # statement timings tell too much about the database to send publicly
+        server_timing=settings.ENVIRONMENT != Environments.PRODUCTION,
+    )
+
+
+def add_profiling(app_: FastAPI) -> None:
+    enabled = settings.PROFILING_ENABLED
+    if enabled is None:
+        enabled = settings.ENVIRONMENT != Environments.PRODUCTION
+    if not enabled or not settings.PROFILING_SECRET:
+        return
+    app_.add_middleware(
+        ProfilingMiddleware,
+        secret=settings.PROFILING_SECRET,
+        interval=settings.PROFILING_INTERVAL,
+        output_dir=settings.PROFILING_DIR,
+    )
+
+
+def add_metrics(app_: FastAPI) -> None:
+    # added last so it is the outermost middleware and times the others too
+    app_.add_middleware(
+        MetricsMiddleware,
+        path=settings.METRICS_PATH,
+        token=settings.METRICS_TOKEN,
+        allowed_networks=settings.METRICS_ALLOWED_NETWORKS.split(","),
+    )
+
+
+@asynccontextmanager
+async def lifespan(_: FastAPI):
+    executors.start()
+    prewarm_task = asyncio.create_task(run_prewarm_scheduler())
+    yield
+    prewarm_task.cancel()
+    with contextlib.suppress(asyncio.CancelledError):
+        await prewarm_task
+    executors.shutdown()
+
+
 def create_app() -> FastAPI:
     app_ = FastAPI(
         title="quiz creator",
@@ -36,9 +91,13 @@ def create_app() -> FastAPI:
         debug=False if settings.ENVIRONMENT == Environments.PRODUCTION else True,
         docs_url=None if settings.ENVIRONMENT == Environments.PRODUCTION else "/docs",
         redoc_url=None if settings.ENVIRONMENT == Environments.PRODUCTION else "/docs",
+        lifespan=lifespan,
     )
     add_routers(app_)
     add_cors(app_)
+    add_query_stats(app_)
+    add_profiling(app_)
+    add_metrics(app_)
     app_.add_exception_handler(CustomHttpException, http_exception_handler)
     app_.add_exception_handler(
         UnProcessableEntityException, unprocessable_entity_exception
@@ -0,0 +1,57 @@
+import sys
+import threading
+from collections import Counter
+from types import FrameType
+
+
+def _frame_name(frame: FrameType) -> str:
+    code = frame.f_code
+    # ";" separates frames in the collapsed format
+    return f"{code.co_qualname} ({code.co_filename}:{code.co_firstlineno})".replace(
+        ";", ":"
+    )
+
+
+class SamplingProfiler:
+    """
+    samples the stack of one thread from a background thread, the event loop
+    thread runs every request of the worker so requests that run concurrently
+    with the profiled one show up in its samples too
+    """
+
+    def __init__(self, interval: float, thread_id: int | None = None):
+        self.interval = interval
+        self.thread_id = thread_id or threading.get_ident()
+        self.samples: Counter[str] = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                stack.append(_frame_name(frame))
+                frame = frame.f_back
+            if stack:
+                self.samples[";".join(reversed(stack))] += 1
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def collapsed(self) -> str:
+        """samples in the collapsed stack format of flamegraph.pl and speedscope"""
+        return "".join(
+            f"{stack} {count}\n" for stack, count in self.samples.most_common()
+        )
+
+    def __enter__(self) -> "SamplingProfiler":
+        self.start()
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.stop()
@@ -7,10 +7,13 @@ from httpx import AsyncClient
 
 from src.core.cache.redis_client import get_redis
 from src.core.auth.email_client import get_email_sender
-from src.core.database import get_session
+from src.core.database import (
+    get_session,
+    get_participant_session,
+    get_export_session,
+)
 from src.core.server import create_app
-from tests.extra.create_question import create_questions
-from tests.extra.quizzes import update_quiz_date_times
+from tests.extra.quizzes import create_published_quiz
 from tests.extra.register_users import create_users_in_db
 from tests.mocks import (
     get_mock_email_sender,
@@ -36,6 +39,8 @@ async def app() -> FastAPI:
     await mock_init_models()
     app_.dependency_overrides[get_email_sender] = get_mock_email_sender
     app_.dependency_overrides[get_session] = mock_get_session
+    app_.dependency_overrides[get_participant_session] = mock_get_session
+    app_.dependency_overrides[get_export_session] = mock_get_session
     app_.dependency_overrides[get_redis] = lambda: MockRedis()
     await create_users_in_db(app_)
     return app_
@@ -89,16 +94,9 @@ async def quiz_another_user(user_client_2: AsyncClient) -> dict:
 
 @pytest_asyncio.fixture(scope="class")
 async def shared_quiz(user_client: AsyncClient) -> dict:
-    quiz_data = {"title": "shared quiz among tests"}
-    response = await user_client.post("/quiz/create", json=quiz_data)
-    assert response.status_code == 200
-    quiz = response.json()
+    return await create_published_quiz(user_client, "shared quiz among tests")
 
-    await create_questions(quiz_id=quiz["id"], user_client=user_client)
-    await update_quiz_date_times(user_client=user_client, quiz_id=quiz["id"])
 
-    response = await user_client.post(f'/quiz/{quiz["id"]}/change-activation-status')
-    assert response.status_code == 200
-
-    response = await user_client.get(f'/quiz/{quiz["id"]}')
-    return response.json()
+@pytest_asyncio.fixture(scope="function")
+async def published_quiz(user_client: AsyncClient) -> dict:
+    return await create_published_quiz(user_client, "published quiz of one test")
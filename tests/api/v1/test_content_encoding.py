@@ -0,0 +1,24 @@
+import pytest
+
+from src.app.utils.content_encoding import accepts_encoding
+
+
+class TestContentEncoding:
+    @pytest.mark.parametrize(
+        "accept_encoding, accepted",
+        [
+            ("", False),
+            ("gzip", True),
+            ("deflate, gzip;q=0.5", True),
+            ("GZIP; Q=1.0", True),
+            ("gzip;q=0", False),
+            ("gzip;q=0.000, *", False),
+            ("gzip;q=bad", False),
+            ("identity", False),
+            ("*", True),
+            ("br, *;q=0", False),
+            ("x-gzip", True),
+        ],
+    )
+    def test_accepts_gzip(self, accept_encoding: str, accepted: bool):
+        assert accepts_encoding(accept_encoding, "gzip") is accepted
@@ -0,0 +1,49 @@
+import httpx
+import pytest
+
+from src.core.fastapi.middlewares import MetricsMiddleware
+
+TOKEN = "metrics token"
+
+
+async def not_found_app(scope, receive, send) -> None:
+    await send({"type": "http.response.start", "status": 404, "headers": []})
+    await send({"type": "http.response.body", "body": b"not found"})
+
+
+def metrics_client(client_address: str) -> httpx.AsyncClient:
+    app = MetricsMiddleware(
+        not_found_app, token=TOKEN, allowed_networks=["10.0.0.0/8", "::1/128"]
+    )
+    transport = httpx.ASGITransport(app=app, client=(client_address, 4321))
+    return httpx.AsyncClient(transport=transport, base_url="http://test")
+
+
+class TestMetrics:
+    @pytest.mark.asyncio
+    async def test_scrapes_are_restricted(self):
+        async with metrics_client("10.1.2.3") as client:
+            response = await client.get("/metrics")
+            assert response.status_code == 200
+            assert "http_requests_in_flight" in response.text
+
+        async with metrics_client("203.0.113.5") as client:
+            # outsiders see the path like any other unknown one
+            response = await client.get("/metrics")
+            assert response.status_code == 404
+            for authorization in ("Bearer wrong token", TOKEN, "Bearer é"):
+                response = await client.get(
+                    "/metrics",
+                    headers={"Authorization": authorization.encode("latin-1")},
+                )
+                assert response.status_code == 404
+
+            response = await client.get(
+                "/metrics", headers={"Authorization": f"Bearer {TOKEN}"}
+            )
+            assert response.status_code == 200
+            assert "http_requests_in_flight" in response.text
+
+        async with metrics_client("unix-socket") as client:
+            response = await client.get("/metrics")
+            assert response.status_code == 404
@@ -0,0 +1,183 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from httpx import AsyncClient
+
+from src.app.cache import AnswerKeyCache, PublishedQuizCache, QuizPathCache
+from src.app.cache.answer_key import local_answer_keys
+from src.app.cache.published_quiz import local_snapshots
+from src.app.cache.quiz_path import local_quiz_paths
+from src.app.cache.revision import QuizRevision
+from src.app.repositories import question as question_repository_module
+from src.app.repositories import quiz as quiz_repository_module
+from src.app.tasks import prewarm_upcoming_quizzes, run_prewarm_scan
+from src.app.tasks.prewarm import PREWARM_LOCK_KEY
+from tests.extra.create_question import create_questions
+from tests.mocks.redis import MockRedis
+from tests.mocks.session import mock_async_session
+
+
+class TestPrewarm:
+    @pytest.mark.asyncio
+    async def test_prewarm_upcoming_quizzes(self, user_client: AsyncClient):
+        response = await user_client.post("/quiz/create", json={"title": "upcoming"})
+        quiz_id = response.json()["id"]
+        await create_questions(quiz_id=quiz_id, user_client=user_client)
+        now = datetime.now(tz=timezone.utc)
+        response = await user_client.patch(
+            f"/quiz/{quiz_id}",
+            json={
+                "start_at": str(now + timedelta(minutes=10)),
+                "end_at": str(now + timedelta(minutes=40)),
+            },
+        )
+        assert response.status_code == 200
+        await user_client.post(f"/quiz/{quiz_id}/change-activation-status")
+        response = await user_client.get(f"/quiz/{quiz_id}")
+        quiz_path = response.json()["quiz_path"]
+
+        redis_client = MockRedis()
+        published_cache = PublishedQuizCache(redis_client)
+        await published_cache.invalidate(quiz_id)
+        assert not await published_cache.is_warm(quiz_id)
+
+        assert await prewarm_upcoming_quizzes(redis_client, mock_async_session, 5) == 0
+        assert await prewarm_upcoming_quizzes(redis_client, mock_async_session, 15) >= 1
+        local_snapshots.clear()
+        local_answer_keys.clear()
+        local_quiz_paths.clear()
+
+        compiled_quiz = await published_cache.get(quiz_id)
+        assert [q.question_type for q in compiled_quiz.snapshot.questions] == [
+            "descriptive_short_answer",
+            "multiple_options",
+        ]
+        answer_key = await AnswerKeyCache(redis_client).get(quiz_id)
+        multiple_option = compiled_quiz.snapshot.questions[1]
+        assert answer_key.questions[multiple_option.id].correct_option_id == (
+            multiple_option.choices[1].id
+        )
+        assert await QuizPathCache(redis_client).get(quiz_path) == quiz_id
+
+        # warm quizzes are skipped by the next scan
+        assert await prewarm_upcoming_quizzes(redis_client, mock_async_session, 15) == 0
+
+    @pytest.mark.asyncio
+    async def test_prewarm_reads_revision_before_content(
+        self, user_client: AsyncClient, monkeypatch
+    ):
+        response = await user_client.post("/quiz/create", json={"title": "ordered"})
+        quiz_id = response.json()["id"]
+        await create_questions(quiz_id=quiz_id, user_client=user_client)
+        now = datetime.now(tz=timezone.utc)
+        await user_client.patch(
+            f"/quiz/{quiz_id}",
+            json={
+                "start_at": str(now + timedelta(minutes=10)),
+                "end_at": str(now + timedelta(minutes=40)),
+            },
+        )
+        await user_client.post(f"/quiz/{quiz_id}/change-activation-status")
+        redis_client = MockRedis()
+        await PublishedQuizCache(redis_client).invalidate(quiz_id)
+
+        events = []
+        content = QuizRevision.content
+        get_shared_by_id = quiz_repository_module.QuizRepository.get_shared_by_id
+        get_shared_quiz_questions = (
+            question_repository_module.QuestionRepository.get_shared_quiz_questions
+        )
+
+        async def record_revision(revision, id_: int) -> int:
+            events.append(("revision", id_))
+            return await content(revision, id_)
+
+        async def record_quiz(repository, id_: int):
+            events.append(("quiz", id_))
+            return await get_shared_by_id(repository, id_)
+
+        async def record_questions(repository, id_: int):
+            events.append(("questions", id_))
+            return await get_shared_quiz_questions(repository, id_)
+
+        monkeypatch.setattr(QuizRevision, "content", record_revision)
+        monkeypatch.setattr(
+            quiz_repository_module.QuizRepository, "get_shared_by_id", record_quiz
+        )
+        monkeypatch.setattr(
+            question_repository_module.QuestionRepository,
+            "get_shared_quiz_questions",
+            record_questions,
+        )
+
+        assert await prewarm_upcoming_quizzes(redis_client, mock_async_session, 15) >= 1
+        quiz_events = [event for event, id_ in events if id_ == quiz_id]
+        # the revision is read before the primary-pinned loads of the quiz
+        first_load = quiz_events.index("quiz")
+        assert "revision" in quiz_events[:first_load]
+        assert quiz_events[first_load + 1] == "questions"
+
+    @pytest.mark.asyncio
+    async def test_one_worker_scans_per_interval(self):
+        redis_client = MockRedis()
+        await redis_client.delete(PREWARM_LOCK_KEY)
+
+        assert await run_prewarm_scan(redis_client, mock_async_session) is not None
+        assert await run_prewarm_scan(redis_client, mock_async_session) is None
+
+        await redis_client.delete(PREWARM_LOCK_KEY)
+        assert await run_prewarm_scan(redis_client, mock_async_session) is not None
+
+    @pytest.mark.asyncio
+    async def test_quiz_path_cache(self):
+        redis_client = MockRedis()
+        path_cache = QuizPathCache(redis_client)
+        assert await path_cache.get("missing-path") is None
+
+        await path_cache.set("cached-path", 7)
+        await redis_client.delete("quiz_path:cached-path")
+        # served by the local tier without redis
+        assert await path_cache.get("cached-path") == 7
+
+        await path_cache.set("cached-path", 8)
+        local_quiz_paths.clear()
+        assert await path_cache.get("cached-path") == 8
+
+        await path_cache.delete("cached-path")
+        assert await path_cache.get("cached-path") is None
+
+    @pytest.mark.asyncio
+    async def test_answer_key_cache(self, published_quiz: dict):
+        quiz_id = published_quiz["quiz_id"]
+        redis_client = MockRedis()
+        answer_key_cache = AnswerKeyCache(redis_client)
+        answer_key = await answer_key_cache.get(quiz_id)
+        assert answer_key is not None
+
+        # a key built before the quiz was edited is returned but never stored
+        await answer_key_cache.invalidate(quiz_id)
+        await answer_key_cache.revision.bump_content(quiz_id)
+        assert await answer_key_cache.set(answer_key) == answer_key
+        assert await answer_key_cache.get(quiz_id) is None
+
+        revision = await answer_key_cache.revision.content(quiz_id)
+        current_key = answer_key.model_copy(update={"revision": revision})
+        await answer_key_cache.set(current_key)
+        assert await answer_key_cache.get(quiz_id) == current_key
+        local_answer_keys.clear()
+        assert await answer_key_cache.get(quiz_id) == current_key
+
+        # another worker edits the quiz, neither the local copy nor a key stored
+        # after its invalidation are used for the new revision
+        await answer_key_cache.revision.bump_content(quiz_id)
+        assert await answer_key_cache.get(quiz_id) is None
+        await redis_client.set(
+            f"answer_key:{quiz_id}:{revision}", current_key.model_dump_json()
+        )
+        assert await answer_key_cache.get(quiz_id) is None
+
+        # entries written by an older schema are treated as missing
+        await redis_client.set(
+            f"answer_key:{quiz_id}:{revision + 1}", '{"quiz_id": "old"}'
+        )
+        assert await answer_key_cache.get(quiz_id) is None
@@ -0,0 +1,68 @@
+import time
+
+import pytest
+from httpx import AsyncClient
+
+from src.core.fastapi.middlewares import ProfilingMiddleware
+from src.core.security.profile_token import ProfileTokenHandler
+
+SECRET = "profiling secret"
+
+
+def busy_handler() -> None:
+    deadline = time.perf_counter() + 0.05
+    while time.perf_counter() < deadline:
+        pass
+
+
+async def busy_app(scope, receive, send) -> None:
+    busy_handler()
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"done"})
+
+
+class TestProfiling:
+    @pytest.mark.asyncio
+    async def test_signed_request_is_profiled(self, tmp_path):
+        app = ProfilingMiddleware(
+            busy_app, secret=SECRET, interval=0.001, output_dir=str(tmp_path)
+        )
+        async with AsyncClient(app=app, base_url="http://test") as client:
+            response = await client.get(
+                "/", headers={"X-Profile": ProfileTokenHandler.sign(SECRET)}
+            )
+            assert response.text == "done"
+            profile = (tmp_path / response.headers["x-profile"]).read_text()
+            stacks = dict(line.rsplit(" ", 1) for line in profile.splitlines())
+            assert any("busy_handler" in stack for stack in stacks)
+            assert all(count.isdigit() for count in stacks.values())
+
+            token = ProfileTokenHandler.sign(SECRET)
+            response = await client.get("/", params={"profile": token})
+            assert "x-profile" in response.headers
+
+            # unsigned, forged and expired tokens run the request unprofiled
+            for token in (
+                None,
+                ProfileTokenHandler.sign("another secret"),
+                ProfileTokenHandler.sign(SECRET, lifetime=-1),
+            ):
+                headers = {"X-Profile": token} if token else {}
+                response = await client.get("/", headers=headers)
+                assert response.text == "done"
+                assert "x-profile" not in response.headers
+
+            # malformed tokens are refused the same way instead of failing
+            signature = ProfileTokenHandler.sign(SECRET).partition(".")[2]
+            for token in ("9999999999.é", f"²{int(time.time()) + 60}.{signature}"):
+                response = await client.get("/", params={"profile": token})
+                assert response.text == "done"
+                assert "x-profile" not in response.headers
+            response = await client.get(
+                "/", headers={"X-Profile": "9999999999.é".encode("latin-1")}
+            )
+            assert response.text == "done"
+
+    def test_verify_malformed_tokens(self):
+        for token in ("", ".", "9999999999.é", "²²²²²²²²²²².abc", "١٢٣.abc", "abc"):
+            assert ProfileTokenHandler.verify(SECRET, token) is False
@@ -1,6 +1,36 @@
+import asyncio
+import csv
+import io
+import json
+
 import pytest
 from httpx import AsyncClient
 
+from src.app.cache import Leaderboard, PublishedQuizCache, CompiledPublishedQuiz
+from src.app.cache import published_quiz as published_quiz_cache
+from src.app.cache.published_quiz import local_snapshots, local_revisions
+from src.app.repositories import quiz as quiz_repository_module
+from src.app.repositories import (
+    ParticipantRepo,
+    ParticipantScoreRepository,
+    QuizRepository,
+    QuestionRepository,
+)
+from src.app.schemas.extra.submission import QueuedSubmission
+from src.app.utils.cursor import encode_cursor
+from src.app.utils.get_quiz import get_published_quiz
+from src.app.models.enums_ import SubmissionStatus
+from src.app.tasks import drain_submissions, SubmissionQueue
+from src.core.config import settings, SubmissionModes
+from src.core.executors import tasks_total
+from tests.extra.queries import count_queries, max_queries
+from tests.mocks.redis import MockRedis, fake_redis_client
+from tests.mocks.session import (
+    mock_async_session,
+    mock_async_engine,
+    MockCopySession,
+)
+
 
 class TestPublishedQuizzes:
     @pytest.mark.asyncio
@@ -34,8 +64,13 @@ class TestPublishedQuizzes:
 
     @classmethod
     async def _answer_quiz_questions(
-        cls, http_client: AsyncClient, questions: list, quiz_id: int
-    ):
+        cls,
+        http_client: AsyncClient,
+        questions: list,
+        quiz_id: int,
+        status_code: int = 200,
+        option_index: int = 1,
+    ) -> dict:
         assert isinstance(questions, list)
         answer_data = {
             "participant_info": {"username": "alireza felani"},
@@ -50,10 +85,14 @@ class TestPublishedQuizzes:
                 )
             elif q["question_type"] == "multiple_options":
                 answer_data["multiple_options"].append(
-                    {"question_id": q["id"], "option_id": q["choices"][1]["id"]}
+                    {
+                        "question_id": q["id"],
+                        "option_id": q["choices"][option_index]["id"],
+                    }
                 )
         response = await http_client.post(f"/quiz/pub/{quiz_id}", json=answer_data)
-        assert response.status_code == 200
+        assert response.status_code == status_code
+        return response.json()
 
     @pytest.mark.asyncio
     async def test_get_all_quiz_participants_answers_with_score(
@@ -66,3 +105,838 @@ class TestPublishedQuizzes:
         assert response.status_code == 200
         assert isinstance(data["total_quiz_score"], float)
         assert isinstance(data["participant_answers"], list)
+
+    @pytest.mark.asyncio
+    async def test_published_questions_refresh_after_question_edit(
+        self, http_client: AsyncClient, user_client: AsyncClient, shared_quiz: dict
+    ):
+        quiz_id = shared_quiz["quiz_id"]
+        response = await http_client.post(
+            f"/quiz/pub/{quiz_id}/get-questions", json={"password": None}
+        )
+        assert response.status_code == 200
+        descriptive = next(
+            q
+            for q in response.json()["questions"]
+            if q["question_type"] == "descriptive_short_answer"
+        )
+
+        update_question_data = {
+            "text": "edited descriptive question",
+            "new_score": descriptive["score"],
+        }
+        response = await user_client.put(
+            f'/quiz/{quiz_id}/edit/question/{descriptive["id"]}/descriptive',
+            json=update_question_data,
+        )
+        assert response.status_code == 200
+
+        response = await http_client.post(
+            f"/quiz/pub/{quiz_id}/get-questions", json={"password": None}
+        )
+        texts = {q["id"]: q["text"] for q in response.json()["questions"]}
+        assert texts[descriptive["id"]] == "edited descriptive question"
+
+    @pytest.mark.asyncio
+    async def test_published_questions_served_from_redis_snapshot(
+        self, http_client: AsyncClient, shared_quiz: dict, monkeypatch
+    ):
+        quiz_id = shared_quiz["quiz_id"]
+        response = await http_client.post(
+            f"/quiz/pub/{quiz_id}/get-questions",
+            json={"password": None},
+            headers={"Accept-Encoding": "identity"},
+        )
+        assert response.status_code == 200
+        assert "content-encoding" not in response.headers
+
+        local_snapshots.clear()
+        local_revisions.clear()
+
+        def compile_published_quiz(_):
+            raise AssertionError("redis stores the quiz ready to send")
+
+        monkeypatch.setattr(
+            published_quiz_cache, "compile_published_quiz", compile_published_quiz
+        )
+        gzip_response = await http_client.post(
+            f"/quiz/pub/{quiz_id}/get-questions",
+            json={"password": None},
+            headers={"Accept-Encoding": "gzip"},
+        )
+        assert gzip_response.headers["content-encoding"] == "gzip"
+        assert gzip_response.json() == response.json()
+        compiled_quiz = await PublishedQuizCache(MockRedis()).get(quiz_id)
+        assert compiled_quiz.join(list(compiled_quiz.question_chunks)) == (
+            compiled_quiz.body
+        )
+
+        response = await http_client.post(
+            f"/quiz/pub/{quiz_id}/get-questions",
+            json={"password": None},
+            headers={"Accept-Encoding": "gzip;q=0, identity"},
+        )
+        assert "content-encoding" not in response.headers
+
+    @pytest.mark.asyncio
+    async def test_participant_endpoints_query_budget(
+        self, http_client: AsyncClient, user_client: AsyncClient, shared_quiz: dict
+    ):
+        quiz_id = shared_quiz["quiz_id"]
+        url = f"/quiz/pub/{quiz_id}/get-questions"
+        await http_client.post(url, json={"password": None})
+
+        # a warm snapshot is served without touching the database
+        with max_queries(mock_async_engine, 0):
+            response = await http_client.post(url, json={"password": None})
+        assert response.headers["server-timing"].startswith("db;dur=")
+        assert 'desc="0 queries"' in response.headers["server-timing"]
+
+        questions = response.json()["questions"]
+        # the first submission loads the answer key
+        await self._answer_quiz_questions(http_client, questions, quiz_id)
+        # participant, its answers, scores and quiz counters, whatever the
+        # number of questions
+        with max_queries(mock_async_engine, 7):
+            await self._answer_quiz_questions(http_client, questions, quiz_id)
+        with max_queries(mock_async_engine, 2):
+            response = await user_client.get(f"/quiz/pub/{quiz_id}/all/answers")
+        assert response.status_code == 200
+
+    @pytest.mark.asyncio
+    async def test_metrics_endpoint(self, http_client: AsyncClient, shared_quiz: dict):
+        local_snapshots.clear()
+        await http_client.post(
+            f'/quiz/pub/{shared_quiz["quiz_id"]}/get-questions',
+            json={"password": None},
+        )
+        response = await http_client.get("/metrics")
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+
+        lines = response.text.splitlines()
+        route = 'route="/quiz/pub/{quiz_id}/get-questions"'
+        assert "# TYPE http_request_duration_seconds histogram" in lines
+        assert any(
+            line.startswith("http_request_duration_seconds_bucket")
+            and route in line
+            and 'le="+Inf"' in line
+            for line in lines
+        )
+        assert 'http_requests_in_flight{method="POST"} 0' in lines
+        assert any(
+            line.startswith('cache_lookups_total{cache="published_quiz_local"')
+            for line in lines
+        )
+        assert any(line.startswith("redis_pool_max_connections ") for line in lines)
+
+    @pytest.mark.asyncio
+    async def test_published_questions_not_modified(
+        self, http_client: AsyncClient, shared_quiz: dict
+    ):
+        url = f'/quiz/pub/{shared_quiz["quiz_id"]}/get-questions'
+        response = await http_client.post(url, json={"password": None})
+        etag = response.headers["etag"]
+
+        response = await http_client.post(
+            url, json={"password": None}, headers={"If-None-Match": etag}
+        )
+        assert response.status_code == 304
+        assert response.content == b""
+
+    @pytest.mark.asyncio
+    async def test_all_participants_answers_not_modified(
+        self, user_client: AsyncClient, shared_quiz: dict
+    ):
+        url = f'/quiz/pub/{shared_quiz["quiz_id"]}/all/answers'
+        response = await user_client.get(url)
+        etag = response.headers["etag"]
+
+        response = await user_client.get(url, headers={"If-None-Match": etag})
+        assert response.status_code == 304
+
+    @pytest.mark.asyncio
+    async def test_concurrent_published_questions_on_cold_cache(
+        self, http_client: AsyncClient, user_client: AsyncClient, shared_quiz: dict
+    ):
+        quiz_id = shared_quiz["quiz_id"]
+        # setting the same title again invalidates the snapshot
+        response = await user_client.patch(
+            f"/quiz/{quiz_id}", json={"title": shared_quiz["title"]}
+        )
+        assert response.status_code == 200
+
+        with count_queries(mock_async_engine) as log:
+            responses = await asyncio.gather(
+                *(
+                    http_client.post(
+                        f"/quiz/pub/{quiz_id}/get-questions", json={"password": None}
+                    )
+                    for _ in range(20)
+                )
+            )
+        assert {r.status_code for r in responses} == {200}
+        assert len({r.content for r in responses}) == 1
+        # one request loaded the quiz, the others shared its snapshot
+        assert len([s for s in log.statements if "FROM quizzes" in s]) == 1
+
+    @pytest.mark.asyncio
+    async def test_cold_cache_load_survives_cancelled_leader(
+        self, published_quiz: dict, monkeypatch
+    ):
+        quiz_id = published_quiz["quiz_id"]
+        published_cache = PublishedQuizCache(MockRedis())
+        await published_cache.invalidate(quiz_id)
+
+        load_started, release_load = asyncio.Event(), asyncio.Event()
+        load_sessions = []
+        get_shared_by_id = quiz_repository_module.QuizRepository.get_shared_by_id
+
+        async def gated_get_shared_by_id(repository, quiz_id: int):
+            load_sessions.append(repository.session)
+            load_started.set()
+            await release_load.wait()
+            return await get_shared_by_id(repository, quiz_id)
+
+        monkeypatch.setattr(
+            quiz_repository_module.QuizRepository,
+            "get_shared_by_id",
+            gated_get_shared_by_id,
+        )
+
+        async def load(session) -> CompiledPublishedQuiz:
+            return await get_published_quiz(
+                QuizRepository(session),
+                QuestionRepository(session),
+                published_cache,
+                quiz_id,
+            )
+
+        leader_session, follower_session = mock_async_session(), mock_async_session()
+        leader = asyncio.create_task(load(leader_session))
+        await load_started.wait()
+        follower = asyncio.create_task(load(follower_session))
+        await asyncio.sleep(0)
+
+        # the request that started the load goes away and closes its session
+        leader.cancel()
+        await leader_session.close()
+        release_load.set()
+
+        compiled_quiz = await follower
+        await follower_session.close()
+        assert compiled_quiz.snapshot.quiz_id == quiz_id
+        assert len(compiled_quiz.question_chunks) == 2
+        # a single load ran, on a session of its own
+        assert len(load_sessions) == 1
+        assert load_sessions[0] not in (leader_session, follower_session)
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+
+    @pytest.mark.asyncio
+    async def test_queued_submission_is_persisted_by_worker(
+        self, http_client: AsyncClient, shared_quiz: dict, monkeypatch
+    ):
+        monkeypatch.setattr(settings, "SUBMISSION_MODE", SubmissionModes.QUEUE)
+        quiz_id = shared_quiz["quiz_id"]
+        response = await http_client.post(
+            f"/quiz/pub/{quiz_id}/get-questions", json={"password": None}
+        )
+        data = await self._answer_quiz_questions(
+            http_client, response.json()["questions"], quiz_id, status_code=202
+        )
+        status_url = f'/quiz/pub/{quiz_id}/submission/{data["submission_id"]}'
+
+        response = await http_client.get(status_url)
+        assert response.status_code == 200
+        assert response.json()["status"] == "pending"
+
+        assert await drain_submissions(MockRedis(), mock_async_session, "test") == 1
+        response = await http_client.get(status_url)
+        assert response.json()["status"] == "persisted"
+        assert isinstance(response.json()["participant_id"], int)
+
+        response = await http_client.get(
+            f'/quiz/pub/{quiz_id + 1}/submission/{data["submission_id"]}'
+        )
+        assert response.status_code == 400
+
+    @pytest.mark.asyncio
+    async def test_queued_answers_graded_when_persisted(
+        self,
+        http_client: AsyncClient,
+        user_client: AsyncClient,
+        published_quiz: dict,
+        monkeypatch,
+    ):
+        monkeypatch.setattr(settings, "SUBMISSION_MODE", SubmissionModes.QUEUE)
+        quiz_id = published_quiz["quiz_id"]
+        response = await http_client.post(
+            f"/quiz/pub/{quiz_id}/get-questions", json={"password": None}
+        )
+        questions = response.json()["questions"]
+        # the first option is wrong when the answers are queued
+        await self._answer_quiz_questions(
+            http_client, questions, quiz_id, status_code=202, option_index=0
+        )
+
+        # and becomes the correct one while the submission waits in the stream
+        question = next(
+            q for q in questions if q["question_type"] == "multiple_options"
+        )
+        response = await user_client.put(
+            f'/quiz/{quiz_id}/edit/question/{question["id"]}/multiple-option',
+            json={
+                "text": question["text"],
+                "options": question["choices"],
+                "new_score": question["score"],
+                "correct_option_index": 0,
+            },
+        )
+        assert response.status_code == 200
+
+        assert await drain_submissions(MockRedis(), mock_async_session, "test") == 1
+        response = await user_client.get(f"/quiz/pub/{quiz_id}/all/answers")
+        participant_answers = response.json()["participant_answers"]
+        assert [p["options_score"] for p in participant_answers] == [2.75]
+
+    @pytest.mark.asyncio
+    async def test_failing_queued_submission_is_dead_lettered(
+        self, http_client: AsyncClient, published_quiz: dict, monkeypatch
+    ):
+        monkeypatch.setattr(settings, "SUBMISSION_CLAIM_IDLE_SECONDS", 0)
+        monkeypatch.setattr(settings, "SUBMISSION_MAX_DELIVERIES", 2)
+        quiz_id = published_quiz["quiz_id"]
+        response = await http_client.post(
+            f"/quiz/pub/{quiz_id}/get-questions", json={"password": None}
+        )
+        descriptive = next(
+            q
+            for q in response.json()["questions"]
+            if q["question_type"] == "descriptive_short_answer"
+        )
+        redis_client = fake_redis_client()
+        await redis_client.stream_create_group(
+            settings.SUBMISSION_STREAM, SubmissionQueue.group
+        )
+        submission_queue = SubmissionQueue(redis_client)
+        # the second submission answers a question that no longer exists
+        for submission_id, question_id in (
+            ("valid", descriptive["id"]),
+            ("bad", 10**6),
+        ):
+            await submission_queue.enqueue(
+                QueuedSubmission(
+                    submission_id=submission_id,
+                    quiz_id=quiz_id,
+                    username=f"participant+{submission_id}",
+                    descriptive=[{"question_id": question_id, "answer": "answer"}],
+                    multiple_options=[],
+                )
+            )
+
+        # the batch fails and its entries are written one by one
+        assert await drain_submissions(redis_client, mock_async_session, "a") == 1
+        status = await submission_queue.get_status("valid")
+        assert status.status == SubmissionStatus.PERSISTED
+
+        # another worker claims the failed entry, retries it once, then gives up
+        for _ in range(2):
+            await asyncio.sleep(0.01)
+            assert await drain_submissions(redis_client, mock_async_session, "b") == 0
+        status = await submission_queue.get_status("bad")
+        assert status.status == SubmissionStatus.FAILED
+        dead_letters = await redis_client.redis.xrange(
+            settings.SUBMISSION_DEAD_LETTER_STREAM
+        )
+        assert [fields[b"deliveries"] for _, fields in dead_letters] == [b"2"]
+        assert not await redis_client.stream_pending(
+            settings.SUBMISSION_STREAM, SubmissionQueue.group, 10, min_idle_ms=0
+        )
+
+    @pytest.mark.asyncio
+    async def test_queued_submissions_copied_on_postgres(self):
+        session = MockCopySession()
+        submissions = [
+            QueuedSubmission(
+                submission_id=str(i),
+                quiz_id=1,
+                username=f"participant+{i}",
+                descriptive=[{"question_id": 1, "answer": "my answer"}],
+                multiple_options=[
+                    {"question_id": 2, "option_id": 3, "is_correct": True}
+                ],
+            )
+            for i in range(2)
+        ]
+        participant_ids = await ParticipantRepo(
+            session
+        )._copy_participants_with_answers(submissions)
+
+        assert participant_ids == {"participant+0": 1, "participant+1": 2}
+        assert "nextval(pg_get_serial_sequence(" in session.statements[0]
+        assert {table: len(records) for table, records in session.copied.items()} == {
+            "participants": 2,
+            "user_descriptive_answers": 2,
+            "user_multiple_option_answers": 2,
+        }
+
+    @pytest.mark.asyncio
+    async def test_multiple_option_answers_graded_on_submit(
+        self, http_client: AsyncClient, user_client: AsyncClient, shared_quiz: dict
+    ):
+        quiz_id = shared_quiz["quiz_id"]
+        response = await http_client.post(
+            f"/quiz/pub/{quiz_id}/get-questions", json={"password": None}
+        )
+        await self._answer_quiz_questions(
+            http_client, response.json()["questions"], quiz_id
+        )
+
+        response = await user_client.get(f"/quiz/pub/{quiz_id}/all/answers")
+        assert response.status_code == 200
+        # the answering helper always picks the correct option
+        participant_answers = response.json()["participant_answers"]
+        assert participant_answers
+        assert {p["options_score"] for p in participant_answers} == {2.75}
+
+    @pytest.mark.asyncio
+    async def test_answers_regraded_after_correct_option_change(
+        self, http_client: AsyncClient, user_client: AsyncClient, shared_quiz: dict
+    ):
+        quiz_id = shared_quiz["quiz_id"]
+        response = await http_client.post(
+            f"/quiz/pub/{quiz_id}/get-questions", json={"password": None}
+        )
+        questions = response.json()["questions"]
+        await self._answer_quiz_questions(http_client, questions, quiz_id)
+        question = next(
+            q for q in questions if q["question_type"] == "multiple_options"
+        )
+
+        for correct_option_index, options_score in ((0, 0), (1, 2.75)):
+            response = await user_client.put(
+                f'/quiz/{quiz_id}/edit/question/{question["id"]}/multiple-option',
+                json={
+                    "text": question["text"],
+                    "options": question["choices"],
+                    "new_score": question["score"],
+                    "correct_option_index": correct_option_index,
+                },
+            )
+            assert response.status_code == 200
+
+            response = await user_client.get(f"/quiz/pub/{quiz_id}/all/answers")
+            participant_answers = response.json()["participant_answers"]
+            assert {p["options_score"] for p in participant_answers} == {options_score}
+
+    @pytest.mark.asyncio
+    async def test_scores_follow_removed_answered_option(
+        self, http_client: AsyncClient, user_client: AsyncClient, published_quiz: dict
+    ):
+        quiz_id = published_quiz["quiz_id"]
+        response = await http_client.post(
+            f"/quiz/pub/{quiz_id}/get-questions", json={"password": None}
+        )
+        questions = response.json()["questions"]
+        await self._answer_quiz_questions(http_client, questions, quiz_id)
+        question = next(
+            q for q in questions if q["question_type"] == "multiple_options"
+        )
+
+        # the answered option is replaced and its answer deleted with it
+        response = await user_client.put(
+            f'/quiz/{quiz_id}/edit/question/{question["id"]}/multiple-option',
+            json={
+                "text": question["text"],
+                "options": [question["choices"][0], {"text": "new option"}],
+                "new_score": question["score"],
+                "correct_option_index": 0,
+            },
+        )
+        assert response.status_code == 200
+
+        response = await user_client.get(f"/quiz/pub/{quiz_id}/all/answers")
+        participant_answers = response.json()["participant_answers"]
+        assert [p["options_score"] for p in participant_answers] == [0]
+
+    @pytest.mark.asyncio
+    async def test_participant_scores_follow_manual_grading(
+        self, http_client: AsyncClient, user_client: AsyncClient, shared_quiz: dict
+    ):
+        quiz_id = shared_quiz["quiz_id"]
+        response = await http_client.post(
+            f"/quiz/pub/{quiz_id}/get-questions", json={"password": None}
+        )
+        await self._answer_quiz_questions(
+            http_client, response.json()["questions"], quiz_id
+        )
+        response = await user_client.get(f"/quiz/pub/{quiz_id}/all/answers")
+        participant_id = max(
+            p["participant_id"] for p in response.json()["participant_answers"]
+        )
+        response = await user_client.get(
+            f"/quiz/pub/{quiz_id}/participant/{participant_id}/answers"
+        )
+        answers = response.json()
+
+        response = await user_client.patch(
+            f"/quiz/pub/{quiz_id}/update/user-answers",
+            json={
+                "participant_id": participant_id,
+                "descriptive": {answers["descriptive"][0]["id"]: {"score": 1}},
+                "multiple_options": [answers["multiple_options"][0]["id"]],
+            },
+        )
+        assert response.status_code == 200
+
+        async def get_scores() -> dict:
+            response = await user_client.get(f"/quiz/pub/{quiz_id}/all/answers")
+            return {
+                p["participant_id"]: p for p in response.json()["participant_answers"]
+            }
+
+        scores = await get_scores()
+        assert scores[participant_id]["descriptive_score"] == 1
+        assert scores[participant_id]["options_score"] == 0
+        assert scores[participant_id]["graded_count"] == 2
+
+        # a rebuild from the raw answers agrees with the incremental updates
+        async with mock_async_session() as session:
+            await ParticipantScoreRepository(session).recompute_quiz(quiz_id)
+            await session.commit()
+        assert await get_scores() == scores
+
+    @pytest.mark.asyncio
+    async def test_manual_grading_survives_question_edit(
+        self, http_client: AsyncClient, user_client: AsyncClient, published_quiz: dict
+    ):
+        quiz_id = published_quiz["quiz_id"]
+        response = await http_client.post(
+            f"/quiz/pub/{quiz_id}/get-questions", json={"password": None}
+        )
+        questions = response.json()["questions"]
+        participant_ids = [
+            (await self._answer_quiz_questions(http_client, questions, quiz_id))[
+                "participant_id"
+            ]
+            for _ in range(2)
+        ]
+        overridden_id = participant_ids[0]
+        response = await user_client.get(
+            f"/quiz/pub/{quiz_id}/participant/{overridden_id}/answers"
+        )
+        response = await user_client.patch(
+            f"/quiz/pub/{quiz_id}/update/user-answers",
+            json={
+                "participant_id": overridden_id,
+                "descriptive": {},
+                "multiple_options": [response.json()["multiple_options"][0]["id"]],
+            },
+        )
+        assert response.status_code == 200
+        question = next(
+            q for q in questions if q["question_type"] == "multiple_options"
+        )
+
+        async def edit_question(text: str, score: float) -> dict:
+            response = await user_client.put(
+                f'/quiz/{quiz_id}/edit/question/{question["id"]}/multiple-option',
+                json={
+                    "text": text,
+                    "options": question["choices"],
+                    "new_score": score,
+                    "correct_option_index": 1,
+                },
+            )
+            assert response.status_code == 200
+            response = await user_client.get(f"/quiz/pub/{quiz_id}/all/answers")
+            return {
+                p["participant_id"]: p["options_score"]
+                for p in response.json()["participant_answers"]
+            }
+
+        # the correct option stays the same, the override is kept
+        scores = await edit_question("edited text", question["score"])
+        assert scores == {overridden_id: 0, participant_ids[1]: question["score"]}
+        scores = await edit_question("edited text", 4)
+        assert scores == {overridden_id: 0, participant_ids[1]: 4}
+
+    @pytest.mark.asyncio
+    async def test_participant_scores_keyset_pagination(
+        self, http_client: AsyncClient, user_client: AsyncClient, shared_quiz: dict
+    ):
+        quiz_id = shared_quiz["quiz_id"]
+        response = await http_client.post(
+            f"/quiz/pub/{quiz_id}/get-questions", json={"password": None}
+        )
+        for _ in range(3):
+            await self._answer_quiz_questions(
+                http_client, response.json()["questions"], quiz_id
+            )
+        url = f"/quiz/pub/{quiz_id}/all/answers"
+        # without a limit every participant is returned, as before pagination
+        response = await user_client.get(url)
+        all_participants = response.json()["participant_answers"]
+        assert len(all_participants) > 2
+        assert response.json()["next_cursor"] is None
+
+        for sort in ("total_score", "username", "submitted_at"):
+            for order in ("asc", "desc"):
+                params = {"sort": sort, "order": order, "limit": 2}
+                pages = []
+                while True:
+                    response = await user_client.get(url, params=params)
+                    assert response.status_code == 200
+                    pages.extend(response.json()["participant_answers"])
+                    if response.json()["next_cursor"] is None:
+                        break
+                    params["cursor"] = response.json()["next_cursor"]
+
+                expected = sorted(
+                    all_participants,
+                    key=lambda p: (p[sort], p["participant_id"]),
+                    reverse=order == "desc",
+                )
+                assert pages == expected
+
+        response = await user_client.get(url, params={"ungraded": True})
+        ungraded = response.json()["participant_answers"]
+        assert ungraded
+        assert all(p["ungraded_descriptive_count"] > 0 for p in ungraded)
+
+        for sort, cursor in (
+            ("username", "bm90LWEtY3Vyc29y"),
+            ("total_score", encode_cursor("total_score", "x", "y")),
+            ("total_score", encode_cursor("total_score", 1.5, True)),
+            ("username", encode_cursor("username", ["x"], 1)),
+            ("username", encode_cursor("total_score", 1.5, 1)),
+            ("submitted_at", encode_cursor("submitted_at", "yesterday", 1)),
+            ("submitted_at", encode_cursor("submitted_at", "2024-01-01", 2**40)),
+        ):
+            response = await user_client.get(
+                url, params={"sort": sort, "cursor": cursor, "limit": 2}
+            )
+            assert response.status_code == 400
+            assert response.json()["detail"][0]["type"] == "invalid_cursor"
+
+    @pytest.mark.asyncio
+    async def test_export_participants_answers(
+        self, http_client: AsyncClient, user_client: AsyncClient, published_quiz: dict
+    ):
+        quiz_id = published_quiz["quiz_id"]
+        response = await http_client.post(
+            f"/quiz/pub/{quiz_id}/get-questions", json={"password": None}
+        )
+        participant_count = 2
+        for _ in range(participant_count):
+            await self._answer_quiz_questions(
+                http_client, response.json()["questions"], quiz_id
+            )
+        url = f"/quiz/pub/{quiz_id}/export/answers"
+        process_tasks = tasks_total.value(pool="process")
+
+        response = await user_client.get(url)
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/csv")
+        # batches are rendered by the process pool
+        assert tasks_total.value(pool="process") > process_tasks
+        rows = list(csv.DictReader(io.StringIO(response.text)))
+        # every participant answered one descriptive and one multiple-option question
+        assert len(rows) == participant_count * 2
+        assert {r["question_type"] for r in rows} == {
+            "descriptive_short_answer",
+            "multiple_options",
+        }
+
+        response = await user_client.get(url, params={"format": "ndjson"})
+        assert response.status_code == 200
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        assert [line["participant_id"] for line in lines] == [
+            int(r["participant_id"]) for r in rows
+        ]
+
+    @pytest.mark.asyncio
+    async def test_quiz_item_analysis(
+        self, http_client: AsyncClient, user_client: AsyncClient, published_quiz: dict
+    ):
+        quiz_id = published_quiz["quiz_id"]
+        response = await http_client.post(
+            f"/quiz/pub/{quiz_id}/get-questions", json={"password": None}
+        )
+        questions = response.json()["questions"]
+        # option 1 is the correct one
+        for option_index in (1, 1, 0):
+            await self._answer_quiz_questions(
+                http_client, questions, quiz_id, option_index=option_index
+            )
+
+        url = f"/quiz/pub/{quiz_id}/analytics/items"
+        response = await user_client.get(url)
+        assert response.status_code == 200
+        analysis = response.json()
+        assert analysis["participant_count"] == 3
+        assert analysis["percentiles"]["p10"] <= analysis["percentiles"]["p90"]
+
+        multiple_option = next(
+            q for q in analysis["questions"] if q["question_type"] == "multiple_options"
+        )
+        assert multiple_option["difficulty"] == pytest.approx(2 / 3)
+        assert [o["count"] for o in multiple_option["options"]] == [1, 2]
+        assert multiple_option["answered_count"] == 3
+
+        # served from the cache until a new answer comes in
+        response = await user_client.get(url)
+        assert response.json() == analysis
+
+        await self._answer_quiz_questions(http_client, questions, quiz_id)
+        response = await user_client.get(url)
+        assert response.json()["participant_count"] == 4
+
+    @pytest.mark.asyncio
+    async def test_quiz_leaderboard(
+        self, http_client: AsyncClient, user_client: AsyncClient, published_quiz: dict
+    ):
+        quiz_id = published_quiz["quiz_id"]
+        url = f"/quiz/pub/{quiz_id}/leaderboard"
+
+        # a quiz without participants is remembered as built
+        response = await user_client.get(url)
+        assert response.status_code == 200
+        assert response.json()["participant_count"] == 0
+        assert await Leaderboard(MockRedis()).is_built(quiz_id)
+
+        response = await http_client.post(
+            f"/quiz/pub/{quiz_id}/get-questions", json={"password": None}
+        )
+        questions = response.json()["questions"]
+        for option_index in (1, 0, 0):
+            await self._answer_quiz_questions(
+                http_client, questions, quiz_id, option_index=option_index
+            )
+
+        # the first participants make the next read rebuild from participant_scores
+        response = await user_client.get(url, params={"limit": 500})
+        leaderboard = response.json()
+        response = await user_client.get(
+            f"/quiz/pub/{quiz_id}/all/answers", params={"limit": 500}
+        )
+        participants = response.json()["participant_answers"]
+        assert leaderboard["participant_count"] == len(participants) == 3
+        assert {e["participant_id"]: e["score"] for e in leaderboard["entries"]} == {
+            p["participant_id"]: p["total_score"] for p in participants
+        }
+        assert [e["rank"] for e in leaderboard["entries"]] == [1, 2, 2]
+
+        # new submissions and grading move participants without a rebuild
+        data = await self._answer_quiz_questions(http_client, questions, quiz_id)
+        response = await user_client.get(url)
+        assert response.json()["participant_count"] == len(participants) + 1
+
+        participant_id = data["participant_id"]
+        response = await user_client.get(f"{url}/participant/{participant_id}")
+        assert response.status_code == 200
+        score = response.json()["score"]
+        response = await user_client.get(
+            f"/quiz/pub/{quiz_id}/participant/{participant_id}/answers"
+        )
+        answers = response.json()
+        response = await user_client.patch(
+            f"/quiz/pub/{quiz_id}/update/user-answers",
+            json={
+                "participant_id": participant_id,
+                "descriptive": {answers["descriptive"][0]["id"]: {"score": 1}},
+                "multiple_options": [],
+            },
+        )
+        assert response.status_code == 200
+
+        response = await user_client.get(f"{url}/participant/{participant_id}")
+        entry = response.json()
+        assert entry["score"] == score + 1
+        response = await user_client.get(
+            f"{url}/range",
+            params={"min_score": entry["score"], "max_score": entry["score"]},
+        )
+        entries = response.json()["entries"]
+        assert participant_id in {e["participant_id"] for e in entries}
+        assert {e["rank"] for e in entries} == {entry["rank"]}
+
+        response = await user_client.get(
+            f"{url}/range", params={"min_score": 2, "max_score": 1}
+        )
+        assert response.status_code == 400
+
+    @pytest.mark.asyncio
+    async def test_grade_answers_of_many_participants(
+        self, http_client: AsyncClient, user_client: AsyncClient, shared_quiz: dict
+    ):
+        quiz_id = shared_quiz["quiz_id"]
+        response = await http_client.post(
+            f"/quiz/pub/{quiz_id}/get-questions", json={"password": None}
+        )
+        for _ in range(2):
+            await self._answer_quiz_questions(
+                http_client, response.json()["questions"], quiz_id
+            )
+        response = await user_client.get(
+            f"/quiz/pub/{quiz_id}/all/answers",
+            params={"sort": "submitted_at", "order": "desc", "limit": 2},
+        )
+        participant_ids = [
+            p["participant_id"] for p in response.json()["participant_answers"]
+        ]
+        answers = []
+        for participant_id in participant_ids:
+            response = await user_client.get(
+                f"/quiz/pub/{quiz_id}/participant/{participant_id}/answers"
+            )
+            answers.append(response.json())
+
+        grades = {
+            "descriptive": [
+                {"answer_id": a["descriptive"][0]["id"], "score": 1} for a in answers
+            ],
+            "multiple_options": [
+                {
+                    "answer_id": answers[0]["multiple_options"][0]["id"],
+                    "is_correct": False,
+                }
+            ],
+        }
+        # one answer above its question score rejects the whole batch
+        response = await user_client.patch(
+            f"/quiz/pub/{quiz_id}/grade/answers",
+            json={
+                **grades,
+                "descriptive": grades["descriptive"]
+                + [{"answer_id": answers[1]["descriptive"][0]["id"], "score": 10**6}],
+            },
+        )
+        assert response.status_code == 400
+        assert response.json()["detail"][0]["type"] == "invalid_grades"
+
+        response = await user_client.patch(
+            f"/quiz/pub/{quiz_id}/grade/answers", json=grades
+        )
+        assert response.status_code == 200
+        assert response.json()["participant_count"] == 2
+
+        response = await user_client.get(
+            f"/quiz/pub/{quiz_id}/all/answers", params={"limit": 500}
+        )
+        scores = {
+            p["participant_id"]: p for p in response.json()["participant_answers"]
+        }
+        for participant_id, participant_answers in zip(participant_ids, answers):
+            assert scores[participant_id]["descriptive_score"] == 1
+            assert scores[participant_id]["ungraded_descriptive_count"] == (
+                len(participant_answers["descriptive"]) - 1
+            )
+        first, second = participant_ids
+        assert scores[first]["options_score"] < scores[second]["options_score"]
+
+        response = await user_client.get(
+            f"/quiz/pub/{quiz_id}/leaderboard/participant/{first}"
+        )
+        assert response.json()["score"] == scores[first]["total_score"]
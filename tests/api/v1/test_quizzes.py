@@ -3,7 +3,29 @@ from datetime import datetime, timedelta, timezone
 import pytest
 from httpx import AsyncClient
 
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from src.app.models.enums_ import QuestionType
+from src.app.repositories import QuizRepository, QuestionRepository
+from src.app.schemas.in_.quizzes import MultipleOptionIn
+from src.core.database import Base
+from src.core.database.pool import (
+    TrafficClass,
+    create_bulkhead_engine,
+    pool_checkouts,
+    pool_saturation,
+    pool_timeouts,
+)
+from src.core.database.replica import (
+    ReplicaRouter,
+    REPLICA_ROUTER,
+    database_reads,
+    replica_fallbacks,
+)
+from tests.extra.queries import count_queries
 from tests.extra.quizzes import create_short_question_for_quiz, update_quiz_date_times
+from tests.mocks.session import mock_async_session, mock_async_engine
 
 
 class TestQuizzes:
@@ -162,6 +184,26 @@ class TestQuizzes:
         response = await user_client.patch(f'/quiz/{new_quiz["id"]}', json=data)
         assert response.status_code == 200
 
+    @pytest.mark.asyncio
+    async def test_quiz_settings_etag_changes_after_update(
+        self, user_client: AsyncClient, new_quiz: dict
+    ):
+        response = await user_client.get(f'/quiz/{new_quiz["id"]}')
+        etag = response.headers["etag"]
+        response = await user_client.get(
+            f'/quiz/{new_quiz["id"]}', headers={"If-None-Match": etag}
+        )
+        assert response.status_code == 304
+
+        await create_short_question_for_quiz(
+            user_client=user_client, quiz_id=new_quiz["id"]
+        )
+        response = await user_client.get(
+            f'/quiz/{new_quiz["id"]}', headers={"If-None-Match": etag}
+        )
+        assert response.status_code == 200
+        assert response.headers["etag"] != etag
+
     @pytest.mark.asyncio
     async def test_changing_quiz_activation_status(
         self, user_client: AsyncClient, new_quiz: dict
@@ -234,6 +276,157 @@ class TestQuizzes:
         updated_question_data = response.json()
         assert updated_question_data['score'] != previous_question_score
 
+    @pytest.mark.asyncio
+    async def test_quiz_aggregates_follow_question_changes(
+        self, user_client: AsyncClient, new_quiz: dict
+    ):
+        quiz_id = new_quiz["id"]
+        short_question = await create_short_question_for_quiz(user_client, quiz_id)
+        await create_short_question_for_quiz(user_client, quiz_id)
+        multiple_option_question = await self.create_multiple_option_question(
+            user_client, new_quiz
+        )
+        response = await user_client.put(
+            f'/quiz/{quiz_id}/edit/question/{short_question["id"]}/descriptive',
+            json={"text": "edited question", "answer": None, "new_score": 4},
+        )
+        assert response.status_code == 200
+        response = await user_client.delete(
+            f'/quiz/delete/question/{multiple_option_question["id"]}/quiz/{quiz_id}'
+        )
+        assert response.status_code == 200
+
+        response = await user_client.get("/quiz/all")
+        quiz = next(q for q in response.json() if q["quiz_info"]["id"] == quiz_id)
+        assert quiz["question_count"] == 2
+
+        async with mock_async_session() as session:
+            quiz_repository = QuizRepository(session)
+            assert await quiz_repository.reconcile_aggregates(quiz_id) == []
+            assert (await quiz_repository.get_by_id(quiz_id)).total_score == 5.5
+
+            # the checker repairs counters that drifted from the rows
+            await quiz_repository.add_aggregates(quiz_id, question_count=3)
+            await session.commit()
+            assert await quiz_repository.reconcile_aggregates(quiz_id) == [quiz_id]
+            assert await quiz_repository.reconcile_aggregates(quiz_id) == []
+
+    @pytest.mark.asyncio
+    async def test_create_questions_in_one_transaction(self, new_quiz: dict):
+        quiz_id = new_quiz["id"]
+        options = [MultipleOptionIn(text=f"option {i}") for i in range(3)]
+        async with mock_async_session() as session:
+            question_repository = QuestionRepository(session)
+            with count_queries(mock_async_engine) as queries:
+                question = await question_repository.create_multiple_option(
+                    question="one round-trip per table",
+                    quiz_id=quiz_id,
+                    options=options,
+                    question_score=2,
+                    correct_option_index=2,
+                )
+            # question, correct option and the quiz aggregates, sqlite can not
+            # return the options in order from one statement, so unlike
+            # postgres it gets one insert per option
+            other_statements = [
+                statement
+                for statement in queries.statements
+                if not statement.startswith("INSERT INTO multiple_options")
+            ]
+            assert len(other_statements) == 3
+            assert queries.commits == 1
+            assert [o.text for o in question.multiple_options] == [
+                o.text for o in options
+            ]
+            assert question.correct_option.option_id == question.multiple_options[2].id
+
+            with count_queries(mock_async_engine) as queries:
+                question = await question_repository.create_descriptive_question(
+                    question="descriptive",
+                    quiz_id=quiz_id,
+                    answer="answer",
+                    question_type=QuestionType.DESCRIPTIVE_SHORT_ANSWER,
+                    question_score=1,
+                )
+            assert len(queries.statements) == 3
+            assert queries.commits == 1
+            assert question.descriptive.answer == "answer"
+
+        async with mock_async_session() as session:
+            stored = await QuestionRepository(session).get_multiple_option_by_id(
+                question.id - 1
+            )
+            assert stored.correct_option.option_id == stored.multiple_options[2].id
+
+    @pytest.mark.asyncio
+    async def test_repository_reads_routed_to_replica(
+        self, user_client: AsyncClient, new_quiz: dict
+    ):
+        quiz_id = new_quiz["id"]
+        await create_short_question_for_quiz(user_client, quiz_id)
+        # an empty copy stands in for a replica that did not replay the quiz yet
+        replica_engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+        async with replica_engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        router = ReplicaRouter(replica_engine, max_lag=1, check_interval=60)
+        session_factory = async_sessionmaker(
+            bind=mock_async_engine,
+            expire_on_commit=False,
+            info={REPLICA_ROUTER: router},
+        )
+
+        async with session_factory() as session:
+            replica_reads = database_reads.value(engine="replica")
+            questions = await QuestionRepository(session).get_all_quiz_questions(quiz_id)
+            assert questions == []
+            assert database_reads.value(engine="replica") == replica_reads + 1
+
+            # a row missing on the replica is read again from the primary
+            missing = replica_fallbacks.value(reason="missing")
+            assert (await QuizRepository(session).get_by_id(quiz_id)).id == quiz_id
+            assert replica_fallbacks.value(reason="missing") == missing + 1
+
+            # once the session wrote, it reads its writes from the primary
+            await QuizRepository(session).add_aggregates(quiz_id)
+            questions = await QuestionRepository(session).get_all_quiz_questions(quiz_id)
+            assert len(questions) == 1
+
+        async def lagging() -> float:
+            return 5
+
+        router = ReplicaRouter(replica_engine, max_lag=1, check_interval=60)
+        router._measure_lag = lagging
+        async with session_factory(info={REPLICA_ROUTER: router}) as session:
+            lag = replica_fallbacks.value(reason="lag")
+            questions = await QuestionRepository(session).get_all_quiz_questions(quiz_id)
+            assert len(questions) == 1
+            assert replica_fallbacks.value(reason="lag") == lag + 1
+        await replica_engine.dispose()
+
+    @pytest.mark.asyncio
+    async def test_bulkhead_pool_metrics(self, tmp_path):
+        engine = create_bulkhead_engine(
+            f"sqlite+aiosqlite:///{tmp_path / 'pool.db'}",
+            TrafficClass.BACKGROUND,
+            pool_size=1,
+            max_overflow=0,
+            pool_timeout=0.1,
+        )
+        labels = {"traffic_class": TrafficClass.BACKGROUND.value}
+        checkouts = pool_checkouts.value(**labels)
+        timeouts = pool_timeouts.value(**labels)
+
+        async with engine.connect():
+            assert pool_saturation.value(**labels) == 1
+            # the only connection of the class is taken, the next one gives up
+            with pytest.raises(PoolTimeoutError):
+                async with engine.connect():
+                    pass
+        assert pool_checkouts.value(**labels) == checkouts + 1
+        assert pool_timeouts.value(**labels) == timeouts + 1
+        assert pool_saturation.value(**labels) == 0
+        await engine.dispose()
+
     @classmethod
     async def create_multiple_option_question(
             cls, user_client: AsyncClient, new_quiz: dict
@@ -0,0 +1,114 @@
+import pytest
+
+from src.app.cache import Leaderboard
+from src.app.utils.leaderboard import REBUILD_ATTEMPTS, rebuild_leaderboard
+from src.core.cache.redis_client import RedisClient
+from tests.mocks.redis import fake_redis_client
+
+
+@pytest.fixture
+def redis_client() -> RedisClient:
+    return fake_redis_client()
+
+
+class ScoresCommittedDuringRead:
+    """quiz totals where the next submission commits right after each read"""
+
+    def __init__(self, leaderboard: Leaderboard, totals: list, commits: list):
+        self.leaderboard = leaderboard
+        self.totals = list(totals)
+        self.commits = list(commits)
+        self.reads = 0
+
+    async def get_quiz_totals(self, quiz_id: int) -> list:
+        totals = list(self.totals)
+        self.reads += 1
+        if self.commits:
+            committed = self.commits.pop(0)
+            self.totals.append(committed)
+            _, participant_id, username, score = committed
+            await self.leaderboard.update(quiz_id, [(participant_id, username, score)])
+        return totals
+
+
+class TestRedisClient:
+    @pytest.mark.asyncio
+    async def test_sorted_set_add_only_if_exists(self, redis_client: RedisClient):
+        added = await redis_client.sorted_set_add(
+            "scores", {1: 2.5}, only_if_exists=True
+        )
+        assert added is False
+        assert await redis_client.exists("scores") == 0
+
+        await redis_client.sorted_set_add("scores", {1: 1})
+        added = await redis_client.sorted_set_add(
+            "scores", {1: 2.5, 2: 1}, only_if_exists=True
+        )
+        assert added is True
+        assert await redis_client.sorted_set_top("scores", 0, -1) == [
+            (b"1", 2.5),
+            (b"2", 1.0),
+        ]
+
+    @pytest.mark.asyncio
+    async def test_leaderboard_on_redis(self, redis_client: RedisClient):
+        leaderboard = Leaderboard(redis_client)
+        await leaderboard.update(1, [(1, "first", 3)])
+        assert not await leaderboard.is_built(1)
+
+        generation = await leaderboard.generation(1)
+        assert await leaderboard.rebuild(
+            1, [(1, "first", 3), (2, "second", 1)], generation
+        )
+        await leaderboard.update(1, [(2, "second", 3), (3, "third", 2)])
+        entries = await leaderboard.top(1, offset=0, limit=10)
+        assert [(e.rank, e.participant_id, e.username) for e in entries] == [
+            (1, 2, "second"),
+            (1, 1, "first"),
+            (3, 3, "third"),
+        ]
+        assert (await leaderboard.rank(1, 3)).rank == 3
+
+        assert await leaderboard.rebuild(2, [], await leaderboard.generation(2))
+        assert await leaderboard.is_built(2)
+        await leaderboard.update(2, [(4, "fourth", 1)])
+        assert not await leaderboard.is_built(2)
+
+    @pytest.mark.parametrize("totals", [[], [(1, 1, "first", 3.0)]])
+    @pytest.mark.asyncio
+    async def test_update_during_leaderboard_rebuild(
+        self, redis_client: RedisClient, totals: list
+    ):
+        leaderboard = Leaderboard(redis_client)
+        score_repository = ScoresCommittedDuringRead(
+            leaderboard, totals, commits=[(1, 2, "second", 5.0)]
+        )
+
+        assert await rebuild_leaderboard(score_repository, leaderboard, 1)
+        # the first read missed the submission, its update made the rebuild retry
+        assert score_repository.reads == 2
+        entries = await leaderboard.top(1, offset=0, limit=10)
+        assert [(e.participant_id, e.score) for e in entries] == [
+            (participant_id, score)
+            for _, participant_id, _, score in reversed(score_repository.totals)
+        ]
+        assert await redis_client.redis.keys("leaderboard:1:*:rebuild:*") == []
+
+        # scores that change during every read leave the leaderboard unbuilt
+        await leaderboard.invalidate(1)
+        score_repository = ScoresCommittedDuringRead(
+            leaderboard,
+            [],
+            commits=[(1, 10 + i, "late", 1.0) for i in range(REBUILD_ATTEMPTS)],
+        )
+        assert not await rebuild_leaderboard(score_repository, leaderboard, 1)
+        assert not await leaderboard.is_built(1)
+
+    @pytest.mark.asyncio
+    async def test_hash_set_with_expire(self, redis_client: RedisClient):
+        await redis_client.hash_set("compiled", {"body": b"\x1f\x8b"}, expire=60)
+        assert await redis_client.hash_get_many("compiled", "body", "head") == [
+            b"\x1f\x8b",
+            None,
+        ]
+        assert 0 < await redis_client.redis.ttl("compiled") <= 60
@@ -0,0 +1,79 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from src.core.config import JwtBackends
+from src.core.excpetions.jwt_exceptions import (
+    BadJwtTokenException,
+    JwtTokenExpiredException,
+)
+from src.core.security.token_codecs import (
+    create_token_codec,
+    generate_pem_keypair as pem_keypair,
+)
+
+# installed with: poetry install --extras pyjwt
+pytest.importorskip("jwt")
+pytest.importorskip("cryptography")
+
+SECRET_KEY = "a secret of at least thirty-two bytes"
+CODECS = [
+    (JwtBackends.JOSE, "HS256"),
+    (JwtBackends.JOSE, "ES256"),
+    (JwtBackends.PYJWT, "HS256"),
+    (JwtBackends.PYJWT, "ES256"),
+    (JwtBackends.PYJWT, "EdDSA"),
+]
+
+
+def make_codec(backend: JwtBackends, algorithm: str, keys: tuple[str, str] | None):
+    private_key, public_key = keys or (None, None)
+    return create_token_codec(
+        backend, algorithm, SECRET_KEY, private_key=private_key, public_key=public_key
+    )
+
+
+class TestTokenCodecs:
+    @pytest.mark.parametrize("backend, algorithm", CODECS)
+    def test_encode_and_decode(self, backend: JwtBackends, algorithm: str):
+        keys = None if algorithm.startswith("HS") else pem_keypair(algorithm)
+        codec = make_codec(backend, algorithm, keys)
+        expire = datetime.utcnow() + timedelta(minutes=5)
+        token = codec.encode({"user_id": 1, "is_admin": False, "exp": expire})
+        assert codec.decode(token)["user_id"] == 1
+
+        with pytest.raises(BadJwtTokenException):
+            codec.decode(token[:-4] + ("AAAA" if token[-4:] != "AAAA" else "BBBB"))
+        expired = codec.encode({"user_id": 1, "exp": datetime.utcnow() - timedelta(1)})
+        with pytest.raises(JwtTokenExpiredException):
+            codec.decode(expired)
+
+    @pytest.mark.parametrize("algorithm", ["ES256", "EdDSA"])
+    def test_verify_with_public_key_only(self, algorithm: str):
+        private_key, public_key = pem_keypair(algorithm)
+        signer = make_codec(JwtBackends.PYJWT, algorithm, (private_key, public_key))
+        verifier = make_codec(JwtBackends.PYJWT, algorithm, (None, public_key))
+        expire = datetime.utcnow() + timedelta(minutes=5)
+        token = signer.encode({"user_id": 7, "exp": expire})
+        assert verifier.decode(token)["user_id"] == 7
+        with pytest.raises(ValueError):
+            verifier.encode({"user_id": 7, "exp": expire})
+
+        # another keypair can not verify the token
+        other = make_codec(JwtBackends.PYJWT, algorithm, pem_keypair(algorithm))
+        with pytest.raises(BadJwtTokenException):
+            other.decode(token)
+
+    def test_backends_verify_each_other(self):
+        keys = pem_keypair("ES256")
+        jose_codec = make_codec(JwtBackends.JOSE, "ES256", keys)
+        pyjwt_codec = make_codec(JwtBackends.PYJWT, "ES256", keys)
+        expire = datetime.utcnow() + timedelta(minutes=5)
+        token = jose_codec.encode({"user_id": 3, "exp": expire})
+        assert pyjwt_codec.decode(token)["user_id"] == 3
+
+    def test_unsupported_algorithm(self):
+        with pytest.raises(ValueError):
+            make_codec(JwtBackends.JOSE, "EdDSA", pem_keypair("EdDSA"))
+        with pytest.raises(ValueError):
+            make_codec(JwtBackends.JOSE, "ES256", None)
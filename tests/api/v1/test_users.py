@@ -1,6 +1,9 @@
 import pytest
 from httpx import AsyncClient
 
+from src.core.cache.stats import cache_lookups
+from src.core.executors import tasks_total
+
 
 class TestUsers:
     @pytest.mark.asyncio
@@ -19,3 +22,35 @@ class TestUsers:
     async def test_get_user_profile(self, user_client: AsyncClient):
         response = await user_client.get("/user/profile")
         assert response.status_code == 200
+
+    @pytest.mark.asyncio
+    async def test_login_hashes_off_the_event_loop(self, http_client: AsyncClient):
+        thread_tasks = tasks_total.value(pool="thread")
+        user_data = {"email": "user1@gmail.com", "password": "SomeStrongPassword@"}
+        response = await http_client.post("/user/login", json=user_data)
+        assert response.status_code == 200
+        assert tasks_total.value(pool="thread") == thread_tasks + 1
+
+        user_data["password"] = "WrongPassword@1"
+        response = await http_client.post("/user/login", json=user_data)
+        assert response.status_code == 400
+        assert tasks_total.value(pool="thread") == thread_tasks + 2
+
+    @pytest.mark.asyncio
+    async def test_verified_token_is_cached(self, user_client: AsyncClient):
+        await user_client.get("/user/profile")
+        hits = cache_lookups.value(cache="verified_jwt", result="hit")
+        misses = cache_lookups.value(cache="verified_jwt", result="miss")
+
+        response = await user_client.get("/user/profile")
+        assert response.status_code == 200
+        assert cache_lookups.value(cache="verified_jwt", result="hit") == hits + 1
+        assert cache_lookups.value(cache="verified_jwt", result="miss") == misses
+
+        # a token that fails verification is never cached
+        for _ in range(2):
+            response = await user_client.get(
+                "/user/profile", headers={"Authorization": "Bearer not-a-token"}
+            )
+            assert response.status_code == 400
+        assert cache_lookups.value(cache="verified_jwt", result="hit") == hits + 1
@@ -0,0 +1,44 @@
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Iterator
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+
+@dataclass
+class QueryLog:
+    statements: list[str] = field(default_factory=list)
+    commits: int = 0
+
+
+@contextmanager
+def count_queries(engine: AsyncEngine) -> Iterator[QueryLog]:
+    """record the statements and commits sent through the engine"""
+    log = QueryLog()
+
+    def on_execute(_conn, _cursor, statement, *_) -> None:
+        log.statements.append(statement)
+
+    def on_commit(_conn) -> None:
+        log.commits += 1
+
+    sync_engine = engine.sync_engine
+    event.listen(sync_engine, "before_cursor_execute", on_execute)
+    event.listen(sync_engine, "commit", on_commit)
+    try:
+        yield log
+    finally:
+        event.remove(sync_engine, "before_cursor_execute", on_execute)
+        event.remove(sync_engine, "commit", on_commit)
+
+
+@contextmanager
+def max_queries(engine: AsyncEngine, limit: int) -> Iterator[QueryLog]:
+    """fail when the block sends more than limit statements, catches N+1 queries"""
+    with count_queries(engine) as log:
+        yield log
+    assert len(log.statements) <= limit, "\n".join(
+        [f"{len(log.statements)} statements, at most {limit} expected:"]
+        + log.statements
+    )
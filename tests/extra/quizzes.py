@@ -2,6 +2,8 @@ from datetime import datetime, timedelta, timezone
 
 from httpx import AsyncClient
 
+from .create_question import create_questions
+
 
 async def update_quiz_date_times(user_client: AsyncClient, quiz_id: int) -> None:
     data = {
@@ -27,3 +29,18 @@ async def create_short_question_for_quiz(
     question_json = response.json()
     assert response.status_code == 200
     return question_json
+
+
+async def create_published_quiz(user_client: AsyncClient, title: str) -> dict:
+    response = await user_client.post("/quiz/create", json={"title": title})
+    assert response.status_code == 200
+    quiz = response.json()
+
+    await create_questions(quiz_id=quiz["id"], user_client=user_client)
+    await update_quiz_date_times(user_client=user_client, quiz_id=quiz["id"])
+
+    response = await user_client.post(f'/quiz/{quiz["id"]}/change-activation-status')
+    assert response.status_code == 200
+
+    response = await user_client.get(f'/quiz/{quiz["id"]}')
+    return response.json()
@@ -1,5 +1,20 @@
+import time
+
+from fakeredis import FakeAsyncRedis
+
+from src.core.cache.redis_client import RedisClient
+
+
+def fake_redis_client() -> RedisClient:
+    """the real client on an in-process redis, with lua scripts and streams"""
+    redis_client = RedisClient()
+    redis_client.redis = FakeAsyncRedis()
+    return redis_client
+
+
 class MockRedis:
     redis = dict()
+    streams: dict[str, list] = dict()
 
     async def set(self, key, value, expire: int | None = None):
         self.redis[key] = value
@@ -8,10 +23,124 @@ class MockRedis:
     async def get(self, key):
         return self.redis.get(key)
 
-    async def delete(self, key):
-        del self.redis[key]
+    async def delete(self, *keys):
+        return sum(self.redis.pop(key, None) is not None for key in keys)
+
+    async def exists(self, *keys):
+        return sum(bool(self.redis.get(key)) for key in keys)
 
-    async def exists(self, key):
-        if self.redis.get(key):
-            return 1
+    async def mget(self, *keys):
+        return [self.redis.get(key) for key in keys]
+
+    async def set_if_not_exists(self, key, value, expire: int | None = None):
+        if key in self.redis:
+            return False
+        self.redis[key] = value
+        return True
+
+    async def delete_if_equals(self, key, value):
+        if self.redis.get(key) == value:
+            return await self.delete(key)
         return 0
+
+    async def incr(self, key):
+        self.redis[key] = int(self.redis.get(key) or 0) + 1
+        return self.redis[key]
+
+    async def stream_add(self, stream, fields: dict):
+        entries = self.streams.setdefault(stream, [])
+        entry_id = f"{time.monotonic_ns()}-0".encode()
+        entries.append((entry_id, {k.encode(): v.encode() for k, v in fields.items()}))
+        return entry_id
+
+    async def stream_create_group(self, stream, group):
+        self.streams.setdefault(stream, [])
+
+    async def stream_read_group(
+        self, stream, group, consumer, count: int, block=None, id_=">"
+    ):
+        return self.streams.get(stream, [])[:count]
+
+    async def stream_pending(self, stream, group, count: int, min_idle_ms: int):
+        return []
+
+    async def stream_claim(self, stream, group, consumer, min_idle_ms: int, *ids):
+        return []
+
+    async def stream_ack(self, stream, group, *ids):
+        self.streams[stream] = [e for e in self.streams[stream] if e[0] not in ids]
+
+    @staticmethod
+    def _encode(value) -> bytes:
+        return value if isinstance(value, bytes) else str(value).encode()
+
+    async def rename_if_equals(self, key, value, renames: dict, delete: tuple = ()):
+        if str(self.redis.get(key) or 0) != str(value):
+            await self.delete(*renames)
+            return False
+        for src, dst in renames.items():
+            self.redis[dst] = self.redis.pop(src)
+        await self.delete(*delete)
+        return True
+
+    async def hash_set(self, key, mapping: dict, expire: int | None = None):
+        self.redis.setdefault(key, {}).update(
+            {self._encode(k): self._encode(v) for k, v in mapping.items()}
+        )
+
+    async def hash_get_many(self, key, *fields):
+        values = self.redis.get(key) or {}
+        return [values.get(self._encode(field)) for field in fields]
+
+    async def sorted_set_add(
+        self,
+        key,
+        mapping: dict,
+        only_if_exists=False,
+        miss_counter=None,
+        miss_delete: tuple = (),
+    ):
+        if only_if_exists and not self.redis.get(key):
+            if miss_counter:
+                await self.incr(miss_counter)
+            await self.delete(*miss_delete)
+            return False
+        self.redis.setdefault(key, {}).update(
+            {self._encode(k): float(v) for k, v in mapping.items()}
+        )
+        return True
+
+    async def sorted_set_score(self, key, member):
+        return (self.redis.get(key) or {}).get(self._encode(member))
+
+    async def sorted_set_size(self, key):
+        return len(self.redis.get(key) or {})
+
+    @staticmethod
+    def _in_bounds(score, min_, max_):
+        def check(bound, lower):
+            bound = str(bound)
+            exclusive = bound.startswith("(")
+            value = float(bound.lstrip("("))
+            if lower:
+                return score > value if exclusive else score >= value
+            return score < value if exclusive else score <= value
+
+        return check(min_, True) and check(max_, False)
+
+    def _ordered(self, key):
+        members = (self.redis.get(key) or {}).items()
+        return sorted(members, key=lambda item: (item[1], item[0]), reverse=True)
+
+    async def sorted_set_count(self, key, min_, max_):
+        return sum(
+            self._in_bounds(score, min_, max_) for _, score in self._ordered(key)
+        )
+
+    async def sorted_set_top(self, key, start: int, stop: int):
+        members = self._ordered(key)
+        return members[start : None if stop == -1 else stop + 1]
+
+    async def sorted_set_top_by_score(self, key, max_, min_, start: int, num: int):
+        members = [m for m in self._ordered(key) if self._in_bounds(m[1], min_, max_)]
+        return members[start : start + num]
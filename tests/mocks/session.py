@@ -1,10 +1,25 @@
+from types import SimpleNamespace
+
+from sqlalchemy import event
+from sqlalchemy.dialects import postgresql
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 
 from src.core.database import Base
+from src.core.database.instrumentation import instrument_engine
 
 
 mock_async_engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+instrument_engine(mock_async_engine)
+
+
+@event.listens_for(mock_async_engine.sync_engine, "connect")
+def enable_foreign_keys(dbapi_connection, _) -> None:
+    # sqlite reuses the ids of deleted rows, cascade like postgres does so
+    # rows of a deleted question can not end up attached to a new one
+    dbapi_connection.execute("PRAGMA foreign_keys=ON")
+
+
 mock_async_session = async_sessionmaker(bind=mock_async_engine, expire_on_commit=False)
 
 
@@ -20,3 +35,30 @@ async def mock_get_session():
             yield session
     except SQLAlchemyError as e:
         print(e)
+
+
+class MockCopySession:
+    """
+    stands in for an asyncpg session on the COPY path, statements are compiled
+    for postgres and copied records are kept per table
+    """
+
+    def __init__(self):
+        self.statements: list[str] = []
+        self.copied: dict[str, list[tuple]] = {}
+
+    async def scalars(self, statement):
+        self.statements.append(str(statement.compile(dialect=postgresql.dialect())))
+        return iter(range(1, 1000))
+
+    async def connection(self):
+        return self
+
+    async def get_raw_connection(self):
+        return SimpleNamespace(
+            driver_connection=SimpleNamespace(copy_records_to_table=self._copy)
+        )
+
+    async def _copy(self, table: str, records: list[tuple], columns: tuple):
+        assert all(len(record) == len(columns) for record in records)
+        self.copied[table] = records